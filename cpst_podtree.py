@@ -15,10 +15,29 @@ import re
 import shlex
 import json
 import threading
-from random import randint
+import concurrent.futures
+from random import randint, uniform
 from time import sleep
 import collections
 import getopt
+import gzip
+import time
+import os
+import ssl
+import base64
+import tempfile
+import queue
+import http.client
+import codecs
+import functools
+import hashlib
+from fractions import Fraction
+import urllib.parse
+import csv
+import io
+import heapq
+import atexit
+import datetime
 
 
 #-------------------------------------------------------------------------#
@@ -44,7 +63,286 @@ GLOBAL_IBM = {}
 GLOBAL_PVCS = {}
 GLOBAL_CONFIGMAP = {}
 GLOBAL_COGNITIVEDATA = {}
-GLOBAL_EVENTS = {}
+GLOBAL_EVENTS = {} #Event list json, only pulled with -E
+GLOBAL_POD_METRICS = {} #PodMetrics list (metrics.k8s.io), only pulled with -u
+GLOBAL_NODES = {} #Node list json (cluster scoped, not per namespace), only pulled with --by-node
+
+#Index over the pre-pulled json, built once after the data pull by buildResourceIndex().
+#Nested dictionary: [namespace][(kind, name)] = item json. kind is lower case. Ex: ("replicaset","zen-core-abc")
+GLOBAL_RESOURCE_INDEX = collections.defaultdict(dict)
+
+#Kubernetes quantities: <number>[<exponent>|<suffix>]. Ex: 250m, 1.5Gi, 129e6, 2Ti
+#"K" is not a Kubernetes suffix, but is accepted as 1000.
+QUANTITY_RE = re.compile(r"^([+-]?(?:[0-9]+(?:\.[0-9]*)?|\.[0-9]+))(?:([eE][+-]?[0-9]+)|(Ki|Mi|Gi|Ti|Pi|Ei|n|u|m|k|K|M|G|T|P|E))?$")
+QUANTITY_SUFFIXES = {
+  "n": Fraction(1, 10**9), "u": Fraction(1, 10**6), "m": Fraction(1, 1000),
+  "k": 10**3, "K": 10**3, "M": 10**6, "G": 10**9, "T": 10**12, "P": 10**15, "E": 10**18,
+  "Ki": 2**10, "Mi": 2**20, "Gi": 2**30, "Ti": 2**40, "Pi": 2**50, "Ei": 2**60,
+}
+#Units values can be converted to (base units per unit). Any other unit returns base units.
+QUANTITY_UNITS = {
+  "m": Fraction(1, 1000), "K": 10**3, "M": 10**6, "G": 10**9, "T": 10**12,
+  "Ki": 2**10, "Mi": 2**20, "Gi": 2**30, "Ti": 2**40,
+}
+#Converted values, dictionary: [(quantity string, unit)] = integer
+QUANTITY_INT_CACHE = {}
+
+#Per container detail kept by podObject. cpu values are in mili, memory values in KiB.
+containerResources = collections.namedtuple("containerResources",
+  ["name", "isInit", "running", "cpuRequest", "cpuLimit", "memoryRequest", "memoryLimit", "restarts"])
+
+#Events view (-E): one event of an object. time is a timezone aware datetime (None if the event has none).
+eventEntry = collections.namedtuple("eventEntry", ["time", "type", "reason", "message", "count"])
+#Events indexed by involved object, nested dictionary: [namespace][kind/name] = deque of eventEntry, oldest first.
+#Only the EVENTS_PER_OBJECT most recent events of each object are kept, and with --since (SINCE_SECONDS)
+#only the ones seen in that many seconds before the run (or before the snapshot was taken).
+GLOBAL_EVENT_INDEX = collections.defaultdict(dict)
+EVENTS_PER_OBJECT = 10
+SINCE_SECONDS = None #Also limits a log search to the lines written in that many seconds
+
+#Log search (--grep): the pattern, compiled for bytes so log lines are matched without decoding them,
+#and whether the logs of the previous (restarted) containers are searched instead (--previous).
+LOG_PATTERN = None
+LOG_PREVIOUS = False
+#Errors of a container that has no log to read: not started yet, or no previous container (--previous).
+#Ex: container "c1" in pod "p1" is waiting to start: ContainerCreating
+#    previous terminated container "c1" in pod "p1" not found
+NO_LOG_ERROR_RE = re.compile(r"container \"[^\"]*\" in pod \"[^\"]*\" is waiting to start|previous terminated container \"[^\"]*\" in pod \"[^\"]*\" not found")
+
+#Owner resolution caches, dictionary: [namespace] = ownerCache. Use getOwnerCache(namespace).
+GLOBAL_OWNER_CACHE = {}
+
+#Errors from the initial data pull, nested dictionary: [namespace][resource] = error string
+GLOBAL_FETCH_ERRORS = collections.defaultdict(dict)
+
+#Individual resources fetched when not found in the pre-pulled json (cache misses).
+#Nested dictionary: [namespace][kind/name] = json (None if the oc get failed).
+GLOBAL_FALLBACK_JSON = collections.defaultdict(dict)
+
+#api-resources discovery results, dictionary: [match pattern] = comma separated resource names
+GLOBAL_DISCOVERY = {}
+
+#Custom resources pulled with the built in kinds (into GLOBAL_IBM): the namespaced api resources whose
+#name (Ex: zenservices.zen.cpd.ibm.com) matches one of these regular expressions (--cr-pattern).
+CR_PATTERNS = ["ibm", "cognitivedata"]
+
+#api-resources discovery results are cached on disk, per API server and cluster version, for DISCOVERY_CACHE_TTL seconds.
+#The oc transport also keeps its cluster key there, per kubeconfig, so a cache hit makes no oc call at all.
+#--refresh-discovery (DISCOVERY_REFRESH) ignores the cached result and replaces it.
+DISCOVERY_CACHE_FILE = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "cpst_podtree", "discovery.json")
+DISCOVERY_CACHE_TTL = 6 * 3600
+DISCOVERY_REFRESH = False
+
+#Json dictionaries written to/read from a snapshot file (--save-snapshot/--from-snapshot):
+SNAPSHOT_GLOBALS = ["GLOBAL_STATEFULSET", "GLOBAL_REPLICASET", "GLOBAL_JOBS", "GLOBAL_DEPLOYMENT",
+                    "GLOBAL_PODS", "GLOBAL_IBM", "GLOBAL_PVCS", "GLOBAL_CONFIGMAP", "GLOBAL_COGNITIVEDATA",
+                    "GLOBAL_EVENTS", "GLOBAL_POD_METRICS", "GLOBAL_NODES", "GLOBAL_FALLBACK_JSON", "GLOBAL_DISCOVERY", "GLOBAL_FETCH_ERRORS"]
+SNAPSHOT_VERSION = 1
+
+#Timing report of the run (--profile), a profileRecorder. None when not profiling.
+GLOBAL_PROFILE = None
+
+#True when running from a snapshot file. No oc calls are made, cache misses return None.
+SNAPSHOT_REPLAY = False
+#Time the replayed snapshot was taken ("created", Ex: 2024-05-01T10:00:00+0000), None when not replaying.
+SNAPSHOT_CREATED = None
+
+#API paths for the built in kinds, [plural] = (api path prefix, namespaced, kind)
+BUILTIN_API_RESOURCES = {
+  "pods": ("/api/v1", True, "Pod"),
+  "persistentvolumeclaims": ("/api/v1", True, "PersistentVolumeClaim"),
+  "configmaps": ("/api/v1", True, "ConfigMap"),
+  "events": ("/api/v1", True, "Event"),
+  "nodes": ("/api/v1", False, "Node"),
+  "statefulsets": ("/apis/apps/v1", True, "StatefulSet"),
+  "replicasets": ("/apis/apps/v1", True, "ReplicaSet"),
+  "deployments": ("/apis/apps/v1", True, "Deployment"),
+  "jobs": ("/apis/batch/v1", True, "Job"),
+}
+#Names the built in kinds may be given as, [name] = plural
+BUILTIN_API_ALIASES = {
+  "pod": "pods", "pods": "pods", "po": "pods",
+  "persistentvolumeclaim": "persistentvolumeclaims", "persistentvolumeclaims": "persistentvolumeclaims", "pvc": "persistentvolumeclaims",
+  "configmap": "configmaps", "configmaps": "configmaps", "cm": "configmaps",
+  "event": "events", "events": "events", "ev": "events",
+  "node": "nodes", "nodes": "nodes", "no": "nodes",
+  "statefulset": "statefulsets", "statefulsets": "statefulsets", "sts": "statefulsets",
+  "replicaset": "replicasets", "replicasets": "replicasets", "rs": "replicasets",
+  "deployment": "deployments", "deployments": "deployments", "deploy": "deployments",
+  "job": "jobs", "jobs": "jobs",
+}
+AGGREGATED_DISCOVERY_ACCEPT = ("application/json;g=apidiscovery.k8s.io;v=v2;as=APIGroupDiscoveryList,"
+                               "application/json;g=apidiscovery.k8s.io;v=v2beta1;as=APIGroupDiscoveryList,application/json")
+#A list of a built in kind pulled with only metadata fields (see METADATA_FIELDS) is asked for as a
+#PartialObjectMetadataList, so the API server leaves out the spec and status of each item.
+METADATA_LIST_ACCEPT = "application/json;as=PartialObjectMetadataList;g=meta.k8s.io;v=v1,application/json"
+METADATA_FIELDS = {"kind", "apiVersion", "metadata"}
+
+#Fields of each pulled item that are used by the tool, everything else is dropped while parsing.
+#True keeps the whole value. A dictionary keeps only the listed keys (for a list, of each entry).
+ITEM_PROJECTION = {
+  "kind": True,
+  "apiVersion": True,
+  "metadata": {"name": True, "namespace": True, "uid": True, "ownerReferences": True, "labels": True,
+               "resourceVersion": True, "creationTimestamp": True},
+  "spec": {
+    "nodeName": True,
+    "volumes": {"name": True, "persistentVolumeClaim": True},
+    "containers": {"name": True, "resources": True},
+    "initContainers": {"name": True, "resources": True},
+    "resources": True,
+    "storageClassName": True,
+    "volumeName": True,
+    "accessModes": True,
+    "selector": True,
+  },
+  "containers": {"name": True, "usage": True}, #PodMetrics (metrics.k8s.io)
+  "status": {
+    "phase": True,
+    "containerStatuses": {"name": True, "state": True, "restartCount": True},
+    "initContainerStatuses": {"name": True, "state": True, "restartCount": True},
+    "capacity": True,
+    "allocatable": True,
+  },
+}
+#Fields kept of the kinds that are only owner chain links (controllers, custom resources, configmaps), and
+#of pods and pvcs the print mode does not use, when the pull is planned for a print mode (see getFetchPlan()).
+OWNER_PROJECTION = {
+  "kind": True,
+  "apiVersion": True,
+  "metadata": {"name": True, "namespace": True, "uid": True, "ownerReferences": True, "resourceVersion": True},
+}
+#Fields kept of the controller kinds while finding one service's subtree (-S, see getServiceJson()): the owner
+#fields, and the label selector their pods are listed with.
+SELECTOR_PROJECTION = {
+  "kind": True,
+  "apiVersion": True,
+  "metadata": {"name": True, "namespace": True, "uid": True, "ownerReferences": True, "resourceVersion": True},
+  "spec": {"selector": True},
+}
+#Fields kept of events (-E):
+EVENT_PROJECTION = {
+  "type": True,
+  "reason": True,
+  "message": True,
+  "count": True,
+  "firstTimestamp": True,
+  "lastTimestamp": True,
+  "eventTime": True,
+  "series": {"count": True, "lastObservedTime": True},
+  "involvedObject": {"kind": True, "name": True},
+  "metadata": {"name": True, "namespace": True, "creationTimestamp": True},
+}
+JSON_STREAM_CHUNK = 65536 #Bytes read at a time while parsing a json stream
+
+#How cluster data is pulled (--transport): "api" talks to the API server directly, "oc" runs oc commands.
+#ACTIVE_TRANSPORT is set up in main(), and falls back to oc if the kubeconfig can not be used directly.
+TRANSPORT_TYPE = "api"
+ACTIVE_TRANSPORT = None
+
+#Number of concurrent calls used for the initial data pull (--fetch-workers)
+FETCH_WORKERS = 4
+
+#Lists are pulled in pages of PAGE_SIZE items (--page-size, 0 pulls each list in one call), using the API's
+#limit/continue chunking. Pod and pvc pages are handed to the compile stage as they arrive, while the other
+#kinds are pulled (see pagedPull), through a queue holding at most PIPELINE_DEPTH pages.
+PAGE_SIZE = 500
+PIPELINE_DEPTH = 4
+
+#Seconds a single cluster call (oc process or API request) may take before it is ended (--call-timeout).
+#A failed call is tried again up to CALL_RETRIES times, after a random wait of up to CALL_BACKOFF * 2^attempt seconds.
+CALL_TIMEOUT = 120
+CALL_RETRIES = 2
+CALL_BACKOFF = 1.0
+#Overall time budget of the run in seconds (--budget), None for no budget. RUN_DEADLINE is the time.monotonic()
+#value it ends at. Once it is used up no more calls are made, and the report shows what was pulled so far.
+RUN_BUDGET = None
+RUN_DEADLINE = None
+RUN_BUDGET_ERROR = "run time budget (--budget) used up"
+RUN_BUDGET_NOTED = False #Set once the budget ran out, so it is reported once
+#Errors a retry will not fix: client errors other than 429 (api), missing or forbidden objects and unknown kinds (oc).
+PERMANENT_ERROR_RE = re.compile(r"returned: '4(?!29)\d\d'|\((NotFound|Forbidden|Unauthorized|BadRequest|Invalid)\)|"
+                                r"doesn't have a resource type|Unknown resource type")
+
+#Kinds pulled by getGlobalJson() with all fields for each print mode (see getFetchPlan()), besides the owner
+#chain kinds (statefulsets, replicasets, jobs, deployments and custom resources) which are always pulled.
+#Pods and pvcs a mode does not use are still pulled, with only their owner fields (OWNER_PROJECTION), so
+#every mode lists the same services. Configmaps are only owner chain links, they are loaded when an owner
+#chain first reaches one (LAZY_KINDS).
+FETCH_PLAN_ALL = {"pods", "pvc", "configmap"}
+FETCH_PLANS = {
+  "summary": {"pods", "pvc"},
+  "podtree": {"pods"},
+  "fullpodtree": {"pods", "pvc"},
+  "cpu": {"pods"},
+  "memory": {"pods"},
+  "pvc": {"pvc"},
+  "standalone": {"pods", "pvc"},
+  "usage": {"pods", "pods.metrics.k8s.io"},
+  "bynode": {"pods", "nodes"},
+  "events": {"pods", "pvc", "events"},
+  "logs": {"pods"},
+}
+
+#Kinds that may not have been pulled, and are loaded for a whole namespace the first time a lookup
+#misses one. [index kind] = (global dictionary name, resource)
+#Only configmaps can wait for a lookup: the services are found by walking up from every pod and pvc, so
+#those lists are needed whole, before any lookup is made.
+LAZY_KINDS = {
+  "configmap": ("GLOBAL_CONFIGMAP", "configmap"),
+}
+#Index kinds not pulled yet, nested dictionary: [namespace] = set of LAZY_KINDS keys
+GLOBAL_UNPLANNED_KINDS = collections.defaultdict(set)
+
+#Number of processes compiling pod, pvc and service objects (--jobs). 1 compiles in the main process.
+#Namespaces are compiled one per task. With fewer namespaces than jobs, pod and pvc lists are split into
+#chunks of at least COMPILE_CHUNK_SIZE names.
+COMPILE_JOBS = 1
+COMPILE_CHUNK_SIZE = 500
+#Settings copied into each compile worker process (needed when workers are spawned rather than forked):
+COMPILE_WORKER_SETTINGS = ["DEBUG_MODE", "TRANSPORT_TYPE", "SNAPSHOT_REPLAY", "CR_PATTERNS", "FETCH_WORKERS", "DISCOVERY_REFRESH",
+                           "GLOBAL_UNPLANNED_KINDS", "CALL_TIMEOUT", "CALL_RETRIES", "CALL_BACKOFF", "RUN_BUDGET", "RUN_DEADLINE", "PAGE_SIZE"]
+
+#Report sort columns (--sort), [column] = (sort key function of a serviceObject, descending)
+SORT_COLUMNS = {
+  "name": (lambda servobj: servobj.longName, False),
+  "cpu": (lambda servobj: servobj.requestedCpu, True),
+  "memory": (lambda servobj: servobj.requestedMemory, True),
+  "pvc": (lambda servobj: servobj.totalPvcCapacity, True),
+  "pods": (lambda servobj: len(servobj.podList), True),
+}
+
+#Top services report (--top N --by column): column titles, [SORT_COLUMNS column] = title
+TOP_COLUMN_TITLES = {"cpu": "Requested CPU", "memory": "Requested Memory", "pvc": "PVC Capacity", "pods": "Pods"}
+
+#Output format (--output): "text" prints the reports, "ndjson", "csv" and "json" write one record per
+#service, pod and pvc (see OUTPUT_FIELDS), as soon as each record is ready.
+OUTPUT_FORMAT = "text"
+OUTPUT_FORMATS = ["text", "ndjson", "csv", "json"]
+#Record fields. Units: cpu in millicores, memory and storage in bytes. Fields that do not apply are null.
+#Usage fields (metrics API) are only set with -u.
+OUTPUT_FIELDS = ["record", "namespace", "service", "name", "orphan", "status", "node",
+                 "cpu_request_millicores", "cpu_limit_millicores", "memory_request_bytes", "memory_limit_bytes",
+                 "cpu_usage_millicores", "memory_usage_bytes",
+                 "storage_bytes", "restarts", "pod_count", "pvc_count", "storage_class", "volume",
+                 "owner_path", "pvc_mounts"]
+
+#resourceVersion of each list pulled by getGlobalJson(), [(namespace, resource)] = resourceVersion, the
+#namespace is None for a list pulled across all namespaces. Watches start from it.
+GLOBAL_LIST_VERSIONS = {}
+
+#Watch mode (--watch): kinds followed, [resource as pulled by getGlobalJson()] = kind used in GLOBAL_RESOURCE_INDEX.
+WATCH_RESOURCES = {
+  "pods": "pod",
+  "pvc": "persistentvolumeclaim",
+  "statefulset": "statefulset",
+  "replicaset": "replicaset",
+  "jobs": "job",
+  "deployment": "deployment",
+  "configmap": "configmap",
+}
+WATCH_TIMEOUT = 300 #Seconds before the API server ends a watch stream, it is then restarted
+WATCH_SETTLE = 0.5  #Seconds to wait for more events after one arrives, so a burst is redrawn once
 
 #-------------------------------------------------------------------------#
 # Classes
@@ -52,58 +350,61 @@ GLOBAL_EVENTS = {}
 
 #---------- class podObject ----------#
 class podObject:
+  __slots__ = ("name", "longName", "namespace", "ownerHierarchy", "primaryOwner", "nodeName",
+               "cpuRequest", "cpuLimit", "cpuActive", "memoryRequest", "memoryLimit", "memoryActive",
+               "containers", "status", "pvcList", "restarts", "events", "cpuUsage", "memoryUsage")
 
-  def __init__(self,name,namespace):
+  #With withOwners False, the owners are found later by resolveOwners() (see compilePagedNamespaces()).
+  def __init__(self,name,namespace,withOwners=True):
     self.name=name
     self.longName=f"pod/{name}"
     self.namespace=namespace
     if DEBUG_MODE: print(f"podObject:------- Init: {self.longName} in ns {self.namespace}")
-    self.podJson=self.getPodJson()
+    podJson=self.getPodJson()
     self.ownerHierarchy=[] #List
-    self.populateOwnerHierarchy()
-    self.primaryOwner=self.getPrimaryOwner()
-    self.nodeName=self.getNodeName()
-    self.cpuRequest=self.getCpu("requests")
-    self.cpuLimit=self.getCpu("limits")
+    self.primaryOwner=None
+    if withOwners:
+      self.resolveOwners()
+    self.nodeName=(podJson.get("spec") or {}).get("nodeName",None)
+    self.cpuRequest=0
+    self.cpuLimit=0
     self.cpuActive=0  #Value of requests for active containers
-    self.memoryRequest=self.getMem("requests")
-    self.memoryLimit=self.getMem("limits")
+    self.memoryRequest=0
+    self.memoryLimit=0
     self.memoryActive=0 #Value of requests for active containers
-    self.status=self.getStatus()
-    self.pvcList=self.getPvcs()
+    self.containers=[] #List of containerResources
     self.restarts=0
-    self.events=""
+    self.extractContainerResources(podJson)
+    self.status=(podJson.get("status") or {}).get("phase","Unknown")
+    self.pvcList=self.extractPvcs(podJson)
+    self.events=[] #List of eventEntry, oldest first, set by attachEvents() (-E)
+    self.cpuUsage=None    #Usage from the metrics API in mili, set by attachPodUsage() (None if not known)
+    self.memoryUsage=None #Usage from the metrics API in KiB
 
   def getPodName(self):
     return self.name
   
+  #Returns {} if the pod could not be fetched, the pod is then kept with no containers and status Unknown.
   def getPodJson(self):
-    resJson = None
-    items = GLOBAL_PODS[self.namespace].get("items")
-    for item in items:
-      itemName=item.get("metadata").get("name")
-      if itemName == self.name:
-        if DEBUG_MODE: print(f"podObject: getPodJson - MATCH! item.metadata.name = '{itemName}'")
-        resJson = item
+    resJson = lookupResource("pod", self.name, self.namespace)
 
     #We didn't find a matching json in our pre-pulled jsons. Get the resource directly.
     if resJson is None:
       if DEBUG_MODE: print(f"podObject: getPodJson - Did not find pod in cache, make oc call")
       resJson = getJsonForResource(self.longName, self.namespace)
 
-    return resJson
+    return resJson or {}
 
   def populateOwnerHierarchy(self):
-    ownerList=[]
-    controller = controlledBy(self.longName, self.namespace)
-    while controller:
-      if DEBUG_MODE: print(f"podObject: getOwnerH: controller {controller}")
-      ownerList.append(controller)
-      controller = controlledBy(controller, self.namespace)
+    ownerList = getOwnerCache(self.namespace).getAncestors(self.longName)
     if DEBUG_MODE: print(f"podObject: getOwnerH: ownerList: '{ownerList}'")
     self.ownerHierarchy = ownerList
     return ownerList
 
+  def resolveOwners(self):
+    self.populateOwnerHierarchy()
+    self.primaryOwner=self.getPrimaryOwner()
+
   def getOwnerHierarchy(self):
     return self.ownerHierarchy
     
@@ -114,155 +415,49 @@ class podObject:
       return None
   
   def getNodeName(self):
-    return self.podJson.get("spec").get("nodeName",None)
+    return self.nodeName
   
-  #Returns pod's cpu in mili
-  def getCpu(self, scope):
-    cpuCount = 0
-
-    initContStatusList = self.podJson.get("status").get("initContainerStatuses",[])
-    contStatusList = self.podJson.get("status").get("containerStatuses",[])
-
-    #Go through init containers:
-    containerList = self.podJson.get("spec").get("initContainers",[])
-    for cont in containerList:
-      contName = cont.get("name")
-
-      #Check to see if the container is active, otherwise it doesn't count.
-      contStatus = "terminated" 
-      for contStatusJson in initContStatusList:
-        if (contStatusJson.get("name") == contName) and (contStatusJson.get("state").get("running",None)):
-          contStatus = "running"
-          break
-      if contStatus == "terminated":
-        if DEBUG_MODE: print(f"podObject: getCpu: pod {self.name} initCont {contName} (scope {scope}) not running, continue...")
-        #This container is not running, continue to next.
-        continue
-
-      #If we made it here, we should get the pod container stats and count them.
-      if DEBUG_MODE: print(f"podObject: getCpu: pod '{self.name}', initContainer '{contName}', scope '{scope}'")
-      try:
-        cpuVal = cont.get("resources").get(scope).get("cpu")
-        if cpuVal is None:
-          cpuVal = "0"
-      except:
-        if DEBUG_MODE: print(f"Info: pod {self.name} has no {scope} cpu resources")
-        cpuVal = "0"
-      cpuVal = ocpValToInteger(cpuVal, "m")
-      if DEBUG_MODE: print(f"podObject: cpuVal '{cpuVal}'")
-      cpuCount += cpuVal
-
-    #Go through containers:
-    containerList = self.podJson.get("spec").get("containers",[])
-    for cont in containerList:
-      contName = cont.get("name")
-
-      #Check to see if the container is active, otherwise it doesn't count.
-      contStatus = "terminated" 
-      for contStatusJson in contStatusList:
-        if (contStatusJson.get("name") == contName) and (contStatusJson.get("state").get("running",None)):
-          contStatus = "running"
-          break
-      if contStatus == "terminated":
-        if DEBUG_MODE: print(f"podObject: getCpu: pod {self.name} cont {contName} (scope {scope}) not running, continue...")
-        #This container is not running, continue to next.
-        continue
-
-      #If we made it here, we should get the pod container stats and count them.
-      if DEBUG_MODE: print(f"podObject: getCpu: pod '{self.name}', container '{contName}', scope '{scope}'")
-      try:
-        cpuVal = cont.get("resources").get(scope).get("cpu")
-        if cpuVal is None:
-          cpuVal = "0"
-      except:
-        if DEBUG_MODE: print(f"Info: pod {self.name} has no {scope} cpu resources")
-        cpuVal = "0"
-      cpuVal = ocpValToInteger(cpuVal, "m")
-      if DEBUG_MODE: print(f"podObject: cpuVal '{cpuVal}'")
-      cpuCount += cpuVal
-
-    if DEBUG_MODE: print(f"podObject: cpuCount '{cpuCount}'")
-    return cpuCount
-
-  #Returns pod's memory in KiB
-  def getMem(self, scope):
-    memCount = 0
-
-    initContStatusList = self.podJson.get("status").get("initContainerStatuses")
-    contStatusList = self.podJson.get("status").get("containerStatuses")
-
-    #Go through init containers:
-    containerList = self.podJson.get("spec").get("initContainers",[])
-    for cont in containerList:
-      contName = cont.get("name")
-
-      #Check to see if the container is active, otherwise it doesn't count.
-      contStatus = "terminated" 
-      for contStatusJson in initContStatusList:
-        if (contStatusJson.get("name") == contName) and (contStatusJson.get("state").get("running",None)):
-          contStatus = "running"
-          break
-      if contStatus == "terminated":
-        if DEBUG_MODE: print(f"podObject: getMem: pod {self.name} initCont {contName} (scope {scope}) not running, continue...")
-        #This container is not running, continue to next.
-        continue
-
-      #If we made it here, we should get the pod container stats and count them.
-      if DEBUG_MODE: print(f"podObject: getMem: pod '{self.name}', initContainer '{contName}', scope '{scope}'")
-      try:
-        memVal = cont.get("resources").get(scope).get("memory")
-        if memVal is None:
-          memVal = "0"
-      except:
-        if DEBUG_MODE: print(f"Info: pod {self.name} has no {scope} memory resources")
-        memVal = "0"
-      if DEBUG_MODE: print(f"podObject: memVal before '{memVal}'")
-      memVal = ocpValToInteger(memVal, "Ki")
-
-      if DEBUG_MODE: print(f"podObject: memVal '{memVal}'")
-      memCount += memVal
-      
-    #Go through containers:
-    containerList = self.podJson.get("spec").get("containers",[])
-    for cont in containerList:
-      contName = cont.get("name")
-
-      #Check to see if the container is active, otherwise it doesn't count.
-      contStatus = "terminated" 
-      for contStatusJson in contStatusList:
-        if (contStatusJson.get("name") == contName) and (contStatusJson.get("state").get("running",None)):
-          contStatus = "running"
-          break
-      if contStatus == "terminated":
-        if DEBUG_MODE: print(f"podObject: getMem: pod {self.name} cont {contName} (scope {scope}) not running, continue...")
-        #This container is not running, continue to next.
-        continue
-
-      #If we made it here, we should get the pod container stats and count them.
-      if DEBUG_MODE: print(f"podObject: getMem: pod '{self.name}', container '{contName}', scope '{scope}'")
-      try:
-        memVal = cont.get("resources").get(scope).get("memory")
-        if memVal is None:
-          memVal = "0"
-      except:
-        if DEBUG_MODE: print(f"Info: pod {self.name} has no {scope} memory resources")
-        memVal = "0"
-      if DEBUG_MODE: print(f"podObject: memVal before '{memVal}'")
-      memVal = ocpValToInteger(memVal, "Ki")
-
-      if DEBUG_MODE: print(f"podObject: memVal '{memVal}'")
-      memCount += memVal
-
-    if DEBUG_MODE: print(f"podObject: memCount '{memCount}'")
-    return memCount
+  #One pass over the init containers and containers, using a name -> status map for each.
+  #Sets the cpu (in mili) and memory (in KiB) request and limit totals, which only count
+  #running containers, the restart total, and self.containers with the per container detail.
+  def extractContainerResources(self, podJson):
+    podSpec = podJson.get("spec") or {}
+    podStatus = podJson.get("status") or {}
+    for (containerKey, statusKey, isInit) in (("initContainers", "initContainerStatuses", True),
+                                             ("containers", "containerStatuses", False)):
+      statusMap = {}
+      for contStatusJson in podStatus.get(statusKey) or []:
+        statusMap[contStatusJson.get("name")] = contStatusJson
+
+      for cont in podSpec.get(containerKey) or []:
+        contName = cont.get("name")
+        contStatusJson = statusMap.get(contName, {})
+        running = bool((contStatusJson.get("state") or {}).get("running"))
+        resources = cont.get("resources") or {}
+        requests = resources.get("requests") or {}
+        limits = resources.get("limits") or {}
+        (cpuRequest, cpuLimit) = ocpValsToIntegers([requests.get("cpu") or "0", limits.get("cpu") or "0"], "m")
+        (memoryRequest, memoryLimit) = ocpValsToIntegers([requests.get("memory") or "0", limits.get("memory") or "0"], "Ki")
+        contResources = containerResources(contName, isInit, running, cpuRequest, cpuLimit,
+                                           memoryRequest, memoryLimit, contStatusJson.get("restartCount",0))
+        if DEBUG_MODE: print(f"podObject: pod {self.name}: {contResources}")
+        self.containers.append(contResources)
+        self.restarts += contResources.restarts
+
+        #Only running containers count towards the pod's totals:
+        if running:
+          self.cpuRequest += contResources.cpuRequest
+          self.cpuLimit += contResources.cpuLimit
+          self.memoryRequest += contResources.memoryRequest
+          self.memoryLimit += contResources.memoryLimit
 
   #Pod phases are: Pending, Running, Succeeded, Failed, and Unknown
   def getStatus(self):
-    return self.podJson.get("status").get("phase")
+    return self.status
 
-  def getPvcs(self):
+  def extractPvcs(self, podJson):
     pvcsOut = []
-    volList = self.podJson.get("spec").get("volumes")
+    volList = (podJson.get("spec") or {}).get("volumes") or []
     for vol in volList:
       pvc = vol.get("persistentVolumeClaim")
       if pvc:
@@ -271,58 +466,68 @@ class podObject:
         if DEBUG_MODE: print(f"podObject: pod {self.name}: getPvcs - pvc '{pvcName}'")
     return pvcsOut
 
+  def getPvcs(self):
+    return self.pvcList
+
   def getEvents(self):
-    events = []
-    return events
+    return self.events
 #---------- End class podObject ----------#
 
 #---------- class pvcObject ----------#
 class pvcObject:
 
-  def __init__(self,name,namespace):
+  #With withOwners False, the owners are found later by resolveOwners() (see compilePagedNamespaces()).
+  def __init__(self,name,namespace,withOwners=True):
     self.name=name
     self.longName=f"persistentvolumeclaim/{name}"
     self.namespace=namespace
     if DEBUG_MODE: print(f"pvcObject:------- Init: {self.longName} in ns {self.namespace}")
     self.pvcJson=self.getPvcJson()
     self.ownerHierarchy=[] #List
-    self.populateOwnerHierarchy()
-    self.primaryOwner=self.getPrimaryOwner()
+    self.primaryOwner=None
+    if withOwners:
+      self.resolveOwners()
     self.capacity=self.getPvcCapacity()
+    self.capacityBytes=self.getPvcCapacityBytes()
     self.accessModes=self.getAccessModes()
     self.storageClass=self.getStorageClass()
     self.volumeName=self.getVolumeName()
+    self.events=[] #List of eventEntry, oldest first, set by attachEvents() (-E)
 
   def getPvcs(self):
     return None
 
+  def getEvents(self):
+    return self.events
+
+  #Returns {} if the pvc could not be fetched, the pvc is then kept with a capacity of 0.
   def getPvcJson(self):
     if DEBUG_MODE: print(f"pvcObject: getPvcJson {self.name} (ns {self.namespace})")
-    resJson = None
-    items = GLOBAL_PVCS[self.namespace].get("items")
-    for item in items:
-      itemName=item.get("metadata").get("name")
-      if itemName == self.name:
-        if DEBUG_MODE: print(f"pvcObject: getPvcJson - MATCH! item.metadata.name = '{itemName}'")
-        resJson = item
+    resJson = lookupResource("persistentvolumeclaim", self.name, self.namespace)
 
     #We didn't find a matching json in our pre-pulled jsons. Get the resource directly.
     if resJson is None:
       if DEBUG_MODE: print(f"pvcObject: getPvcJson - Did not find pvc in cache, make oc call")
       resJson = getJsonForResource(self.longName, self.namespace)
 
-    return resJson
+    return resJson or {}
+
+  def getPvcSpec(self):
+    return self.pvcJson.get("spec") or {}
+
+  #Requested storage quantity, "0" if not known.
+  def getRequestedStorage(self):
+    return ((self.getPvcSpec().get("resources") or {}).get("requests") or {}).get("storage") or "0"
   
   def populateOwnerHierarchy(self):
-    ownerList=[]
-    controller = controlledBy(self.longName, self.namespace)
-    while controller:
-      if DEBUG_MODE: print(f"pvcObject: getOwnerH: controller {controller}")
-      ownerList.append(controller)
-      controller = controlledBy(controller, self.namespace)
+    ownerList = getOwnerCache(self.namespace).getAncestors(self.longName)
     if DEBUG_MODE: print(f"pvcObject: getOwnerH: ownerList: '{ownerList}'")
     self.ownerHierarchy = ownerList
     return ownerList
+
+  def resolveOwners(self):
+    self.populateOwnerHierarchy()
+    self.primaryOwner=self.getPrimaryOwner()
   
   def getOwnerHierarchy(self):
     return self.ownerHierarchy
@@ -334,24 +539,1113 @@ class pvcObject:
       return None
   
   def getPvcCapacity(self):
-    capacity = self.pvcJson.get("spec").get("resources").get("requests").get("storage")
+    capacity = self.getRequestedStorage()
     #Convert to number
-    capacity = ocpValToInteger(capacity, "Gi")
+    (capacity,) = ocpValsToIntegers([capacity], "Gi")
     if DEBUG_MODE: print(f"pvcObject: capacity {capacity}Gi for pvc {self.name}")
     return capacity
 
+  def getPvcCapacityBytes(self):
+    capacity = self.getRequestedStorage()
+    (capacityBytes,) = ocpValsToIntegers([capacity], "")
+    return capacityBytes
+
   def getAccessModes(self):
-    self.pvcJson.get("spec").get("accessModes")
+    self.getPvcSpec().get("accessModes")
     return None
 
   def getStorageClass(self):
-    return self.pvcJson.get("spec").get("storageClassName")
+    return self.getPvcSpec().get("storageClassName")
 
   #pv name
   def getVolumeName(self):
-    return self.pvcJson.get("spec").get("volumeName")
+    return self.getPvcSpec().get("volumeName")
+
+  #The pvc json is only needed while the object is built, it is not copied back from compile workers (--jobs).
+  def __getstate__(self):
+    state = dict(self.__dict__)
+    state["pvcJson"] = None
+    return state
 #---------- End class pvcObject ----------#
 
+#---------- class ownerCache ----------#
+#Memoizes controlledBy() for one namespace. Each resource's owner is resolved once, including
+#resources with no owner or that could not be found, and ancestor lists are shared between
+#resources with a common owner chain.
+class ownerCache:
+
+  def __init__(self,namespace):
+    self.namespace=namespace
+    self.owners={}    #kind/name -> owner kind/name, or 0 if no owner (or not found)
+    self.ancestors={} #kind/name -> list of owners, nearest owner first
+    self.hits=0
+    self.misses=0
+
+  #Returns the owner of the resource in kind/name format, or 0 if there is none.
+  def getOwner(self, resourceIn):
+    if resourceIn in self.owners:
+      self.hits += 1
+      return self.owners[resourceIn]
+    self.misses += 1
+    owner = controlledBy(resourceIn, self.namespace)
+    self.owners[resourceIn] = owner
+    return owner
+
+  #Returns the list of all owners of the resource, from nearest owner up to the root owner.
+  def getAncestors(self, resourceIn):
+    if resourceIn in self.ancestors:
+      self.hits += 1
+      return list(self.ancestors[resourceIn])
+
+    #Walk up until we reach the root, or an owner whose ancestors are already known:
+    chain = []
+    tail = []
+    seen = {resourceIn}
+    owner = self.getOwner(resourceIn)
+    while owner and owner not in seen:
+      chain.append(owner)
+      if owner in self.ancestors:
+        self.hits += 1
+        tail = self.ancestors[owner]
+        break
+      seen.add(owner)
+      owner = self.getOwner(owner)
+
+    #Remember the ancestors of the resource and of every owner walked through:
+    fullList = chain + tail
+    self.ancestors[resourceIn] = fullList
+    for i, res in enumerate(chain):
+      if res not in self.ancestors:
+        self.ancestors[res] = fullList[i+1:]
+    return list(fullList)
+
+  #Drop what is known about the resource, after it changed or was deleted (watch mode).
+  #Returns the owner it had, or None if it was not cached.
+  def forget(self, resourceIn):
+    self.ancestors.pop(resourceIn, None)
+    return self.owners.pop(resourceIn, None)
+
+  #Drop all ancestor lists, after an owner moved to a different owner (watch mode).
+  def forgetAncestors(self):
+    self.ancestors.clear()
+
+  def getStats(self):
+    return {"hits": self.hits, "misses": self.misses, "resources": len(self.owners)}
+#---------- End class ownerCache ----------#
+
+#---------- class pagedPull ----------#
+#Pulls the pod and pvc lists in pages (fetchJsonPages()), one background thread per list, while another
+#thread pulls the other planned kinds (pullGlobalJson()). Pages, and then the other kinds, are handed to
+#the main thread through a queue holding at most PIPELINE_DEPTH pages, so the compile stage works on the
+#first page while the next ones are pulled and parsed, and a slow compile holds back the pull.
+#The threads only pull, the global dictionaries are set by the main thread (see compilePagedNamespaces()).
+class pagedPull:
+
+  def __init__(self, nameSpaceList, allNamespaces, fetchPlan):
+    self.nameSpaceList=nameSpaceList
+    self.allNamespaces=allNamespaces
+    self.fetchScope=getFetchScope(nameSpaceList, allNamespaces)
+    self.fetchPlan=fetchPlan
+    self.resources=[resource for resource in ("pods", "pvc") if resource in fetchPlan]
+    self.otherPlan={resource: projection for (resource, projection) in fetchPlan.items() if resource not in self.resources}
+    self.fetchErrors={} #[resource] = error string, of the paged lists
+    self.pageQueue=queue.Queue(maxsize=PIPELINE_DEPTH)
+    threading.Thread(target=self.pullOthers, daemon=True).start()
+    for resource in self.resources:
+      threading.Thread(target=self.pullPages, args=(resource, fetchPlan[resource]), daemon=True).start()
+
+  #Thread: queue (resource, page json, None) for each page, then (resource, None, error string or None) at the end.
+  def pullPages(self, resource, projection):
+    errStr = None
+    try:
+      for (pageJson, errStr) in fetchJsonPages(resource, self.fetchScope, projectionIn=projection):
+        if pageJson is None:
+          break
+        self.pageQueue.put((resource, pageJson, None))
+    except Exception as err:
+      errStr = f"{type(err).__name__}: {err}"
+    self.pageQueue.put((resource, None, errStr))
+
+  #Thread: queue (None, (pulled json, fetch errors), None) once the other kinds are pulled (see pullGlobalJson()).
+  def pullOthers(self):
+    try:
+      otherJson = pullGlobalJson(self.nameSpaceList, self.allNamespaces, self.otherPlan)
+    except Exception as err:
+      otherJson = ({resource: {"items": []} for resource in self.otherPlan},
+                   {resource: f"{type(err).__name__}: {err}" for resource in self.otherPlan})
+    self.pageQueue.put((None, otherJson, None))
+
+  #Generator, as they arrive: (resource, page json) for each page, (resource, None) at the end of each list,
+  #and (None, (pulled json, fetch errors)) for the other kinds. Ends when all are in.
+  #A failed list is recorded in self.fetchErrors, the pages before it are kept.
+  def getPages(self):
+    remaining = len(self.resources) + 1
+    while remaining:
+      (resource, pageJson, errStr) = self.pageQueue.get()
+      if resource is None or pageJson is None:
+        remaining -= 1
+      if errStr:
+        self.fetchErrors[resource] = errStr
+      yield (resource, pageJson)
+#---------- End class pagedPull ----------#
+
+#---------- class ocTransport ----------#
+#Cluster access through oc subprocesses (one process per call).
+class ocTransport:
+
+  def __init__(self):
+    self.name="oc"
+    self.apiResources=None #Discovery result, list of namespaced resource names
+    self.discoveryLock=threading.Lock()
+    self.groupPrefixes={} #[api group] = api path prefix of its preferred version, None if not found (getListPath())
+
+  #Get the json for a resource (kind, kind/name, or comma separated list of them).
+  #If namespaceIn is None, the resource is listed across all namespaces.
+  #selectorIn is an optional label selector (Ex: "app=zen,component in (a,b)") for a list.
+  #projectionIn is passed on to loadJsonStream() (default ITEM_PROJECTION).
+  #limitIn is passed to oc as --chunk-size: oc pages through the list itself and writes it as a single list,
+  #so there is never a continue token (continueIn is not used).
+  #Returns tuple of (json dictionary, error string). json dictionary is None on failure.
+  def getJson(self, resourceIn, namespaceIn, selectorIn=None, projectionIn=None, limitIn=None, continueIn=None):
+    nsArg = "--all-namespaces" if namespaceIn is None else f"-n {namespaceIn}"
+    cmdStr = f"oc get {resourceIn} {nsArg} -o json"
+    if selectorIn:
+      cmdStr += f" -l {shlex.quote(selectorIn)}"
+    if limitIn:
+      cmdStr += f" --chunk-size={limitIn}"
+    return self.runJson(cmdStr, resourceIn, namespaceIn, projectionIn)
+
+  #Run an oc command that writes json (see getJson()), for the given resource and namespace (for --profile).
+  #Returns tuple of (json dictionary, error string). json dictionary is None on failure.
+  def runJson(self, cmdStr, resourceIn, namespaceIn, projectionIn=None):
+    if DEBUG_MODE: print(f"ocTransport: {cmdStr}")
+    #The output is parsed while oc writes it, stderr goes to a file so it can not block oc.
+    #oc is killed if it runs past the call timeout.
+    callTimeout = getCallTimeout()
+    if callTimeout == 0:
+      return (None, RUN_BUDGET_ERROR)
+    startTime = time.perf_counter()
+    streamStats = {}
+    with tempfile.TemporaryFile() as errFile:
+      cmd = subprocess.Popen(shlex.split(cmdStr),stdout=subprocess.PIPE,stderr=errFile)
+      timedOut = threading.Event()
+      killTimer = threading.Timer(callTimeout, lambda: (timedOut.set(), cmd.kill()))
+      killTimer.start()
+      try:
+        jsonLoad = loadJsonStream(cmd.stdout, projectionIn, streamStats)
+        parseErr = None
+      except (ValueError, OSError) as err:
+        jsonLoad = None
+        parseErr = err
+        cmd.kill()
+      finally:
+        killTimer.cancel()
+      cmd.stdout.close()
+      rRC = cmd.wait()
+      errFile.seek(0)
+      rErr = errFile.read().decode(errors="replace")
+    errStr = None
+    if timedOut.is_set():
+      errStr = f"'{cmdStr}' timed out after {callTimeout:.1f}s"
+    elif rRC != 0:
+      errStr = f"'{cmdStr}' returned: '{rRC}'. stderr: '{rErr.strip()}'"
+    elif parseErr:
+      errStr = f"'{cmdStr}' returned invalid json: '{parseErr}'"
+    if GLOBAL_PROFILE is not None:
+      GLOBAL_PROFILE.addCall("oc", cmdStr, resourceIn, namespaceIn, startTime, None, streamStats.get("reader"), errStr)
+    if errStr:
+      return (None, errStr)
+    return (jsonLoad, None)
+
+  #Returns the api path of a resource kind's list (Ex: /api/v1/namespaces/zen/pods), or None if it is not known.
+  #A custom resource (Ex: zenservices.zen.cpd.ibm.com) is looked up in its group's preferred version.
+  def getListPath(self, resourceIn, namespaceIn):
+    resourceName = resourceIn.lower()
+    if resourceName in BUILTIN_API_ALIASES:
+      plural = BUILTIN_API_ALIASES[resourceName]
+      (prefix, namespaced, kind) = BUILTIN_API_RESOURCES[plural]
+    else:
+      (plural, sep, group) = resourceName.partition(".")
+      if not group:
+        return None
+      if group not in self.groupPrefixes:
+        if DEBUG_MODE: print(f"ocTransport: runIt 'oc get --raw /apis/{group}'")
+        (groupOut,rErr,rRC) = runIt(f"oc get --raw /apis/{shlex.quote(group)}")
+        try:
+          groupVersion = json.loads(groupOut)["preferredVersion"]["groupVersion"]
+        except (ValueError, KeyError, TypeError):
+          groupVersion = None
+        if rRC != 0 or not groupVersion:
+          if DEBUG_MODE: print(f"ocTransport: 'oc get --raw /apis/{group}' returned: '{rRC}'. stderr: '{rErr}'")
+          groupVersion = None
+        self.groupPrefixes[group] = f"/apis/{groupVersion}" if groupVersion else None
+      prefix = self.groupPrefixes[group]
+      if prefix is None:
+        return None
+      namespaced = True #getApiResources() only lists namespaced resources
+    path = prefix
+    if namespaced and namespaceIn is not None:
+      path += f"/namespaces/{urllib.parse.quote(namespaceIn)}"
+    return path + f"/{plural}"
+
+  #List a resource kind the way the API server returns it, as a watch starts from it (see watchResource()):
+  #the list keeps its kind (Ex: PodList) and resourceVersion, which 'oc get -o json' both drop.
+  #Falls back to getJson() (no resourceVersion) for a kind without a known api path.
+  #Returns tuple of (json dictionary, error string). json dictionary is None on failure.
+  def getListJson(self, resourceIn, namespaceIn):
+    path = self.getListPath(resourceIn, namespaceIn)
+    if path is None:
+      return self.getJson(resourceIn, namespaceIn)
+    (listJson, errStr) = self.runJson(f"oc get --raw {shlex.quote(path)}", resourceIn, namespaceIn)
+    if listJson is None:
+      return (None, errStr)
+    #Items in an api list do not carry kind/apiVersion, add them like oc does:
+    itemKind = listJson.get("kind","")[:-len("List")]
+    for item in listJson.get("items") or []:
+      item.setdefault("kind", itemKind)
+      item.setdefault("apiVersion", listJson.get("apiVersion"))
+    return (listJson, None)
+
+  #Follow changes to a resource kind. Generator of (event type, object), event type is ADDED, MODIFIED,
+  #DELETED, BOOKMARK or ERROR (object is then a Status, or holds a "message"). Ends when the watch stream ends.
+  #With resourceVersionIn the watch goes to the api path through 'oc get --raw', so it starts where the
+  #list ended (a plain 'oc get --watch-only' can not resume). Otherwise it starts from now.
+  def watchJson(self, resourceIn, namespaceIn, resourceVersionIn=None):
+    path = self.getListPath(resourceIn, namespaceIn) if resourceVersionIn else None
+    if path is not None:
+      query = urllib.parse.urlencode({"watch": 1, "allowWatchBookmarks": "true", "timeoutSeconds": WATCH_TIMEOUT,
+                                      "resourceVersion": resourceVersionIn})
+      cmdStr = f"oc get --raw {shlex.quote(path + '?' + query)}"
+    else:
+      nsArg = "--all-namespaces" if namespaceIn is None else f"-n {namespaceIn}"
+      cmdStr = f"oc get {resourceIn} {nsArg} --watch-only --output-watch-events -o json"
+    if DEBUG_MODE: print(f"ocTransport: {cmdStr}")
+    with tempfile.TemporaryFile() as errFile:
+      cmd = subprocess.Popen(shlex.split(cmdStr),stdout=subprocess.PIPE,stderr=errFile)
+      reader = jsonStreamReader(cmd.stdout, interactive=True)
+      try:
+        while reader.peek():
+          event = reader.readValue()
+          yield (event.get("type"), event.get("object"))
+      except ValueError as err:
+        yield ("ERROR", {"message": f"'{cmdStr}' returned invalid json: '{err}'"})
+      finally:
+        cmd.kill()
+        cmd.stdout.close()
+        rRC = cmd.wait()
+      errFile.seek(0)
+      rErr = errFile.read().decode(errors="replace")
+    if rErr.strip():
+      yield ("ERROR", {"message": f"'{cmdStr}' returned: '{rRC}'. stderr: '{rErr.strip()}'"})
+
+  #Read a container's log. Generator of (line bytes, None) for each line as oc writes it, then
+  #(None, error string) if oc failed or ran past the call timeout. previous reads the previous
+  #(restarted) container's log, sinceSeconds only the lines written in that many seconds.
+  def getLogLines(self, podIn, containerIn, namespaceIn, previous=False, sinceSeconds=None):
+    cmdStr = f"oc logs {podIn} -c {containerIn} -n {namespaceIn}"
+    if previous:
+      cmdStr += " --previous"
+    if sinceSeconds:
+      cmdStr += f" --since={max(1, int(sinceSeconds))}s"
+    if DEBUG_MODE: print(f"ocTransport: {cmdStr}")
+    callTimeout = getCallTimeout()
+    if callTimeout == 0:
+      yield (None, RUN_BUDGET_ERROR)
+      return
+    startTime = time.perf_counter()
+    bytesRead = 0
+    with tempfile.TemporaryFile() as errFile:
+      cmd = subprocess.Popen(shlex.split(cmdStr),stdout=subprocess.PIPE,stderr=errFile)
+      timedOut = threading.Event()
+      killTimer = threading.Timer(callTimeout, lambda: (timedOut.set(), cmd.kill()))
+      killTimer.start()
+      try:
+        for line in cmd.stdout:
+          bytesRead += len(line)
+          yield (line, None)
+        rRC = cmd.wait()
+      finally:
+        killTimer.cancel()
+        if cmd.poll() is None:
+          cmd.kill()
+          cmd.wait()
+        cmd.stdout.close()
+      errFile.seek(0)
+      rErr = errFile.read().decode(errors="replace")
+    errStr = None
+    if timedOut.is_set():
+      errStr = f"'{cmdStr}' timed out after {callTimeout:.1f}s"
+    elif rRC != 0:
+      errStr = f"'{cmdStr}' returned: '{rRC}'. stderr: '{rErr.strip()}'"
+    if GLOBAL_PROFILE is not None:
+      GLOBAL_PROFILE.addCall("oc", cmdStr, "pods/log", namespaceIn, startTime, bytesRead, None, errStr)
+    if errStr:
+      yield (None, errStr)
+
+  #Returns tuple of (list of namespaced api resource names, error string). Ex: "zenservices.zen.cpd.ibm.com"
+  #The result is kept for the rest of the run, and in the discovery cache file.
+  def getApiResources(self):
+    with self.discoveryLock:
+      if self.apiResources is not None:
+        return (self.apiResources, None)
+      clusterKey = self.getClusterKey()
+      cached = loadDiscoveryCache(clusterKey)
+      if cached:
+        self.apiResources = cached.get("apiResources")
+        return (self.apiResources, None)
+      if DEBUG_MODE: print(f"ocTransport: runIt 'oc api-resources --namespaced=true -o name'")
+      (resList,rErr,rRC) = runIt("oc api-resources --namespaced=true -o name")
+      if rRC != 0:
+        return (None, f"'oc api-resources --namespaced=true -o name' returned: '{rRC}'. stderr: '{rErr.strip()}'")
+      self.apiResources = resList.split()
+      saveDiscoveryCache(clusterKey, {"apiResources": self.apiResources})
+      return (self.apiResources, None)
+
+  #Returns the discovery cache key for the current cluster ("<api server url> <cluster version>"), or None.
+  #Finding it takes two oc calls, so the key is cached as well, per kubeconfig content (getKubeconfigKey()).
+  def getClusterKey(self):
+    configKey = getKubeconfigKey()
+    cached = loadDiscoveryCache(configKey)
+    if cached:
+      return cached.get("clusterKey")
+    (server,rErr,rRC) = runIt("oc whoami --show-server")
+    if rRC != 0:
+      if DEBUG_MODE: print(f"ocTransport: 'oc whoami --show-server' returned: '{rRC}'. stderr: '{rErr}'")
+      return None
+    (versionOut,rErr,rRC) = runIt("oc get --raw /version")
+    try:
+      version = json.loads(versionOut).get("gitVersion")
+    except (ValueError, AttributeError):
+      version = None
+    if rRC != 0 or not version:
+      if DEBUG_MODE: print(f"ocTransport: 'oc get --raw /version' returned: '{rRC}'. stderr: '{rErr}'")
+      return None
+    clusterKey = f"{server.strip()} {version}"
+    saveDiscoveryCache(configKey, {"clusterKey": clusterKey})
+    return clusterKey
+
+  def isLoginValid(self):
+    # oc cluster-info
+    #Kubernetes control plane is running at https://api.cpst-ocp-cluster-d.cpst-lab.no-users.ibm.com:6443
+    #
+    #To further debug and diagnose cluster problems, use 'kubectl cluster-info dump'.
+    if DEBUG_MODE: print(f"ocTransport: runIt 'oc cluster-info'")
+    (rOut,rErr,rRC) = runIt("oc cluster-info")
+    if rRC != 0:
+      if DEBUG_MODE: print(f"ocTransport: Error: 'oc cluster-info' returned: '{rRC}'. stderr: '{rErr}' ")
+      return False
+    return True
+
+  #Called in a compile worker process (--jobs). Each oc call is its own process, nothing to reset.
+  def resetConnections(self):
+    self.discoveryLock=threading.Lock()
+#---------- End class ocTransport ----------#
+
+#---------- class apiTransport ----------#
+#Cluster access by talking to the API server directly, over a pool of keep-alive connections.
+#Resources that can not be mapped to an API path are handed to the fallback transport (oc).
+class apiTransport:
+
+  def __init__(self, server, token=None, caData=None, caFile=None, insecure=False, certFile=None, keyFile=None, fallback=None):
+    self.name="api"
+    self.server=server.rstrip("/")
+    self.token=token
+    self.fallback=fallback
+    urlParts = urllib.parse.urlsplit(self.server)
+    self.scheme=urlParts.scheme
+    self.host=urlParts.hostname
+    self.port=urlParts.port
+    self.basePath=urlParts.path
+    self.sslContext=None
+    if self.scheme == "https":
+      self.sslContext = ssl.create_default_context(cafile=caFile, cadata=caData)
+      if insecure:
+        self.sslContext.check_hostname = False
+        self.sslContext.verify_mode = ssl.CERT_NONE
+      if certFile:
+        self.sslContext.load_cert_chain(certFile, keyFile)
+    self.idleConnections=queue.LifoQueue()
+    self.resourcePaths={} #Discovered resource names -> (api path prefix, plural, namespaced)
+    self.apiResources=None #Discovery result, list of namespaced resource names
+    self.discoveryFromCache=False #True if the discovery result was read from the discovery cache file
+    self.clusterVersion=None
+    self.discoveryLock=threading.Lock()
+
+  #Create an apiTransport from the current kubeconfig context (as shown by 'oc config view').
+  #Returns None if the context can not be used directly (Ex: exec credential plugins).
+  @classmethod
+  def fromKubeconfig(cls, fallback=None):
+    (rOut,rErr,rRC) = runIt("oc config view --minify --raw -o json")
+    if rRC != 0:
+      if DEBUG_MODE: print(f"apiTransport: 'oc config view' returned: '{rRC}'. stderr: '{rErr}'")
+      return None
+    try:
+      kubeConfig = json.loads(rOut)
+      cluster = kubeConfig.get("clusters")[0].get("cluster")
+      user = (kubeConfig.get("users") or [{}])[0].get("user") or {}
+    except (ValueError, TypeError, IndexError, AttributeError) as err:
+      if DEBUG_MODE: print(f"apiTransport: Unable to parse kubeconfig: {err}")
+      return None
+
+    token = user.get("token")
+    if not token and user.get("tokenFile"):
+      with open(user.get("tokenFile")) as tokenFile:
+        token = tokenFile.read().strip()
+    caData = None
+    if cluster.get("certificate-authority-data"):
+      caData = base64.b64decode(cluster.get("certificate-authority-data")).decode()
+
+    #Client certificates must be files for the ssl module:
+    certFile = user.get("client-certificate")
+    keyFile = user.get("client-key")
+    tempFiles = []
+    for (dataKey, fileSuffix) in (("client-certificate-data", ".crt"), ("client-key-data", ".key")):
+      if user.get(dataKey):
+        (fd, tempName) = tempfile.mkstemp(suffix=fileSuffix)
+        with os.fdopen(fd, "wb") as tempFile:
+          tempFile.write(base64.b64decode(user.get(dataKey)))
+        tempFiles.append(tempName)
+        if fileSuffix == ".crt": certFile = tempName
+        else: keyFile = tempName
+
+    if not token and not certFile:
+      if DEBUG_MODE: print(f"apiTransport: No token or client certificate in kubeconfig, can not use api transport")
+      return None
+    try:
+      return cls(cluster.get("server"), token=token, caData=caData, caFile=cluster.get("certificate-authority"),
+                 insecure=cluster.get("insecure-skip-tls-verify",False), certFile=certFile, keyFile=keyFile, fallback=fallback)
+    except (OSError, ssl.SSLError) as err:
+      if DEBUG_MODE: print(f"apiTransport: Unable to set up tls: {err}")
+      return None
+    finally:
+      for tempName in tempFiles:
+        os.remove(tempName)
+
+  def newConnection(self):
+    if self.scheme == "https":
+      return http.client.HTTPSConnection(self.host, self.port, context=self.sslContext)
+    return http.client.HTTPConnection(self.host, self.port)
+
+  #Send a GET for the given api path (with query string) on a pooled connection. Connections are
+  #reused across calls and threads. Returns tuple of (connection, response, error string).
+  #On success the caller reads the response, then hands the connection back with releaseConnection().
+  def openRequest(self, pathIn, acceptIn="application/json"):
+    headers = {"Accept": acceptIn}
+    if self.token:
+      headers["Authorization"] = f"Bearer {self.token}"
+    #Each socket operation (connect, send, each read of the response) is limited to the call timeout:
+    callTimeout = getCallTimeout()
+    if callTimeout == 0:
+      return (None, None, RUN_BUDGET_ERROR)
+
+    #A pooled connection may have been closed by the server, retry once on a new connection.
+    #A timeout is not retried here, the server is slow rather than the connection stale.
+    for attempt in (1, 2):
+      try:
+        conn = self.idleConnections.get_nowait()
+      except queue.Empty:
+        conn = self.newConnection()
+      conn.timeout = callTimeout
+      if conn.sock is not None:
+        conn.sock.settimeout(callTimeout)
+      try:
+        conn.request("GET", self.basePath + pathIn, headers=headers)
+        resp = conn.getresponse()
+        break
+      except (http.client.HTTPException, OSError) as err:
+        conn.close()
+        if attempt == 2 or isinstance(err, TimeoutError):
+          return (None, None, f"GET {pathIn} failed: {err or 'timed out'}")
+
+    if DEBUG_MODE: print(f"apiTransport: GET {pathIn} returned {resp.status}")
+    if resp.status >= 300:
+      body = resp.read()
+      self.releaseConnection(conn, resp)
+      try:
+        message = json.loads(body).get("message")
+      except (ValueError, AttributeError):
+        message = body[:200].decode(errors="replace")
+      return (None, resp, f"GET {pathIn} returned: '{resp.status}'. message: '{message}'")
+    return (conn, resp, None)
+
+  #Return a connection to the pool once its response has been read.
+  def releaseConnection(self, conn, resp):
+    resp.read()
+    if resp.will_close:
+      conn.close()
+    else:
+      self.idleConnections.put(conn)
+
+  #GET the given api path and read the whole response.
+  #Returns tuple of (http status, body bytes, error string). Error string is None on a 2xx status.
+  def request(self, pathIn, acceptIn="application/json"):
+    startTime = time.perf_counter()
+    (conn, resp, errStr) = self.openRequest(pathIn, acceptIn)
+    body = b""
+    if not errStr:
+      try:
+        body = resp.read()
+        self.releaseConnection(conn, resp)
+      except (http.client.HTTPException, OSError) as err:
+        conn.close()
+        (resp, errStr) = (None, f"GET {pathIn} failed: {err}")
+    if GLOBAL_PROFILE is not None:
+      GLOBAL_PROFILE.addCall("api", f"GET {pathIn}", None, None, startTime, len(body), None, errStr)
+    if errStr:
+      return (resp.status if resp else 0, b"", errStr)
+    return (resp.status, body, None)
+
+  #Map a resource name (Ex: pod, pods, pvc, deployment.apps, zenservice) to (api path prefix, plural, namespaced).
+  #Returns None if the name is unknown.
+  def resolveResource(self, resourceName):
+    resourceName = resourceName.lower()
+    if resourceName in BUILTIN_API_ALIASES:
+      plural = BUILTIN_API_ALIASES[resourceName]
+      (prefix, namespaced, kind) = BUILTIN_API_RESOURCES[plural]
+      return (prefix, plural, namespaced)
+    if resourceName not in self.resourcePaths:
+      self.getApiResources()
+      #A cached discovery result may be older than the resource type, look again once:
+      if resourceName not in self.resourcePaths and self.discoveryFromCache:
+        if DEBUG_MODE: print(f"apiTransport: '{resourceName}' not in cached discovery, refreshing discovery")
+        self.getApiResources(refresh=True)
+    return self.resourcePaths.get(resourceName)
+
+  #Get the json for a resource (kind, kind/name, or comma separated list of them), like 'oc get -o json'.
+  #If namespaceIn is None, the resource is listed across all namespaces.
+  #selectorIn is an optional label selector for a list, sent as the labelSelector query parameter.
+  #projectionIn is passed on to loadJsonStream() (default ITEM_PROJECTION).
+  #limitIn and continueIn page through a single list (limit/continue query parameters). The list's
+  #metadata.continue then holds the token for the next page, it is missing on the last page.
+  #A list of a built in kind whose projection only keeps metadata is pulled without the spec and status
+  #(METADATA_LIST_ACCEPT), servers that can not do that send the whole list.
+  #Returns tuple of (json dictionary, error string). json dictionary is None on failure.
+  def getJson(self, resourceIn, namespaceIn, selectorIn=None, projectionIn=None, limitIn=None, continueIn=None):
+    metadataOnly = projectionIn is not None and projectionIn.keys() <= METADATA_FIELDS
+    requests = []
+    resourceList = resourceIn.split(",")
+    for resource in resourceList:
+      (kindName, sep, objName) = resource.partition("/")
+      resolved = self.resolveResource(kindName)
+      if resolved is None:
+        if self.fallback:
+          if DEBUG_MODE: print(f"apiTransport: '{kindName}' not known to api transport, using {self.fallback.name}")
+          return self.fallback.getJson(resourceIn, namespaceIn, selectorIn, projectionIn, limitIn, continueIn)
+        return (None, f"Unknown resource type '{kindName}'")
+      (prefix, plural, namespaced) = resolved
+      path = prefix
+      if namespaced and namespaceIn is not None:
+        path += f"/namespaces/{urllib.parse.quote(namespaceIn)}"
+      path += f"/{plural}"
+      if objName:
+        path += f"/{urllib.parse.quote(objName)}"
+      else:
+        query = {}
+        if selectorIn:
+          query["labelSelector"] = selectorIn
+        #Pages only make sense for a single list:
+        if limitIn and len(resourceList) == 1:
+          query["limit"] = limitIn
+          if continueIn:
+            query["continue"] = continueIn
+        if query:
+          path += "?" + urllib.parse.urlencode(query)
+      #(kind, apiVersion) of the items of a metadata only list, they come back as PartialObjectMetadata:
+      metadataKind = None
+      if metadataOnly and not objName and plural in BUILTIN_API_RESOURCES and prefix == BUILTIN_API_RESOURCES[plural][0]:
+        metadataKind = (BUILTIN_API_RESOURCES[plural][2], prefix.split("/",2)[2])
+      requests.append((path, bool(objName), metadataKind))
+
+    itemsOut = []
+    listMetadata = {"resourceVersion": ""}
+    for (path, isSingle, metadataKind) in requests:
+      startTime = time.perf_counter()
+      streamStats = {}
+      (conn, resp, errStr) = self.openRequest(path, METADATA_LIST_ACCEPT if metadataKind else "application/json")
+      if not errStr:
+        try:
+          jsonLoad = loadJsonStream(resp, projectionIn, streamStats)
+          self.releaseConnection(conn, resp)
+        except (ValueError, http.client.HTTPException, OSError) as err:
+          conn.close()
+          errStr = f"GET {path} failed: '{err}'"
+      if GLOBAL_PROFILE is not None:
+        GLOBAL_PROFILE.addCall("api", f"GET {path}", resourceIn, namespaceIn, startTime, None, streamStats.get("reader"), errStr)
+      if errStr:
+        return (None, errStr)
+      if isSingle:
+        if len(requests) == 1:
+          return (jsonLoad, None)
+        itemsOut.append(jsonLoad)
+        continue
+      #A single list keeps its resourceVersion, so a watch can start where the list ended, and its continue token:
+      if len(requests) == 1:
+        metadata = jsonLoad.get("metadata") or {}
+        listMetadata["resourceVersion"] = metadata.get("resourceVersion","")
+        if metadata.get("continue"):
+          listMetadata["continue"] = metadata.get("continue")
+      #Items in an api list do not carry kind/apiVersion, add them like oc does:
+      if metadataKind and jsonLoad.get("kind") == "PartialObjectMetadataList":
+        for item in jsonLoad.get("items") or []:
+          (item["kind"], item["apiVersion"]) = metadataKind
+          itemsOut.append(item)
+        continue
+      itemKind = jsonLoad.get("kind","")[:-len("List")]
+      itemApiVersion = jsonLoad.get("apiVersion")
+      for item in jsonLoad.get("items") or []:
+        item.setdefault("kind", itemKind)
+        item.setdefault("apiVersion", itemApiVersion)
+        itemsOut.append(item)
+    return ({"apiVersion": "v1", "kind": "List", "items": itemsOut, "metadata": listMetadata}, None)
+
+  #List a resource kind the way the API server returns it, like ocTransport.getListJson(): the list keeps
+  #its kind (Ex: PodList) and resourceVersion, so a watch can start from it (see watchResource()).
+  #Returns tuple of (json dictionary, error string). json dictionary is None on failure.
+  def getListJson(self, resourceIn, namespaceIn):
+    resolved = self.resolveResource(resourceIn)
+    if resolved is None:
+      if self.fallback:
+        return self.fallback.getListJson(resourceIn, namespaceIn)
+      return (None, f"Unknown resource type '{resourceIn}'")
+    (prefix, plural, namespaced) = resolved
+    path = prefix
+    if namespaced and namespaceIn is not None:
+      path += f"/namespaces/{urllib.parse.quote(namespaceIn)}"
+    path += f"/{plural}"
+    startTime = time.perf_counter()
+    streamStats = {}
+    (conn, resp, errStr) = self.openRequest(path)
+    if not errStr:
+      try:
+        listJson = loadJsonStream(resp, None, streamStats)
+        self.releaseConnection(conn, resp)
+      except (ValueError, http.client.HTTPException, OSError) as err:
+        conn.close()
+        errStr = f"GET {path} failed: '{err}'"
+    if GLOBAL_PROFILE is not None:
+      GLOBAL_PROFILE.addCall("api", f"GET {path}", resourceIn, namespaceIn, startTime, None, streamStats.get("reader"), errStr)
+    if errStr:
+      return (None, errStr)
+    itemKind = listJson.get("kind","")[:-len("List")]
+    for item in listJson.get("items") or []:
+      item.setdefault("kind", itemKind)
+      item.setdefault("apiVersion", listJson.get("apiVersion"))
+    return (listJson, None)
+
+  #Follow changes to a resource kind. Generator of (event type, object), event type is ADDED, MODIFIED,
+  #DELETED, BOOKMARK or ERROR (object is then a Status, or holds a "message"). Ends when the watch stream ends.
+  #Starts from resourceVersionIn if given, otherwise with an ADDED event for every existing object.
+  #A watch holds its connection open, so it uses its own connection instead of the pool.
+  def watchJson(self, resourceIn, namespaceIn, resourceVersionIn=None):
+    resolved = self.resolveResource(resourceIn)
+    if resolved is None:
+      if self.fallback:
+        yield from self.fallback.watchJson(resourceIn, namespaceIn, resourceVersionIn)
+        return
+      yield ("ERROR", {"message": f"Unknown resource type '{resourceIn}'"})
+      return
+    (prefix, plural, namespaced) = resolved
+    path = prefix
+    if namespaced and namespaceIn is not None:
+      path += f"/namespaces/{urllib.parse.quote(namespaceIn)}"
+    path += f"/{plural}?watch=1&allowWatchBookmarks=true&timeoutSeconds={WATCH_TIMEOUT}"
+    if resourceVersionIn:
+      path += f"&resourceVersion={urllib.parse.quote(resourceVersionIn)}"
+
+    headers = {"Accept": "application/json"}
+    if self.token:
+      headers["Authorization"] = f"Bearer {self.token}"
+    conn = self.newConnection()
+    try:
+      conn.request("GET", self.basePath + path, headers=headers)
+      resp = conn.getresponse()
+      if DEBUG_MODE: print(f"apiTransport: GET {path} returned {resp.status}")
+      if resp.status >= 300:
+        try:
+          status = json.loads(resp.read())
+        except ValueError:
+          status = {}
+        status.setdefault("code", resp.status)
+        yield ("ERROR", status)
+        return
+      reader = jsonStreamReader(resp, interactive=True)
+      while reader.peek():
+        event = reader.readValue()
+        yield (event.get("type"), event.get("object"))
+    except (ValueError, http.client.HTTPException, OSError) as err:
+      yield ("ERROR", {"message": f"GET {path} failed: '{err}'"})
+    finally:
+      conn.close()
+
+  #Read a container's log (pods/log subresource), like ocTransport.getLogLines(). The response is read
+  #line by line on a pooled connection, so only the current line is held in memory.
+  def getLogLines(self, podIn, containerIn, namespaceIn, previous=False, sinceSeconds=None):
+    query = {"container": containerIn}
+    if previous:
+      query["previous"] = "true"
+    if sinceSeconds:
+      query["sinceSeconds"] = max(1, int(sinceSeconds))
+    path = f"/api/v1/namespaces/{urllib.parse.quote(namespaceIn)}/pods/{urllib.parse.quote(podIn)}/log?{urllib.parse.urlencode(query)}"
+    startTime = time.perf_counter()
+    bytesRead = 0
+    (conn, resp, errStr) = self.openRequest(path, "text/plain")
+    if not errStr:
+      finished = False
+      try:
+        for line in resp:
+          bytesRead += len(line)
+          yield (line, None)
+        self.releaseConnection(conn, resp)
+        finished = True
+      except (http.client.HTTPException, OSError) as err:
+        errStr = f"GET {path} failed: {err or 'timed out'}"
+      finally:
+        #A search stopped part way leaves unread data on the connection, it can not be reused:
+        if not finished:
+          conn.close()
+    if GLOBAL_PROFILE is not None:
+      GLOBAL_PROFILE.addCall("api", f"GET {path}", "pods/log", namespaceIn, startTime, bytesRead, None, errStr)
+    if errStr:
+      yield (None, errStr)
+
+  #Returns tuple of (list of namespaced api resource names, error string), like 'oc api-resources --namespaced=true -o name'.
+  #Uses aggregated discovery (one call each for /api and /apis) when the server supports it.
+  #The result is kept for the rest of the run, and in the discovery cache file. refresh ignores both.
+  def getApiResources(self, refresh=False):
+    with self.discoveryLock:
+      if refresh:
+        if not self.discoveryFromCache:
+          return (self.apiResources, None) #Already refreshed
+      elif self.apiResources is not None:
+        return (self.apiResources, None)
+      clusterKey = self.getClusterKey()
+      cached = None if refresh else loadDiscoveryCache(clusterKey)
+      #An entry written by the oc transport only has the resource names, not their api paths:
+      if cached and cached.get("resourcePaths") is not None:
+        for name, pathInfo in cached.get("resourcePaths").items():
+          self.resourcePaths[name] = tuple(pathInfo)
+        self.apiResources = cached.get("apiResources")
+        self.discoveryFromCache = True
+        return (self.apiResources, None)
+      apiResources = []
+      for rootPath in ("/api", "/apis"):
+        (status, body, errStr) = self.request(rootPath, AGGREGATED_DISCOVERY_ACCEPT)
+        if errStr:
+          return (None, errStr)
+        discovery = json.loads(body)
+        if discovery.get("kind") == "APIGroupDiscoveryList":
+          for group in discovery.get("items",[]):
+            groupName = group.get("metadata",{}).get("name","")
+            versions = group.get("versions") or [{}]
+            version = versions[0] #Versions are in order of preference
+            for res in version.get("resources") or []:
+              self.addApiResource(apiResources, groupName, version.get("version"), res.get("resource"),
+                                  res.get("scope") == "Namespaced", res.get("responseKind",{}).get("kind",""),
+                                  res.get("singularResource"), res.get("shortNames"))
+        elif rootPath == "/api":
+          #Core group, non aggregated discovery:
+          for version in discovery.get("versions",[]):
+            errStr = self.addApiResourceList(apiResources, "", version)
+            if errStr: return (None, errStr)
+        else:
+          for group in discovery.get("groups",[]):
+            errStr = self.addApiResourceList(apiResources, group.get("name"), group.get("preferredVersion",{}).get("version"))
+            if errStr: return (None, errStr)
+      self.apiResources = apiResources
+      self.discoveryFromCache = False
+      if DEBUG_MODE: print(f"apiTransport: discovered {len(apiResources)} namespaced resources")
+      saveDiscoveryCache(clusterKey, {"apiResources": apiResources, "resourcePaths": self.resourcePaths})
+      return (self.apiResources, None)
+
+  #Discovery for one group version, for servers without aggregated discovery.
+  def addApiResourceList(self, apiResources, groupName, versionName):
+    path = f"/api/{versionName}" if groupName == "" else f"/apis/{groupName}/{versionName}"
+    (status, body, errStr) = self.request(path)
+    if errStr:
+      return errStr
+    for res in json.loads(body).get("resources",[]):
+      if "/" in res.get("name"):
+        continue #Subresource
+      self.addApiResource(apiResources, groupName, versionName, res.get("name"), res.get("namespaced"),
+                          res.get("kind",""), res.get("singularName"), res.get("shortNames"))
+    return None
+
+  def addApiResource(self, apiResources, groupName, versionName, plural, namespaced, kind, singular, shortNames):
+    prefix = f"/api/{versionName}" if groupName == "" else f"/apis/{groupName}/{versionName}"
+    fullName = plural if groupName == "" else f"{plural}.{groupName}"
+    pathInfo = (prefix, plural, namespaced)
+    self.resourcePaths[fullName] = pathInfo
+    for name in [plural, singular, kind.lower()] + (shortNames or []):
+      if name:
+        self.resourcePaths.setdefault(name.lower(), pathInfo)
+    if namespaced:
+      apiResources.append(fullName)
+
+  #Returns the discovery cache key for the cluster ("<api server url> <cluster version>"), or None.
+  def getClusterKey(self):
+    if self.clusterVersion is None and not self.isLoginValid():
+      return None
+    return f"{self.server} {self.clusterVersion}"
+
+  def isLoginValid(self):
+    (status, body, errStr) = self.request("/version")
+    if errStr:
+      if DEBUG_MODE: print(f"apiTransport: Error: {errStr}")
+      return False
+    try:
+      self.clusterVersion = json.loads(body).get("gitVersion")
+    except (ValueError, AttributeError):
+      self.clusterVersion = None
+    return True
+
+  #Called in a forked compile worker process (--jobs). The pooled connections are shared with the parent
+  #process, so they are dropped (not closed) and the worker opens its own.
+  def resetConnections(self):
+    self.idleConnections=queue.LifoQueue()
+    self.discoveryLock=threading.Lock()
+    if self.fallback:
+      self.fallback.resetConnections()
+#---------- End class apiTransport ----------#
+
+#---------- class jsonStreamReader ----------#
+#Incremental json parsing over a binary file-like object (oc stdout, http response).
+#Only the text not yet parsed is held in memory.
+#With interactive set (watch streams), each read returns what is available instead of waiting for a full chunk.
+class jsonStreamReader:
+
+  def __init__(self, fileIn, interactive=False):
+    self.fileIn=fileIn
+    self.readFunc=fileIn.read1 if interactive else fileIn.read
+    self.textDecoder=codecs.getincrementaldecoder("utf-8")()
+    self.jsonDecoder=json.JSONDecoder()
+    self.buf=""
+    self.pos=0
+    self.eof=False
+    self.readSize=JSON_STREAM_CHUNK
+    self.createdTime=time.perf_counter()
+    self.bytesRead=0
+    self.readSeconds=0.0 #Time spent waiting for data (the rest of the time is spent parsing)
+    self.firstByteTime=None
+
+  #Read more text, dropping what was already parsed. Returns False at end of stream.
+  def fill(self):
+    if self.eof:
+      return False
+    readStart = time.perf_counter()
+    chunk = self.readFunc(self.readSize)
+    self.readSeconds += time.perf_counter() - readStart
+    self.bytesRead += len(chunk)
+    if self.firstByteTime is None and chunk:
+      self.firstByteTime = time.perf_counter()
+    if not chunk:
+      self.eof = True
+      self.buf = self.buf[self.pos:] + self.textDecoder.decode(b"", final=True)
+    else:
+      self.buf = self.buf[self.pos:] + self.textDecoder.decode(chunk)
+    self.pos = 0
+    return True
+
+  #Returns the next non-whitespace character without consuming it ("" at end of stream).
+  def peek(self):
+    while True:
+      while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+        self.pos += 1
+      if self.pos < len(self.buf) or not self.fill():
+        return self.buf[self.pos:self.pos+1]
+
+  def expect(self, charIn):
+    if self.peek() != charIn:
+      raise ValueError(f"Expecting '{charIn}' at '{self.buf[self.pos:self.pos+20]}'")
+    self.pos += 1
+
+  #Parse and return the next complete json value.
+  def readValue(self):
+    self.peek()
+    while True:
+      try:
+        (value, end) = self.jsonDecoder.raw_decode(self.buf, self.pos)
+        #A number is complete once a delimiter follows it (it may continue in the next chunk):
+        if self.eof or type(value) not in (int, float) or (end < len(self.buf) and self.buf[end] in " \t\r\n,]}:"):
+          self.pos = end
+          self.readSize = JSON_STREAM_CHUNK
+          return value
+      except json.JSONDecodeError:
+        if self.eof:
+          raise
+      #Incomplete value, read more. Grow the read size so large values are not re-parsed too often.
+      self.fill()
+      self.readSize *= 2
+#---------- End class jsonStreamReader ----------#
+
+#---------- class recordWriter ----------#
+#Writes output records (dictionaries with the OUTPUT_FIELDS keys) in ndjson, csv or json format.
+#Each record is written as soon as it is given, nothing is kept in memory.
+class recordWriter:
+
+  def __init__(self,formatIn,fileOut):
+    self.format=formatIn
+    self.fileOut=fileOut
+    self.count=0
+    if self.format == "csv":
+      self.csvWriter = csv.writer(fileOut)
+      self.csvWriter.writerow(OUTPUT_FIELDS)
+    elif self.format == "json":
+      fileOut.write("[")
+
+  def write(self, recordIn):
+    if self.format == "csv":
+      row = []
+      for field in OUTPUT_FIELDS:
+        value = recordIn.get(field)
+        if type(value) is list:
+          value = ";".join(value)
+        elif type(value) is bool:
+          value = "true" if value else "false"
+        row.append("" if value is None else value)
+      self.csvWriter.writerow(row)
+    elif self.format == "json":
+      self.fileOut.write(("\n" if self.count == 0 else ",\n") + json.dumps(recordIn))
+    else:
+      self.fileOut.write(json.dumps(recordIn) + "\n")
+    self.count += 1
+
+  def close(self):
+    if self.format == "json":
+      self.fileOut.write("\n]\n")
+    self.fileOut.flush()
+#---------- End class recordWriter ----------#
+
+#---------- class profileRecorder ----------#
+#Timings collected with --profile: pipeline stages, external calls (oc commands, exec'd commands and
+#API requests) and cache miss fallbacks, written as a json report at exit (writeReport()).
+#Times are seconds, "start" values are relative to startTime. Calls may be added from several threads.
+class profileRecorder:
+
+  def __init__(self, fileName, startTime=None):
+    self.fileName=fileName
+    self.startTime=time.perf_counter() if startTime is None else startTime
+    self.started=time.strftime("%Y-%m-%dT%H:%M:%S%z")
+    self.lock=threading.Lock()
+    self.stages=[]
+    self.calls=[]
+    self.fallbacks=collections.defaultdict(collections.Counter) #[namespace][kind] = getJsonForResource() calls
+    self.lazyLoads=collections.defaultdict(list) #[namespace] = resources loaded by loadUnplannedKind()
+    self.ownerCaches=collections.defaultdict(collections.Counter) #[namespace] = ownerCache stats
+
+  def addStage(self, stageName, nameSpace, startTime):
+    endTime = time.perf_counter()
+    with self.lock:
+      self.stages.append({"stage": stageName, "namespace": nameSpace, "start": round(startTime - self.startTime, 6),
+                          "seconds": round(endTime - startTime, 6)})
+
+  #bytesIn is the response size, or None to take it from streamReader (a jsonStreamReader, which also gives
+  #the time to the first byte and the time spent waiting for data; the rest of its time is parse time).
+  def addCall(self, transport, callDesc, resource, nameSpace, startTime, bytesIn, streamReader, errStr):
+    endTime = time.perf_counter()
+    seconds = endTime - startTime
+    (latency, parseSeconds) = (seconds, 0.0)
+    if streamReader is not None:
+      bytesIn = streamReader.bytesRead
+      if streamReader.firstByteTime is not None:
+        latency = streamReader.firstByteTime - startTime
+      parseSeconds = max(0.0, endTime - streamReader.createdTime - streamReader.readSeconds)
+    with self.lock:
+      self.calls.append({"transport": transport, "call": callDesc, "resource": resource, "namespace": nameSpace,
+                         "start": round(startTime - self.startTime, 6), "seconds": round(seconds, 6),
+                         "latency": round(latency, 6), "bytes": bytesIn or 0, "parseSeconds": round(parseSeconds, 6),
+                         "error": errStr})
+
+  def addFallback(self, nameSpace, resource):
+    with self.lock:
+      self.fallbacks[nameSpace][resource.split("/")[0].lower()] += 1
+
+  def addLazyLoad(self, nameSpace, resource):
+    with self.lock:
+      self.lazyLoads[nameSpace].append(resource)
+
+  def addOwnerCache(self, nameSpace, cacheStats):
+    with self.lock:
+      self.ownerCaches[nameSpace].update(cacheStats)
+
+  #Hand the records over from a compile worker process (--jobs) to the main process (mergeRecords()).
+  def takeRecords(self):
+    with self.lock:
+      records = {"stages": self.stages, "calls": self.calls, "fallbacks": dict(self.fallbacks),
+                 "lazyLoads": dict(self.lazyLoads), "ownerCaches": dict(self.ownerCaches)}
+      self.stages=[]
+      self.calls=[]
+      self.fallbacks=collections.defaultdict(collections.Counter)
+      self.lazyLoads=collections.defaultdict(list)
+      self.ownerCaches=collections.defaultdict(collections.Counter)
+    return records
+
+  def mergeRecords(self, records):
+    with self.lock:
+      self.stages.extend(records["stages"])
+      self.calls.extend(records["calls"])
+      for nameSpace, counts in records["fallbacks"].items():
+        self.fallbacks[nameSpace].update(counts)
+      for nameSpace, resources in records["lazyLoads"].items():
+        self.lazyLoads[nameSpace].extend(resources)
+      for nameSpace, cacheStats in records["ownerCaches"].items():
+        self.ownerCaches[nameSpace].update(cacheStats)
+
+  #Totals per stage, per resource kind and per namespace, to find the slow ones.
+  def getSummary(self):
+    stageTotals = collections.defaultdict(float)
+    for stage in self.stages:
+      stageTotals[stage["stage"]] += stage["seconds"]
+    kindTotals = {}
+    nameSpaceTotals = {}
+    for call in self.calls:
+      kind = (call["resource"] or call["transport"]).split("/")[0]
+      for (totals, key) in ((kindTotals, kind), (nameSpaceTotals, call["namespace"] or "(cluster)")):
+        entry = totals.setdefault(key, {"calls": 0, "seconds": 0.0, "bytes": 0, "parseSeconds": 0.0, "errors": 0})
+        entry["calls"] += 1
+        entry["seconds"] += call["seconds"]
+        entry["bytes"] += call["bytes"]
+        entry["parseSeconds"] += call["parseSeconds"]
+        entry["errors"] += 1 if call["error"] else 0
+    for stage in self.stages:
+      if stage["namespace"]:
+        entry = nameSpaceTotals.setdefault(stage["namespace"], {"calls": 0, "seconds": 0.0, "bytes": 0, "parseSeconds": 0.0, "errors": 0})
+        entry.setdefault("stages", {})
+        entry["stages"][stage["stage"]] = round(entry["stages"].get(stage["stage"], 0.0) + stage["seconds"], 6)
+    for totals in (kindTotals, nameSpaceTotals):
+      for entry in totals.values():
+        entry["seconds"] = round(entry["seconds"], 6)
+        entry["parseSeconds"] = round(entry["parseSeconds"], 6)
+    return {"stages": {stageName: round(seconds, 6) for stageName, seconds in stageTotals.items()},
+            "kinds": dict(sorted(kindTotals.items(), key=lambda entry: entry[1]["seconds"], reverse=True)),
+            "namespaces": dict(sorted(nameSpaceTotals.items(), key=lambda entry: entry[1]["seconds"], reverse=True)),
+            "fallbacks": sum(sum(counts.values()) for counts in self.fallbacks.values())}
+
+  #Write the json report to fileName ("-" for stderr). Registered with atexit by main().
+  def writeReport(self):
+    report = {
+      "version": 1,
+      "started": self.started,
+      "argv": sys.argv[1:],
+      "transport": ACTIVE_TRANSPORT.name if ACTIVE_TRANSPORT else ("snapshot" if SNAPSHOT_REPLAY else TRANSPORT_TYPE),
+      "totalSeconds": round(time.perf_counter() - self.startTime, 6),
+      "summary": self.getSummary(),
+      "stages": self.stages,
+      "calls": self.calls,
+      "fallbacks": self.fallbacks,
+      "lazyLoads": self.lazyLoads,
+      "ownerCaches": self.ownerCaches,
+    }
+    try:
+      if self.fileName == "-":
+        json.dump(report, sys.__stderr__, indent=1)
+        sys.__stderr__.write("\n")
+      else:
+        with open(self.fileName, "w") as reportFile:
+          json.dump(report, reportFile, indent=1)
+    except OSError as err:
+      print(f"Error: Failed to write profile report '{self.fileName}': {err}",file=sys.__stderr__)
+#---------- End class profileRecorder ----------#
+
 #---------- class serviceObject ----------#
 class serviceObject:
 
@@ -367,7 +1661,13 @@ class serviceObject:
     self.totalPvcCapacity=0
     self.requestedMemory=0
     self.requestedCpu=0
+    self.limitMemory=0
+    self.limitCpu=0
+    self.usedMemory=0 #Usage from the metrics API, of the pods with metrics (usagePods)
+    self.usedCpu=0
+    self.usagePods=0
     self.nodeName="" #Which node the pod is running on
+    self.events={} #Events of the service, its owner chains, pods and pvcs (-E), dictionary: [kind/name] = list of eventEntry
 
   def getPvcs(self):
     return self.pvcList
@@ -379,17 +1679,43 @@ class serviceObject:
     if podobj.getStatus() == "Running" or podobj.getStatus() == "Pending":
       self.requestedMemory += podobj.memoryRequest
       self.requestedCpu += podobj.cpuRequest
+      self.limitMemory += podobj.memoryLimit
+      self.limitCpu += podobj.cpuLimit
+
+  #Remove pod name from list, and decrement mem and cpu totals (watch mode)
+  def removePod(self, podobj):
+    self.podList.remove(podobj.name)
+    if podobj.getStatus() == "Running" or podobj.getStatus() == "Pending":
+      self.requestedMemory -= podobj.memoryRequest
+      self.requestedCpu -= podobj.cpuRequest
+      self.limitMemory -= podobj.memoryLimit
+      self.limitCpu -= podobj.cpuLimit
+
+  #Add a pod's metrics API usage to the usage totals (attachPodUsage())
+  def addPodUsage(self, podobj):
+    self.usedMemory += podobj.memoryUsage
+    self.usedCpu += podobj.cpuUsage
+    self.usagePods += 1
 
   #Add pvc name to list
   def addPvc(self, pvcobj):
     self.pvcList.append(pvcobj.name)
-    self.totalPvcCapacity += pvcobj.getPvcCapacity()
+    self.totalPvcCapacity += pvcobj.capacity
+
+  #Remove pvc name from list (watch mode)
+  def removePvc(self, pvcobj):
+    self.pvcList.remove(pvcobj.name)
+    self.totalPvcCapacity -= pvcobj.capacity
+
+  #Totals shown by the summary, cpu, memory and pvc print modes. Used to find services that changed.
+  def getTotals(self):
+    return (self.requestedCpu, self.requestedMemory, self.totalPvcCapacity, len(self.podList), len(self.pvcList))
 
   def getPodList(self):
     return self.podList
   
   #Pretty print the service's pod and pvc details:
-  def printPodTree(self, summary=False):
+  def printPodTree(self, summary=False, fileOut=None):
     '''
     Service: mykind/myserviceinstance
         Total Requested Memory: 12700Ki
@@ -400,86 +1726,106 @@ class serviceObject:
         Pvcs:
             pvc-1-yo
     '''
-    print(f"Service (Primary Owner): {self.longName}")
+    print(f"Service (Primary Owner): {self.longName}",file=fileOut)
 
     reducedMem=reduceValue(f"{self.requestedMemory}Ki")
-    print(f"{ASPACE:4}Total Requested Memory: {self.requestedMemory}Ki ({reducedMem})")
+    print(f"{ASPACE:4}Total Requested Memory: {self.requestedMemory}Ki ({reducedMem})",file=fileOut)
     reducedCpu=reduceValue(f"{self.requestedCpu}m")
-    print(f"{ASPACE:4}Total Requested CPU: {self.requestedCpu}m ({reducedCpu})")
-    print(f"{ASPACE:4}Total PVC Capacity: {self.totalPvcCapacity}Gi")
+    print(f"{ASPACE:4}Total Requested CPU: {self.requestedCpu}m ({reducedCpu})",file=fileOut)
+    print(f"{ASPACE:4}Total PVC Capacity: {self.totalPvcCapacity}Gi",file=fileOut)
 
     #If only printing summary, return now:
     if summary:
       return
 
     #Print pods:
-    print(f"{ASPACE:4}Pods:")
+    print(f"{ASPACE:4}Pods:",file=fileOut)
     if len(self.podList) == 0:
-      print(f"{ASPACE:8}None")
+      print(f"{ASPACE:8}None",file=fileOut)
     else:
+      podObjects = GLOBAL_POD_OBJECTS[self.namespace]
       for pod in self.podList:
-        print(f"{ASPACE:8}Name: {pod}")
-        print(f"{ASPACE:12}Resources: cpu:{GLOBAL_POD_OBJECTS[self.namespace][pod].cpuRequest}m/mem:{GLOBAL_POD_OBJECTS[self.namespace][pod].memoryRequest}Ki")
-        print(f"{ASPACE:12}Status: {GLOBAL_POD_OBJECTS[self.namespace][pod].getStatus()}")
-        print(f"{ASPACE:12}Node: {GLOBAL_POD_OBJECTS[self.namespace][pod].getNodeName()}")
-        #Print ownership path list in a formatted way:
-        print(f"{ASPACE:12}Ownership Path: {GLOBAL_POD_OBJECTS[self.namespace][pod].getOwnerHierarchy()}")
-        #print(f"{ASPACE:12}Ownership Path:")
-        #for owner in GLOBAL_POD_OBJECTS[self.namespace][pod].getOwnerHierarchy():
-        #  print(f"{ASPACE:16}{owner}")
-
-        print(f"{ASPACE:12}PVC Mounts: {GLOBAL_POD_OBJECTS[self.namespace][pod].getPvcs()}")
+        podobj = podObjects[pod]
+        print(f"{ASPACE:8}Name: {pod}\n"
+              f"{ASPACE:12}Resources: cpu:{podobj.cpuRequest}m/mem:{podobj.memoryRequest}Ki\n"
+              f"{ASPACE:12}Status: {podobj.getStatus()}\n"
+              f"{ASPACE:12}Node: {podobj.getNodeName()}\n"
+              f"{ASPACE:12}Ownership Path: {podobj.getOwnerHierarchy()}\n"
+              f"{ASPACE:12}PVC Mounts: {podobj.getPvcs()}",file=fileOut)
 
     #Print pvcs:
-    print(f"{ASPACE:4}Pvcs:")
+    print(f"{ASPACE:4}Pvcs:",file=fileOut)
     if len(self.pvcList) == 0:
-      print(f"{ASPACE:8}None")
+      print(f"{ASPACE:8}None",file=fileOut)
     else:
+      pvcObjects = GLOBAL_PVC_OBJECTS[self.namespace]
       for pvc in self.pvcList:
-        print(f"{ASPACE:8}Name: {pvc}")
-        print(f"{ASPACE:12}Capacity: {GLOBAL_PVC_OBJECTS[self.namespace][pvc].getPvcCapacity()}Gi")
-        print(f"{ASPACE:12}Volume: {GLOBAL_PVC_OBJECTS[self.namespace][pvc].getVolumeName()}")
-        print(f"{ASPACE:12}Storage Class: {GLOBAL_PVC_OBJECTS[self.namespace][pvc].getStorageClass()}")
-        print(f"{ASPACE:12}Ownership Path:")
-        for owner in GLOBAL_PVC_OBJECTS[self.namespace][pvc].getOwnerHierarchy():
-          print(f"{ASPACE:16}{owner}")
+        pvcobj = pvcObjects[pvc]
+        print(f"{ASPACE:8}Name: {pvc}\n"
+              f"{ASPACE:12}Capacity: {pvcobj.capacity}Gi\n"
+              f"{ASPACE:12}Volume: {pvcobj.volumeName}\n"
+              f"{ASPACE:12}Storage Class: {pvcobj.storageClass}\n"
+              f"{ASPACE:12}Ownership Path:",file=fileOut)
+        for owner in pvcobj.getOwnerHierarchy():
+          print(f"{ASPACE:16}{owner}",file=fileOut)
     return
-  #End printPodTree(self, summary=False)
+  #End printPodTree(self, summary=False, fileOut=None)
 
-  def printServiceCpu(self):
-    #Get longest service name, for formatting printing:
-    serviceColumns = len(getLongestServiceName(self.namespace))
+  #serviceColumns is the width of the service name column, computed once per report by the caller
+  #(the longest service name in the namespace if not given).
+  def printServiceCpu(self, serviceColumns=None, fileOut=None):
+    if serviceColumns is None:
+      serviceColumns = len(getLongestServiceName(self.namespace))
     if DEBUG_MODE: print(f"serviceobj:printServiceCpu: serviceColumns={serviceColumns}")
 
     reducedCpu=reduceValue(f"{self.requestedCpu}m")
-    print(f"Service (Primary Owner): {self.longName.ljust(serviceColumns)}   Requested CPU: {self.requestedCpu}m ({reducedCpu})")
+    print(f"Service (Primary Owner): {self.longName.ljust(serviceColumns)}   Requested CPU: {self.requestedCpu}m ({reducedCpu})",file=fileOut)
     return
 
-  def printServiceMemory(self):
-    #Get longest service name, for formatting printing:
-    serviceColumns = len(getLongestServiceName(self.namespace))
+  def printServiceMemory(self, serviceColumns=None, fileOut=None):
+    if serviceColumns is None:
+      serviceColumns = len(getLongestServiceName(self.namespace))
 
     reducedMem=reduceValue(f"{self.requestedMemory}Ki")
-    print(f"Service (Primary Owner): {self.longName.ljust(serviceColumns)}   Requested Memory: {self.requestedMemory}Ki ({reducedMem})")
+    print(f"Service (Primary Owner): {self.longName.ljust(serviceColumns)}   Requested Memory: {self.requestedMemory}Ki ({reducedMem})",file=fileOut)
+    return
+
+  def printServicePvc(self, serviceColumns=None, fileOut=None):
+    if serviceColumns is None:
+      serviceColumns = len(getLongestServiceName(self.namespace))
+
+    print(f"Service (Primary Owner): {self.longName.ljust(serviceColumns)}   PVC Capacity: {self.totalPvcCapacity}Gi",file=fileOut)
     return
 
-  def printServicePvc(self):
-    #Get longest service name, for formatting printing:
-    serviceColumns = len(getLongestServiceName(self.namespace))
+  #Print used (metrics API), requested and limit cpu and memory for the service and each of its pods.
+  #podColumns is the width of the pod name column, computed once per report by the caller.
+  def printServiceUsage(self, podColumns, fileOut=None):
+    print(f"Service (Primary Owner): {self.longName}\n"
+          f"{ASPACE:4}CPU Used/Requested/Limit: {formatUsage(self.usedCpu if self.usagePods else None, self.requestedCpu, self.limitCpu, 'm')}\n"
+          f"{ASPACE:4}Memory Used/Requested/Limit: {formatUsage(self.usedMemory if self.usagePods else None, self.requestedMemory, self.limitMemory, 'Ki')}\n"
+          f"{ASPACE:4}Pods:",file=fileOut)
+    printPodUsage(self.namespace, self.podList, podColumns, fileOut)
+    return
 
-    print(f"Service (Primary Owner): {self.longName.ljust(serviceColumns)}   PVC Capacity: {self.totalPvcCapacity}Gi")
+  #Print the recent events of the service's objects, with the number of events and warnings.
+  def printServiceEvents(self, fileOut=None):
+    eventList = [event for events in self.events.values() for event in events]
+    warningCount = sum(1 for event in eventList if event.type == "Warning")
+    print(f"Service (Primary Owner): {self.longName}\n"
+          f"{ASPACE:4}Events: {len(eventList)} ({warningCount} Warning)",file=fileOut)
+    printObjectEvents(self.events, 8, fileOut)
     return
 
   #Print pods for the service:
-  def printPodTreeSummary(self):
-    print(f"Service (Primary Owner): {self.longName}")
+  def printPodTreeSummary(self, fileOut=None):
+    print(f"Service (Primary Owner): {self.longName}",file=fileOut)
     #Print pods:
-    print(f"{ASPACE:4}Pods:")
+    print(f"{ASPACE:4}Pods:",file=fileOut)
     if len(self.podList) == 0:
-      print(f"{ASPACE:8}None")
+      print(f"{ASPACE:8}None",file=fileOut)
     else:
       for pod in self.podList:
-        print(f"{ASPACE:8}Name: {pod}")
+        print(f"{ASPACE:8}Name: {pod}",file=fileOut)
     return
 
 #---------- End class serviceObject ----------#
@@ -499,61 +1845,279 @@ def runIt(cmdStr, shV=False):
   else:
     cmdList = cmdStr
 
+  callTimeout = getCallTimeout()
+  if callTimeout == 0:
+    return ("", RUN_BUDGET_ERROR, 124)
+  startTime = time.perf_counter()
   cmd = subprocess.Popen(cmdList,stdout=subprocess.PIPE,stderr=subprocess.PIPE, shell=shV)
-  (cOut,cErr) = cmd.communicate()
-  cRC = cmd.returncode
+  try:
+    (cOut,cErr) = cmd.communicate(timeout=callTimeout)
+    cRC = cmd.returncode
+  except subprocess.TimeoutExpired:
+    cmd.kill()
+    (cOut,cErr) = cmd.communicate()
+    (cErr, cRC) = (f"timed out after {callTimeout:.1f}s".encode(), 124)
+  if GLOBAL_PROFILE is not None:
+    GLOBAL_PROFILE.addCall("exec", cmdStr if shV is False else " ".join(cmdList), None, None, startTime,
+                           len(cOut), None, f"returned {cRC}" if cRC != 0 else None)
   return (cOut.decode(),cErr.decode(),cRC)
 
 
+# Seconds the next cluster call may take: CALL_TIMEOUT, or less when the run budget ends sooner.
+# Returns 0 once the run budget is used up.
+def getCallTimeout():
+  if RUN_DEADLINE is None:
+    return CALL_TIMEOUT
+  return max(0, min(CALL_TIMEOUT, RUN_DEADLINE - time.monotonic()))
+
+
+# Returns True if a failed call with this error is worth trying again.
+def isRetryableError(errStr):
+  return errStr != RUN_BUDGET_ERROR and not PERMANENT_ERROR_RE.search(errStr)
+
+
+# Record a failed pull that leaves the namespace's results incomplete, in GLOBAL_FETCH_ERRORS.
+# The first error of a resource is kept. Running out of the run budget is reported once.
+def noteFetchError(nameSpaceIn, resourceIn, errStr):
+  global RUN_BUDGET_NOTED
+  GLOBAL_FETCH_ERRORS[nameSpaceIn].setdefault(resourceIn, errStr)
+  if errStr == RUN_BUDGET_ERROR and not RUN_BUDGET_NOTED:
+    RUN_BUDGET_NOTED = True
+    print(f"\nWarning: {RUN_BUDGET_ERROR} ({RUN_BUDGET:g}s), no more cluster calls are made. Results are incomplete.",file=sys.stderr)
+
+
 # Get the json output for a given OCP resource in a given namespace
 # Where resourceIn is <type>/<name>. Ex: pvc/mypvc1
 # Output is json dictionary from the json.loads
+# Results are kept in GLOBAL_FALLBACK_JSON, so they can be saved to and replayed from a snapshot.
 def getJsonForResource(resourceIn, namespaceIn):
-  if DEBUG_MODE: print(f"getJsonForResource: runIt oc get {resourceIn} -n {namespaceIn} -o json")
-  (resJson,rErr,rRC) = runIt(f"oc get {resourceIn} -n {namespaceIn} -o json")
-  if rRC != 0:
-    print(f"Error: 'oc get {resourceIn} -n {namespaceIn} -o json' returned: '{rRC}'. stderr: '{rErr}' ",file=sys.stderr)
-    return None
-  else:
-    jsonLoad = json.loads(resJson)
+  if GLOBAL_PROFILE is not None:
+    GLOBAL_PROFILE.addFallback(namespaceIn, resourceIn)
+  if SNAPSHOT_REPLAY:
+    if DEBUG_MODE: print(f"getJsonForResource: {resourceIn} from snapshot (found: {resourceIn in GLOBAL_FALLBACK_JSON[namespaceIn]})")
+    return GLOBAL_FALLBACK_JSON[namespaceIn].get(resourceIn)
+
+  (jsonLoad, errStr) = fetchJsonForResource(resourceIn, namespaceIn)
+  if jsonLoad is None:
+    #A missing object is only a broken owner link. Anything else leaves the namespace incomplete.
+    if PERMANENT_ERROR_RE.search(errStr):
+      print(f"Error: {errStr}",file=sys.stderr)
+    else:
+      noteFetchError(namespaceIn, resourceIn.split("/")[0], errStr)
+  GLOBAL_FALLBACK_JSON[namespaceIn][resourceIn] = jsonLoad
   return jsonLoad
 
 
-#Get all api resources in OCP cluster with ibm in the name.
-#Return as comma separated string of resources.
-def getJsonIbmResources(namespaceIn):
-  #Get ibm resource list
-  if DEBUG_MODE: print(f"getJsonIbmResources: runIt 'oc api-resources --namespaced=true -o name | grep ibm'")
-  (resList,rErr,rRC) = runIt("oc api-resources --namespaced=true -o name | grep ibm", True)
-  if rRC != 0:
-    print(f"getJsonIbmResources: Error: 'oc api-resources --namespaced=true -o name' returned: '{rRC}'. stderr: '{rErr}' ",file=sys.stderr)
+# Same as getJsonForResource, but does not print errors.
+# If namespaceIn is None, the resource is listed across all namespaces.
+# selectorIn is an optional label selector for a list (Ex: "app=zen").
+# projectionIn selects the fields kept of each item (default ITEM_PROJECTION).
+# limitIn and continueIn pull one page of a list (see fetchJsonPages()).
+# Returns tuple of (json dictionary, error string). json dictionary is None on failure.
+# A failed call is tried again (CALL_RETRIES) with a random backoff, unless the error is permanent
+# or the run budget is used up.
+def fetchJsonForResource(resourceIn, namespaceIn, selectorIn=None, projectionIn=None, limitIn=None, continueIn=None):
+  attempt = 0
+  while True:
+    if getCallTimeout() == 0:
+      return (None, RUN_BUDGET_ERROR)
+    (jsonLoad, errStr) = ACTIVE_TRANSPORT.getJson(resourceIn, namespaceIn, selectorIn, projectionIn, limitIn, continueIn)
+    if jsonLoad is not None or attempt >= CALL_RETRIES or not isRetryableError(errStr):
+      return (jsonLoad, errStr)
+    backoff = uniform(0, CALL_BACKOFF * 2**attempt)
+    if RUN_DEADLINE is not None and time.monotonic() + backoff >= RUN_DEADLINE:
+      return (jsonLoad, errStr)
+    attempt += 1
+    if DEBUG_MODE: print(f"fetchJsonForResource: {resourceIn} failed, retry {attempt} in {backoff:.2f}s: {errStr}")
+    sleep(backoff)
+
+
+# Pull a list in pages of PAGE_SIZE items, each page a call of its own (a failed page is retried on its own).
+# Generator of (json dictionary, error string), one per page. Ends after the last page, or a failed one.
+def fetchJsonPages(resourceIn, namespaceIn, selectorIn=None, projectionIn=None):
+  continueToken = None
+  while True:
+    (pageJson, errStr) = fetchJsonForResource(resourceIn, namespaceIn, selectorIn, projectionIn, PAGE_SIZE or None, continueToken)
+    yield (pageJson, errStr)
+    if pageJson is None:
+      return
+    continueToken = (pageJson.get("metadata") or {}).pop("continue", None)
+    if not continueToken:
+      return
+
+
+# Same as fetchJsonForResource for a list, pulled in pages (fetchJsonPages()) and returned as one list.
+# The list metadata (resourceVersion) is the first page's, which the other pages are consistent with.
+def fetchJsonForList(resourceIn, namespaceIn, selectorIn=None, projectionIn=None):
+  listJson = None
+  for (pageJson, errStr) in fetchJsonPages(resourceIn, namespaceIn, selectorIn, projectionIn):
+    if pageJson is None:
+      return (None, errStr)
+    if listJson is None:
+      listJson = pageJson
+    else:
+      listJson.setdefault("items", []).extend(pageJson.get("items") or [])
+  return (listJson, None)
+
+
+# Get the json for all namespaced api resources whose name contains grepIn. Ex: "ibm"
+# If namespaceIn is None, the resources are listed across all namespaces.
+# Returns tuple of (json dictionary, error string), like fetchJsonForResource.
+# If no api resources match, an empty item list is returned (not an error).
+def fetchJsonForApiResources(grepIn, namespaceIn, projectionIn=None):
+  (resList, errStr) = ACTIVE_TRANSPORT.getApiResources()
+  if resList is None:
+    return (None, errStr)
+  grepRe = re.compile(grepIn)
+  matchList = [res for res in resList if grepRe.search(res)]
+  if DEBUG_MODE: print(f"fetchJsonForApiResources: '{grepIn}' matched {matchList}")
+  if len(matchList) == 0:
+    return ({"items": []}, None)
+
+  resListComma = ",".join(matchList)
+  GLOBAL_DISCOVERY[grepIn] = resListComma
+  return fetchJsonForResource(resListComma, namespaceIn, projectionIn=projectionIn)
+
+
+#Returns the discovery cache key of the kubeconfig oc uses ("kubeconfig <sha256 of its files>"), or None if
+#there is no kubeconfig file. Logging in or changing the context rewrites the file, which gives a new key.
+def getKubeconfigKey():
+  fileList = [fileName for fileName in os.environ.get("KUBECONFIG","").split(os.pathsep) if fileName]
+  digest = hashlib.sha256()
+  found = False
+  for fileName in fileList or [os.path.expanduser("~/.kube/config")]:
+    try:
+      with open(fileName, "rb") as configFile:
+        digest.update(os.path.abspath(fileName).encode() + b"\0" + configFile.read() + b"\0")
+      found = True
+    except OSError:
+      continue
+  return f"kubeconfig {digest.hexdigest()}" if found else None
+
+
+#Returns the cached discovery result for the cluster key, or None if there is none, it expired,
+#or --refresh-discovery was given.
+def loadDiscoveryCache(clusterKey):
+  if clusterKey is None or DISCOVERY_REFRESH:
     return None
-  
-  resListComma = resList.replace("\n",",")
+  try:
+    with open(DISCOVERY_CACHE_FILE) as cacheFile:
+      cached = json.load(cacheFile).get(clusterKey)
+  except (OSError, ValueError, AttributeError) as err:
+    if DEBUG_MODE: print(f"loadDiscoveryCache: No discovery cache in '{DISCOVERY_CACHE_FILE}': {err}")
+    return None
+  if not cached or time.time() - cached.get("created",0) > DISCOVERY_CACHE_TTL:
+    if DEBUG_MODE: print(f"loadDiscoveryCache: No current discovery cache entry for '{clusterKey}'")
+    return None
+  if DEBUG_MODE: print(f"loadDiscoveryCache: Using discovery cache entry for '{clusterKey}' from {time.ctime(cached.get('created'))}")
+  return cached
 
-  #Get all entries for the resource list with json output:
-  #(resJson,rErr,rRC) = 
-  #oc get --show-kind $(oc api-resources --namespaced=true -o name | grep ibm | awk '{printf "%s%s",sep,$0; sep=","} END{print ""}') -o json -n zen-test-msk
-  if DEBUG_MODE:
-    print(f"getJsonIbmResources: resList '{resList}'")
-    print(f"getJsonIbmResources: resListComma '{resListComma}'")
 
-  return resListComma
+#Store a discovery result for the cluster key in the discovery cache file, dropping expired entries.
+#The cache is only an optimization, failures to write it are ignored.
+def saveDiscoveryCache(clusterKey, entryIn):
+  if clusterKey is None:
+    return
+  try:
+    with open(DISCOVERY_CACHE_FILE) as cacheFile:
+      cache = json.load(cacheFile)
+  except (OSError, ValueError):
+    cache = {}
+  now = time.time()
+  cache = {key: entry for key, entry in cache.items() if type(entry) is dict and now - entry.get("created",0) <= DISCOVERY_CACHE_TTL}
+  cache[clusterKey] = dict(entryIn, created=now)
+  try:
+    os.makedirs(os.path.dirname(DISCOVERY_CACHE_FILE), exist_ok=True)
+    (fd, tempName) = tempfile.mkstemp(dir=os.path.dirname(DISCOVERY_CACHE_FILE))
+    with os.fdopen(fd, "w") as tempFile:
+      json.dump(cache, tempFile)
+    os.replace(tempName, DISCOVERY_CACHE_FILE)
+  except OSError as err:
+    if DEBUG_MODE: print(f"saveDiscoveryCache: Unable to write '{DISCOVERY_CACHE_FILE}': {err}")
+
+
+#Returns a copy of jsonIn with only the fields in projectionIn (see ITEM_PROJECTION).
+def projectJson(jsonIn, projectionIn):
+  if projectionIn is True:
+    return jsonIn
+  if type(jsonIn) is list:
+    return [projectJson(entry, projectionIn) for entry in jsonIn]
+  if type(jsonIn) is not dict:
+    return jsonIn
+  jsonOut = {}
+  for key, subProjection in projectionIn.items():
+    if key in jsonIn:
+      jsonOut[key] = projectJson(jsonIn[key], subProjection)
+  return jsonOut
+
+
+#Parse json from a binary file-like object, one list item at a time.
+#Each item of a top level "items" list (or a single top level object) is reduced to the fields
+#in projectionIn as soon as it is parsed, so memory depends on what is kept, not on the response size.
+#If statsOut is given (a dictionary), statsOut["reader"] is set to the stream reader, so --profile can
+#record its counters (bytesRead, readSeconds, firstByteTime) even when parsing fails.
+def loadJsonStream(fileIn, projectionIn=None, statsOut=None):
+  if projectionIn is None:
+    projectionIn = ITEM_PROJECTION
+  reader = jsonStreamReader(fileIn)
+  if statsOut is not None:
+    statsOut["reader"] = reader
+  jsonOut = {}
+  reader.expect("{")
+  if reader.peek() == "}":
+    return jsonOut
+  while True:
+    key = reader.readValue()
+    reader.expect(":")
+    if key == "items" and reader.peek() == "[":
+      reader.expect("[")
+      items = []
+      if reader.peek() == "]":
+        reader.pos += 1
+      else:
+        while True:
+          items.append(projectJson(reader.readValue(), projectionIn))
+          nextChar = reader.peek()
+          reader.pos += 1
+          if nextChar == "]":
+            break
+          if nextChar != ",":
+            raise ValueError(f"Expecting ',' or ']' in items list, got '{nextChar}'")
+      jsonOut[key] = items
+    else:
+      jsonOut[key] = reader.readValue()
+    nextChar = reader.peek()
+    reader.pos += 1
+    if nextChar == "}":
+      break
+    if nextChar != ",":
+      raise ValueError(f"Expecting ',' or '}}', got '{nextChar}'")
+
+  #A single object (not a list):
+  if "items" not in jsonOut:
+    jsonOut = projectJson(jsonOut, projectionIn)
+  return jsonOut
 
 
 #Check to see if the ocp connection is good and logged in, otherwise oc commands will fail.
 def isOcpLoginValid():
-  # oc cluster-info
-  #Kubernetes control plane is running at https://api.cpst-ocp-cluster-d.cpst-lab.no-users.ibm.com:6443
-  #
-  #To further debug and diagnose cluster problems, use 'kubectl cluster-info dump'.
-  if DEBUG_MODE: print(f"isOcpLoginValid: runIt 'oc cluster-info'")
-  (rOut,rErr,rRC) = runIt("oc cluster-info")
-  if rRC != 0:
-    if DEBUG_MODE: print(f"isOcpLoginValid: Error: 'oc cluster-info' returned: '{rRC}'. stderr: '{rErr}' ")
-    return False
-  else:
-    return True
+  return ACTIVE_TRANSPORT.isLoginValid()
+
+
+#Set up ACTIVE_TRANSPORT for the given transport type ("api" or "oc").
+#The api transport falls back to oc when the kubeconfig context can not be used directly.
+def setupTransport(transportIn):
+  global ACTIVE_TRANSPORT
+  ocBackend = ocTransport()
+  ACTIVE_TRANSPORT = ocBackend
+  if transportIn == "api":
+    apiBackend = apiTransport.fromKubeconfig(fallback=ocBackend)
+    if apiBackend:
+      ACTIVE_TRANSPORT = apiBackend
+    else:
+      print(f"Info: Unable to use the current kubeconfig context for direct api access, using oc commands.",file=sys.stderr)
+  if DEBUG_MODE: print(f"setupTransport: using {ACTIVE_TRANSPORT.name} transport")
+  return ACTIVE_TRANSPORT
 
 #Get the string list of the pods, for the given namespace
 def getPodList(namespaceIn):
@@ -631,7 +2195,7 @@ def createServiceObjects(nameSpaceIn):
 
 def getLongestServiceName(nameSpaceIn):
   serviceNames = GLOBAL_SERVICE_OBJECTS[nameSpaceIn].keys()
-  longestName = max(serviceNames, key=len)
+  longestName = max(serviceNames, key=len, default="")
   if DEBUG_MODE: print(f"getLongestServiceName: longest service '{longestName}' for '{serviceNames}'")
   return str(longestName)
 
@@ -650,7 +2214,7 @@ def getOrphanPvcsCapacity(nameSpaceIn):
   capacityOut = 0
   for pvcName in getOrphanPvcs(nameSpaceIn):
     pvcobj = GLOBAL_PVC_OBJECTS[nameSpaceIn][pvcName]
-    capacityOut += pvcobj.getPvcCapacity()
+    capacityOut += pvcobj.capacity
   return capacityOut
 
 
@@ -665,85 +2229,76 @@ def getOrphanPods(nameSpaceIn):
 
 
 #Print orphan resources:
-def printOrphanResources(nameSpaceIn, summary=False):
-  print(f"Standalone Pods (No owner/controller):")
+def printOrphanResources(nameSpaceIn, summary=False, fileOut=None):
+  print(f"Standalone Pods (No owner/controller):",file=fileOut)
 
-  if len(getOrphanPods(nameSpaceIn)) == 0:
-    print(f"{ASPACE:4}None")
+  orphanPods = getOrphanPods(nameSpaceIn)
+  if len(orphanPods) == 0:
+    print(f"{ASPACE:4}None",file=fileOut)
   else:
     if not summary:
-      for pod in getOrphanPods(nameSpaceIn):
-        print(f"{ASPACE:4}Name: {pod}")
-        print(f"{ASPACE:8}Resources: cpu:{GLOBAL_POD_OBJECTS[nameSpaceIn][pod].cpuRequest}m/mem:{GLOBAL_POD_OBJECTS[nameSpaceIn][pod].memoryRequest}Ki")
-        print(f"{ASPACE:8}Status: {GLOBAL_POD_OBJECTS[nameSpaceIn][pod].getStatus()}")
-
-  print(f"Standalone Pvcs (No owner/controller):")
-  if len(getOrphanPvcs(nameSpaceIn)) == 0:
-    print(f"{ASPACE:4}None")
+      for pod in orphanPods:
+        podobj = GLOBAL_POD_OBJECTS[nameSpaceIn][pod]
+        print(f"{ASPACE:4}Name: {pod}\n"
+              f"{ASPACE:8}Resources: cpu:{podobj.cpuRequest}m/mem:{podobj.memoryRequest}Ki\n"
+              f"{ASPACE:8}Status: {podobj.getStatus()}",file=fileOut)
+
+  print(f"Standalone Pvcs (No owner/controller):",file=fileOut)
+  orphanPvcs = getOrphanPvcs(nameSpaceIn)
+  if len(orphanPvcs) == 0:
+    print(f"{ASPACE:4}None",file=fileOut)
   else:
-    print(f"{ASPACE:4}Total PVC Capacity: {getOrphanPvcsCapacity(nameSpaceIn)}Gi")
+    print(f"{ASPACE:4}Total PVC Capacity: {getOrphanPvcsCapacity(nameSpaceIn)}Gi",file=fileOut)
     if not summary:
-      for pvc in getOrphanPvcs(nameSpaceIn):
-        print(f"{ASPACE:4}Name: {pvc}")
-        print(f"{ASPACE:8}Capacity: {GLOBAL_PVC_OBJECTS[nameSpaceIn][pvc].getPvcCapacity()}Gi")
-        print(f"{ASPACE:8}Volume: {GLOBAL_PVC_OBJECTS[nameSpaceIn][pvc].getVolumeName()}")
-        print(f"{ASPACE:8}Storage Class: {GLOBAL_PVC_OBJECTS[nameSpaceIn][pvc].getStorageClass()}")
+      for pvc in orphanPvcs:
+        pvcobj = GLOBAL_PVC_OBJECTS[nameSpaceIn][pvc]
+        print(f"{ASPACE:4}Name: {pvc}\n"
+              f"{ASPACE:8}Capacity: {pvcobj.capacity}Gi\n"
+              f"{ASPACE:8}Volume: {pvcobj.volumeName}\n"
+              f"{ASPACE:8}Storage Class: {pvcobj.storageClass}",file=fileOut)
   return
 #End printOrphanResources(nameSpaceIn)
 
 
+#Parse a Kubernetes quantity string (Ex: "250m", "1.5Gi", "129e6", "2Ti") into its exact value in
+#base units (cores, bytes), as a Fraction. Returns None if the string is not a valid quantity.
+#Results are cached, a namespace only has a few hundred distinct quantity strings.
+@functools.lru_cache(maxsize=None)
+def parseQuantity(valIn):
+  match = QUANTITY_RE.match(valIn.strip())
+  if not match:
+    return None
+  (number, exponent, suffix) = match.groups()
+  value = Fraction(number)
+  if exponent:
+    value *= Fraction(10) ** int(exponent[1:])
+  elif suffix:
+    value *= QUANTITY_SUFFIXES[suffix]
+  return value
+
+
+#Convert a list of quantity strings to integers in the given unit (Ex: "m", "Ki", "Gi"), rounded to
+#the nearest whole number. Invalid quantities are reported once and count as 0.
+def ocpValsToIntegers(valList, returnType):
+  intList = []
+  for valIn in valList:
+    cacheKey = (valIn, returnType)
+    intVal = QUANTITY_INT_CACHE.get(cacheKey)
+    if intVal is None:
+      value = parseQuantity(valIn)
+      if value is None:
+        print(f"Error: ocpValsToIntegers: '{valIn}' is not a valid quantity, counted as 0",file=sys.stderr)
+        intVal = 0
+      else:
+        intVal = round(value / QUANTITY_UNITS.get(returnType, 1))
+      if DEBUG_MODE: print(f"ocpValsToIntegers: value in '{valIn}' (returnType '{returnType}'), return val '{intVal}'")
+      QUANTITY_INT_CACHE[cacheKey] = intVal
+    intList.append(intVal)
+  return intList
+
+
 def ocpValToInteger(valIn, returnType):
-  normVal = 0
-  retVal = 0
-
-  #First normalize the input value, to bytes/baseunits:
-  if DEBUG_MODE: print(f"ocpValToInteger: value in '{valIn}' (returnType '{returnType}')")
-
-  if "m" in valIn:
-    normVal = int(valIn.rstrip("m")) / 1000
-  elif "Ki" in valIn:
-    normVal = int(valIn.rstrip("Ki")) * 1024
-  elif "K" in valIn:
-    normVal = int(valIn.rstrip("K")) * 1000
-  elif "Mi" in valIn:
-    normVal = int(valIn.rstrip("Mi")) * 1024 * 1024
-  elif "M" in valIn:
-    normVal = int(valIn.rstrip("M")) * 1000 * 1000
-  elif "Gi" in valIn:
-    normVal = int(valIn.rstrip("Gi")) * 1024 * 1024 * 1024
-  elif "G" in valIn:
-    normVal = int(valIn.rstrip("G")) * 1000 * 1000 * 1000
-  else:
-    try:
-      normVal = int(valIn)
-    except:
-      print(f"Error: ocpValToInteger: {valIn} unknown type",file=sys.stderr)
-      return -1
-  
-  #Now convert normalized value to return type:
-  if DEBUG_MODE: print(f"ocpValToInteger: normalized value '{normVal}'")
-
-  if "m" == returnType:
-    retVal = normVal * 1000
-  elif "Ki" == returnType:
-    retVal = normVal / 1024
-  elif "K" == returnType:
-    retVal = normVal / 1000
-  elif "Mi" == returnType:
-    retVal = normVal / 1024 / 1024
-  elif "M" == returnType:
-    retVal = normVal / 1000 / 1000
-  elif "Gi" == returnType:
-    retVal = normVal / 1024 / 1024 / 1024
-  elif "G" == returnType:
-    retVal = normVal / 1000 / 1000 / 1000
-  else:
-    retVal = normVal
-  
-  #Now round the number to nearest whole:
-  retVal = round(retVal)
-  if DEBUG_MODE: print(f"ocpValToInteger: return val '{retVal}'")
-  return retVal
+  return ocpValsToIntegers([valIn], returnType)[0]
 #End ocpValToInteger(valIn, returnType)
 
 
@@ -751,30 +2306,29 @@ def ocpValToInteger(valIn, returnType):
 #Only support "m" or "Ki" values.
 def reduceValue(valIn):
   newVal = valIn
-  if "m" in valIn:
-    valueString = valIn.rstrip("m")
-    if len(valueString) >= 4:
-      try:
-        vInt = round(int(valueString) / 1000, 1)
-        newVal = f"{vInt}"
-      except:
-        newVal = valIn
-  elif "Ki" in valIn:
-    valueString = valIn.rstrip("Ki")
-    if ( (len(valueString) >= 4) and (len(valueString) < 7) ):
-      #Convert to Mi:
-      try:
-        vInt = round(int(valueString) / 1024, 1)
-        newVal = f"{vInt}Mi"
-      except:
-        newVal = valIn
-    elif len(valueString) >= 7:
-      #Convert to Gi:
-      try:
-        vInt = round(int(valueString) / 1024 / 1024, 1)
-        newVal = f"{vInt}Gi"
-      except:
-        newVal = valIn
+  if valIn.endswith("m"):
+    returnType = "m"
+  elif valIn.endswith("Ki"):
+    returnType = "Ki"
+  else:
+    return newVal
+  if parseQuantity(valIn) is None:
+    return newVal
+  (intVal,) = ocpValsToIntegers([valIn], returnType)
+  digitCount = len(str(abs(intVal)))
+
+  if returnType == "m":
+    if digitCount >= 4:
+      vInt = round(intVal / 1000, 1)
+      newVal = f"{vInt}"
+  elif ( (digitCount >= 4) and (digitCount < 7) ):
+    #Convert to Mi:
+    vInt = round(intVal / 1024, 1)
+    newVal = f"{vInt}Mi"
+  elif digitCount >= 7:
+    #Convert to Gi:
+    vInt = round(intVal / 1024 / 1024, 1)
+    newVal = f"{vInt}Gi"
   return newVal
 
 
@@ -838,50 +2392,8 @@ def controlledBy(resourceIn, nsIn):
   #Check the pre-populated kinds first
   kindIn = resourceIn.split('/')[0].lower()
   resNameIn = resourceIn.split('/')[1]
-  resJson = None
-  items = None
-
   if DEBUG_MODE: print(f"controlledBy: kindIn '{kindIn}'")
-  if kindIn == "statefulset":
-    if DEBUG_MODE: print(f"controlledBy: sts it. kind={kindIn}/name={resNameIn}")
-    items = GLOBAL_STATEFULSET[nsIn].get("items",[])
-  elif kindIn == "replicaset":
-    if DEBUG_MODE: print(f"controlledBy: repset it. kind={kindIn}/name={resNameIn}")
-    items = GLOBAL_REPLICASET[nsIn].get("items",[])
-  elif kindIn == "job":
-    if DEBUG_MODE: print(f"controlledBy: job it. kind={kindIn}/name={resNameIn}")
-    items = GLOBAL_JOBS[nsIn].get("items",[])
-  elif kindIn == "deployment":
-    if DEBUG_MODE: print(f"controlledBy: deploy it. kind={kindIn}/name={resNameIn}")
-    items = GLOBAL_DEPLOYMENT[nsIn].get("items",[])
-  elif kindIn == "pod":
-    items = GLOBAL_PODS[nsIn].get("items",[])
-    if DEBUG_MODE: print(f"controlledBy: pod it. kind={kindIn}/name={resNameIn} (items list size: {len(items)}, GLOBAL_PODS size: {len(GLOBAL_PODS[nsIn])})")
-  elif kindIn == "persistentvolumeclaim":
-    if DEBUG_MODE: print(f"controlledBy: pvc it. kind={kindIn}/name={resNameIn}")
-    items = GLOBAL_PVCS[nsIn].get("items",[])
-  elif kindIn == "configmap":
-    if DEBUG_MODE: print(f"controlledBy: configmap it. kind={kindIn}/name={resNameIn}")
-    items = GLOBAL_CONFIGMAP[nsIn].get("items",[])
-  else:
-    if DEBUG_MODE: print(f"controlledBy: else... lets try ibm and cognitive data")
-    items = GLOBAL_IBM[nsIn].get("items",[])
-    try:
-      items.extend(GLOBAL_COGNITIVEDATA[nsIn].get("items",[]))
-    except BaseException as err:
-      if DEBUG_MODE: print(f"controlledBy: No entries in GLOBAL_COGNITIVEDATA[{nsIn}]. {type(err)} '{err}'")
-
-
-  if items:
-    for item in items:
-      itemKind=item.get("kind").lower()
-      itemName=item.get("metadata").get("name")
-      #if itemKind == "pod":
-      #  print(f"pod iterate item: {item}")
-      #  sleep(1)
-      if itemKind == kindIn and itemName == resNameIn:
-        if DEBUG_MODE: print(f"controlledBy: MATCH! item.metadata.name = '{itemName}'")
-        resJson = item
+  resJson = lookupResource(kindIn, resNameIn, nsIn)
 
   #We didn't find a matching json in our pre-pulled jsons. Get the resource directly.
   if resJson is None:
@@ -914,60 +2426,437 @@ def controlledBy(resourceIn, nsIn):
 
 
 #Pull common json data from OCP cluster, running several oc commands. May take a while.
-def getGlobalJson(nameSpaceIn):
-  print(f"Pulling initial json data from cluster for namespace {nameSpaceIn}.",end='')
-  sys.stdout.flush()
-  GLOBAL_STATEFULSET[nameSpaceIn] = getJsonForResource("statefulset",nameSpaceIn)
-  print(".",end='')
-  sys.stdout.flush()
-  GLOBAL_REPLICASET[nameSpaceIn] = getJsonForResource("replicaset",nameSpaceIn)
-  print(".",end='')
-  sys.stdout.flush()
-  GLOBAL_JOBS[nameSpaceIn] = getJsonForResource("jobs",nameSpaceIn)
-  print(".",end='')
-  sys.stdout.flush()
-  GLOBAL_DEPLOYMENT[nameSpaceIn] = getJsonForResource("deployment",nameSpaceIn)
-  print(".",end='')
-  sys.stdout.flush()
-  GLOBAL_PODS[nameSpaceIn] = getJsonForResource("pods",nameSpaceIn)
-  print(".",end='')
-  sys.stdout.flush()
-  GLOBAL_PVCS[nameSpaceIn] = getJsonForResource("pvc",nameSpaceIn)
-  print(".",end='')
+#The oc calls are independent of each other, so they are run concurrently (FETCH_WORKERS at a time).
+#For a single namespace, each kind is pulled from that namespace. For several namespaces (or all
+#namespaces), each kind is pulled once across all namespaces and split by metadata.namespace.
+#A failed pull is reported, recorded in GLOBAL_FETCH_ERRORS, and stored as an empty item list.
+#fetchPlan (from getFetchPlan()) has the resources to pull and the fields kept of each, the default is
+#every kind with all fields. Pod usage (GLOBAL_POD_METRICS) and nodes (GLOBAL_NODES, cluster scoped,
+#pulled once) are only pulled when planned. A lazy kind left out of the plan is stored as an empty
+#item list, and loaded if a lookup needs it (see lookupResource()).
+#Returns the list of namespaces pulled.
+def getGlobalJson(nameSpaceList, allNamespaces=False, fetchPlan=None):
+  if fetchPlan is None:
+    fetchPlan = getFetchPlan(None, fullPull=True)
+  (pulledJson, fetchErrors) = pullGlobalJson(nameSpaceList, allNamespaces, fetchPlan)
+  return storeGlobalJson(nameSpaceList, allNamespaces, fetchPlan, pulledJson, fetchErrors)
+#End getGlobalJson(nameSpaceList, allNamespaces=False, fetchPlan=None)
+
+
+#Returns the namespace lists are pulled from, None to pull them across all namespaces.
+def getFetchScope(nameSpaceList, allNamespaces):
+  return nameSpaceList[0] if not allNamespaces and len(nameSpaceList) == 1 else None
+
+
+#Returns list of (global dictionary, fetch function, resource), of the resources in fetchPlan.
+def getFetchList(fetchPlan):
+  fetchList = [
+    (GLOBAL_STATEFULSET, fetchJsonForList, "statefulset"),
+    (GLOBAL_REPLICASET, fetchJsonForList, "replicaset"),
+    (GLOBAL_JOBS, fetchJsonForList, "jobs"),
+    (GLOBAL_DEPLOYMENT, fetchJsonForList, "deployment"),
+    (GLOBAL_PODS, fetchJsonForList, "pods"),
+    (GLOBAL_PVCS, fetchJsonForList, "pvc"),
+    (GLOBAL_CONFIGMAP, fetchJsonForList, "configmap"),
+    (GLOBAL_IBM, fetchJsonForApiResources, "|".join(CR_PATTERNS)),
+    (GLOBAL_POD_METRICS, fetchJsonForList, "pods.metrics.k8s.io"), #Pod usage, one list for all pods (metrics API)
+    (GLOBAL_NODES, fetchJsonForList, "nodes"), #Node allocatable, one list for all nodes
+    (GLOBAL_EVENTS, fetchJsonForList, "events"), #One bulk events list (-E)
+  ]
+  return [fetchEntry for fetchEntry in fetchList if fetchEntry[2] in fetchPlan]
+
+
+#Pull the resources in fetchPlan for getGlobalJson(). Only pulls, the global dictionaries are set by
+#storeGlobalJson(), so this can run in a background thread (see pagedPull).
+#Returns tuple of (dictionary: [resource] = json, dictionary: [resource] = error string). A failed
+#pull has an empty item list.
+def pullGlobalJson(nameSpaceList, allNamespaces, fetchPlan):
+  if allNamespaces:
+    print(f"Pulling initial json data from cluster for all namespaces.",end='')
+  elif len(nameSpaceList) == 1:
+    print(f"Pulling initial json data from cluster for namespace {nameSpaceList[0]}.",end='')
+  else:
+    print(f"Pulling initial json data from cluster for namespaces {', '.join(nameSpaceList)}.",end='')
   sys.stdout.flush()
-  GLOBAL_CONFIGMAP[nameSpaceIn] = getJsonForResource("configmap",nameSpaceIn)
-  print(".",end='')
+  fetchScope = getFetchScope(nameSpaceList, allNamespaces)
+
+  pulledJson = {} #resource -> json
+  fetchErrors = {} #resource -> error string
+  with concurrent.futures.ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+    futureMap = {}
+    for (globalDict, fetchFunc, resource) in getFetchList(fetchPlan):
+      future = executor.submit(fetchFunc, resource, None if globalDict is GLOBAL_NODES else fetchScope, projectionIn=fetchPlan[resource])
+      futureMap[future] = resource
+
+    for future in concurrent.futures.as_completed(futureMap):
+      resource = futureMap[future]
+      try:
+        (resJson, errStr) = future.result()
+      except Exception as err:
+        (resJson, errStr) = (None, f"{type(err).__name__}: {err}")
+      if resJson is None:
+        fetchErrors[resource] = errStr
+        resJson = {"items": []}
+      pulledJson[resource] = resJson
+      if DEBUG_MODE: print(f"getGlobalJson: pulled {resource} ({len(resJson.get('items',[]))} items)")
+      print(".",end='')
+      sys.stdout.flush()
+  print(". complete.")
+  return (pulledJson, fetchErrors)
+
+
+#Store the json pulled by pullGlobalJson() in the global dictionaries, per namespace, and the
+#resourceVersion of each list in GLOBAL_LIST_VERSIONS. With all namespaces, the namespaces are the ones
+#holding pods or pvcs. When those come from a pagedPull instead, they are all the namespaces pulled.
+#Returns the list of namespaces.
+def storeGlobalJson(nameSpaceList, allNamespaces, fetchPlan, pulledJson, fetchErrors):
+  fetchScope = getFetchScope(nameSpaceList, allNamespaces)
+  for (globalDict, fetchFunc, resource) in getFetchList(fetchPlan):
+    listScope = None if globalDict is GLOBAL_NODES else fetchScope
+    GLOBAL_LIST_VERSIONS[(listScope, resource)] = (pulledJson[resource].get("metadata") or {}).get("resourceVersion") or None
+
+  if allNamespaces:
+    nameSpaceSet = set()
+    for resource in [resource for resource in ("pods", "pvc") if resource in pulledJson] or pulledJson:
+      if resource != "nodes":
+        for item in pulledJson[resource].get("items",[]):
+          nameSpaceSet.add(item.get("metadata").get("namespace"))
+    nameSpaceList = sorted(nameSpaceSet)
+
+  #Store the pulled json in the global dictionaries, per namespace:
+  for (globalDict, fetchFunc, resource) in getFetchList(fetchPlan):
+    if globalDict is GLOBAL_NODES:
+      globalDict.update(pulledJson[resource])
+    elif fetchScope is None:
+      globalDict.update(splitItemsByNamespace(pulledJson[resource], nameSpaceList))
+    else:
+      globalDict[fetchScope] = pulledJson[resource]
+    if resource in fetchErrors:
+      for nameSpace in nameSpaceList or ["all"]:
+        noteFetchError(nameSpace, resource, fetchErrors[resource])
+  setUnplannedKinds(nameSpaceList, fetchPlan)
+
+  #Report each failed pull:
+  for resource, errStr in fetchErrors.items():
+    print(f"Error: Failed to pull {resource} for namespace(s) {', '.join(nameSpaceList) or 'all'}: {errStr}",file=sys.stderr)
+  return nameSpaceList
+
+
+#Kinds left out of the plan are stored as empty item lists, and loaded when needed (see lookupResource()).
+def setUnplannedKinds(nameSpaceList, fetchPlan):
+  for (kind, (globalName, resource)) in LAZY_KINDS.items():
+    if resource not in fetchPlan:
+      for nameSpace in nameSpaceList:
+        globals()[globalName][nameSpace] = {"items": []}
+        GLOBAL_UNPLANNED_KINDS[nameSpace].add(kind)
+
+
+#Returns the fetch plan for a print mode, dictionary: [resource] = projection (None for ITEM_PROJECTION).
+#The owner chain kinds are always planned, with only the fields owner resolution uses (OWNER_PROJECTION).
+#The other kinds come from FETCH_PLANS (all of FETCH_PLAN_ALL for --top by pvc/pods, and for output
+#modes without a plan). Pods and pvcs are always pulled, a mode that does not use them keeps only their
+#owner fields, so every mode finds the same services. Only configmaps are skipped (see LAZY_KINDS).
+#With fullPull (snapshots, --watch, --output), every kind is pulled with all fields.
+#A snapshot also holds the events, so it can be replayed with -E.
+def getFetchPlan(printMode, topBy=None, fullPull=False, snapshot=False):
+  ownerProjection = None if fullPull else OWNER_PROJECTION
+  fetchPlan = {resource: ownerProjection for resource in ("statefulset", "replicaset", "jobs", "deployment", "|".join(CR_PATTERNS))}
+  if printMode == "top":
+    planKinds = {"pvc"} if topBy == "pvc" else {"pods"}
+  else:
+    planKinds = set(FETCH_PLANS.get(printMode, FETCH_PLAN_ALL))
+  if fullPull:
+    planKinds |= FETCH_PLAN_ALL
+  if snapshot:
+    planKinds.add("events")
+  for resource in ("pods", "pvc"):
+    fetchPlan[resource] = ownerProjection
+  for resource in planKinds:
+    fetchPlan[resource] = EVENT_PROJECTION if resource == "events" else None
+  if DEBUG_MODE: print(f"getFetchPlan: {printMode} (fullPull {fullPull}): {sorted(fetchPlan)}")
+  return fetchPlan
+
+
+#Split a list json pulled across all namespaces into one list json per namespace.
+#Returns dictionary: [namespace] = {"items": [...]}, for each namespace in nameSpaceList.
+def splitItemsByNamespace(resJson, nameSpaceList):
+  splitJson = {}
+  for nameSpace in nameSpaceList:
+    splitJson[nameSpace] = {"items": []}
+  for item in resJson.get("items",[]):
+    itemNameSpace = item.get("metadata").get("namespace")
+    if itemNameSpace in splitJson:
+      splitJson[itemNameSpace]["items"].append(item)
+  return splitJson
+
+
+#Returns the label selector string of a selector json (spec.selector), or None if it selects nothing.
+#Ex: {"matchLabels": {"app": "zen"}, "matchExpressions": [{"key": "tier", "operator": "In", "values": ["a","b"]}]}
+#    -> "app=zen,tier in (a,b)"
+def getSelectorString(selectorJson):
+  terms = [f"{key}={value}" for key, value in (selectorJson.get("matchLabels") or {}).items()]
+  for expr in selectorJson.get("matchExpressions") or []:
+    (key, operator, values) = (expr.get("key"), expr.get("operator"), ",".join(expr.get("values") or []))
+    if operator == "In": terms.append(f"{key} in ({values})")
+    elif operator == "NotIn": terms.append(f"{key} notin ({values})")
+    elif operator == "Exists": terms.append(key)
+    elif operator == "DoesNotExist": terms.append(f"!{key}")
+  return ",".join(terms) or None
+
+
+#Run the fetches of getServiceJson() concurrently (FETCH_WORKERS at a time). fetchList is a list of
+#(key, resource, fetch function, keyword arguments), each call is fetchFunc(resource, nameSpaceIn, **kwargs).
+#Returns dictionary: [key] = json. A failed fetch is left out, reported and recorded in GLOBAL_FETCH_ERRORS,
+#except an object fetched by name that no longer exists, which is only left out.
+def runServiceFetches(fetchList, nameSpaceIn):
+  pulledJson = {}
+  with concurrent.futures.ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+    futureMap = {executor.submit(fetchFunc, resource, nameSpaceIn, **kwargs): (key, resource)
+                 for (key, resource, fetchFunc, kwargs) in fetchList}
+    for future in concurrent.futures.as_completed(futureMap):
+      (key, resource) = futureMap[future]
+      try:
+        (resJson, errStr) = future.result()
+      except Exception as err:
+        (resJson, errStr) = (None, f"{type(err).__name__}: {err}")
+      if resJson is not None:
+        pulledJson[key] = resJson
+      elif "/" in resource and PERMANENT_ERROR_RE.search(errStr):
+        if DEBUG_MODE: print(f"runServiceFetches: {resource} not fetched: {errStr}")
+      else:
+        print(f"\nError: Failed to pull {resource} for namespace {nameSpaceIn}: {errStr}",file=sys.stderr)
+        noteFetchError(nameSpaceIn, resource.split("/")[0], errStr)
+      print(".",end='')
+      sys.stdout.flush()
+  return pulledJson
+
+
+#Pull only the json of one service (-S kind/name) in one namespace, instead of the whole namespace.
+#The service resource is fetched by name. Its subtree is found top-down by owner uid (first ownerReference,
+#as controlledBy() uses), in the controller kinds and custom resources (owner and selector fields only),
+#and in the configmaps, pods and pvcs (owner fields only, the api transport gets just their metadata).
+#The subtree's pods and pvcs are then listed whole with the label selector of each statefulset, replicaset
+#and job in the subtree (a statefulset's claims carry its selector labels). Owner uids can not be selected
+#on, so the few owned by a custom resource, configmap or pod are fetched by name.
+#The global dictionaries then hold only the subtree, so only its objects are compiled.
+#Returns the namespace list, or None if the service could not be fetched.
+def getServiceJson(serviceIn, nameSpaceIn, withMetrics=False, withEvents=False):
+  print(f"Pulling json data from cluster for service {serviceIn} in namespace {nameSpaceIn}.",end='')
   sys.stdout.flush()
+  (rootJson, errStr) = fetchJsonForResource(serviceIn, nameSpaceIn)
+  if rootJson is None:
+    print(". failed.")
+    print(f"Error: Failed to pull service {serviceIn} for namespace {nameSpaceIn}: {errStr}",file=sys.stderr)
+    return None
 
-  #Get ibm resource list
-  if DEBUG_MODE: print(f"getGlobalJson: runIt 'oc api-resources --namespaced=true -o name | grep ibm'")
-  (resList,rErr,rRC) = runIt("oc api-resources --namespaced=true -o name | grep ibm", True)
-  if rRC == 0:
-    print(".",end='')
-    sys.stdout.flush()
+  #List of (global dictionary, fetch function, resource, projection) for the owner walk:
+  walkList = [
+    (GLOBAL_STATEFULSET, fetchJsonForList, "statefulset", SELECTOR_PROJECTION),
+    (GLOBAL_REPLICASET, fetchJsonForList, "replicaset", SELECTOR_PROJECTION),
+    (GLOBAL_JOBS, fetchJsonForList, "jobs", SELECTOR_PROJECTION),
+    (GLOBAL_DEPLOYMENT, fetchJsonForList, "deployment", OWNER_PROJECTION),
+    (GLOBAL_CONFIGMAP, fetchJsonForList, "configmap", OWNER_PROJECTION),
+    (GLOBAL_IBM, fetchJsonForApiResources, "|".join(CR_PATTERNS), OWNER_PROJECTION),
+    (GLOBAL_PODS, fetchJsonForList, "pods", OWNER_PROJECTION),
+    (GLOBAL_PVCS, fetchJsonForList, "pvc", OWNER_PROJECTION),
+  ]
+  #Pod usage and events are kept whole, they are not part of the owner walk:
+  wholeLists = []
+  if withMetrics:
+    wholeLists.append((GLOBAL_POD_METRICS, fetchJsonForList, "pods.metrics.k8s.io", None))
+  if withEvents:
+    wholeLists.append((GLOBAL_EVENTS, fetchJsonForList, "events", EVENT_PROJECTION))
+  pulledJson = runServiceFetches([(resource, resource, fetchFunc, {"projectionIn": projection})
+                                  for (globalDict, fetchFunc, resource, projection) in walkList + wholeLists], nameSpaceIn)
+
+  #Walk down from the service, through the items owned by something already in the subtree:
+  rootUid = rootJson.get("metadata").get("uid")
+  ownedItems = collections.defaultdict(list) #owner uid -> [(resource, item)]
+  for (globalDict, fetchFunc, resource, projection) in walkList:
+    for item in pulledJson.get(resource, {}).get("items",[]):
+      ownerJson = item.get("metadata").get("ownerReferences")
+      if ownerJson:
+        ownedItems[ownerJson[0].get("uid")].append((resource, item))
+  subtreeUids = {rootUid}
+  subtreeItems = collections.defaultdict(list) #resource -> items in the subtree
+  walkUids = [rootUid]
+  while walkUids:
+    for (resource, item) in ownedItems.pop(walkUids.pop(), []):
+      itemUid = item.get("metadata").get("uid")
+      if itemUid not in subtreeUids:
+        subtreeUids.add(itemUid)
+        subtreeItems[resource].append(item)
+        walkUids.append(itemUid)
+
+  #The subtree's pods and pvcs with all fields, [resource] = [uid] = json:
+  wantedNames = {resource: {item.get("metadata").get("uid"): item.get("metadata").get("name") for item in subtreeItems[resource]}
+                 for resource in ("pods", "pvc")}
+  fullJson = {"pods": {}, "pvc": {}}
+  listSelectors = set() #(resource, label selector)
+  listedOwners = set()  #uids of the owners whose pods (and claims) the selector lists return
+  for resource in ("statefulset", "replicaset", "jobs"):
+    for item in subtreeItems[resource]:
+      selector = getSelectorString((item.get("spec") or {}).get("selector") or {})
+      if selector:
+        listSelectors.update((listResource, selector) for listResource in (("pods", "pvc") if resource == "statefulset" else ("pods",)))
+        listedOwners.add(item.get("metadata").get("uid"))
+  fetchList = [((resource, selector), resource, fetchJsonForList, {"selectorIn": selector}) for (resource, selector) in sorted(listSelectors)]
+  fetchList += [((resource, item.get("metadata").get("name")), f"{resource}/{item.get('metadata').get('name')}", fetchJsonForResource, {})
+                for resource in fullJson for item in subtreeItems[resource]
+                if item.get("metadata").get("ownerReferences")[0].get("uid") not in listedOwners]
+  triedKeys = set()
+  while fetchList:
+    for ((resource, selectorOrName), resJson) in runServiceFetches(fetchList, nameSpaceIn).items():
+      for item in resJson.get("items", [resJson]):
+        if item.get("metadata").get("uid") in wantedNames[resource]:
+          fullJson[resource][item.get("metadata").get("uid")] = item
+    #A pod or pvc its selector list did not return (relabeled, or deleted since it was listed) is fetched by name.
+    #One deleted since is then left out:
+    triedKeys.update(key for (key, resource, fetchFunc, kwargs) in fetchList)
+    fetchList = [((resource, name), f"{resource}/{name}", fetchJsonForResource, {})
+                 for resource in fullJson for (itemUid, name) in wantedNames[resource].items()
+                 if itemUid not in fullJson[resource] and (resource, name) not in triedKeys]
+  print(". complete.")
 
-    resListComma = resList.replace("\n",",").rstrip(",")
-    GLOBAL_IBM[nameSpaceIn] = getJsonForResource(resListComma, nameSpaceIn)
-  print(".",end='')
-  sys.stdout.flush()
+  #Store the subtree in the global dictionaries, in the order it was listed in. The service itself is kept
+  #with the custom resources (indexed by its own kind, whatever kind it is):
+  for (globalDict, fetchFunc, resource, projection) in walkList:
+    itemsJson = fullJson[resource] if resource in fullJson else {item.get("metadata").get("uid"): item for item in subtreeItems[resource]}
+    globalDict[nameSpaceIn] = {"items": [itemsJson[item.get("metadata").get("uid")] for item in pulledJson.get(resource, {}).get("items",[])
+                                         if item.get("metadata").get("uid") in itemsJson]}
+  GLOBAL_IBM[nameSpaceIn]["items"].insert(0, rootJson)
+  for (globalDict, fetchFunc, resource, projection) in wholeLists:
+    globalDict[nameSpaceIn] = pulledJson.get(resource, {"items": []})
+  if DEBUG_MODE: print(f"getServiceJson: {len(subtreeUids)} resources in subtree of {serviceIn}, {len(fullJson['pods'])} pods, {len(fullJson['pvc'])} pvcs, {len(listSelectors)} selector lists")
+  return [nameSpaceIn]
+#End getServiceJson(serviceIn, nameSpaceIn, withMetrics=False, withEvents=False)
+
+
+#Returns the ownerCache for the given namespace, creating it if needed.
+def getOwnerCache(nameSpaceIn):
+  if nameSpaceIn not in GLOBAL_OWNER_CACHE:
+    GLOBAL_OWNER_CACHE[nameSpaceIn] = ownerCache(nameSpaceIn)
+  return GLOBAL_OWNER_CACHE[nameSpaceIn]
+
+
+#Build GLOBAL_RESOURCE_INDEX for the given namespace from the pre-pulled json.
+#The custom resources (GLOBAL_IBM, see CR_PATTERNS) are indexed together with the built in kinds.
+def buildResourceIndex(nameSpaceIn):
+  index = {}
+  #List of (global dictionary, kind to use when an item has no kind):
+  indexList = [
+    (GLOBAL_STATEFULSET, "statefulset"),
+    (GLOBAL_REPLICASET, "replicaset"),
+    (GLOBAL_JOBS, "job"),
+    (GLOBAL_DEPLOYMENT, "deployment"),
+    (GLOBAL_PODS, "pod"),
+    (GLOBAL_PVCS, "persistentvolumeclaim"),
+    (GLOBAL_CONFIGMAP, "configmap"),
+    (GLOBAL_IBM, None),
+    (GLOBAL_COGNITIVEDATA, None), #Only in snapshots from older versions
+  ]
+  for (globalDict, defaultKind) in indexList:
+    resJson = globalDict.get(nameSpaceIn)
+    if not resJson:
+      continue
+    for item in resJson.get("items",[]):
+      itemKind = item.get("kind",defaultKind)
+      if not itemKind:
+        continue
+      index[(itemKind.lower(), item.get("metadata").get("name"))] = item
+  GLOBAL_RESOURCE_INDEX[nameSpaceIn] = index
+  if DEBUG_MODE: print(f"buildResourceIndex: {len(index)} resources indexed for ns {nameSpaceIn}")
+
+
+#Returns the pre-pulled json for the given kind (lower case) and name, or None if not pulled.
+#A kind that was left out of the fetch plan is loaded for the namespace on its first miss.
+def lookupResource(kindIn, nameIn, nsIn):
+  resJson = GLOBAL_RESOURCE_INDEX[nsIn].get((kindIn, nameIn))
+  if resJson is None and kindIn in GLOBAL_UNPLANNED_KINDS.get(nsIn, ()):
+    loadUnplannedKind(kindIn, nsIn)
+    resJson = GLOBAL_RESOURCE_INDEX[nsIn].get((kindIn, nameIn))
+  return resJson
+
+
+#Pull a kind that was left out of the fetch plan (LAZY_KINDS) for one namespace, and add it to the index.
+#A configmap is only an owner chain link, so only its owner fields are kept.
+def loadUnplannedKind(kindIn, nsIn):
+  (globalName, resource) = LAZY_KINDS[kindIn]
+  GLOBAL_UNPLANNED_KINDS[nsIn].discard(kindIn)
+  if DEBUG_MODE: print(f"loadUnplannedKind: pulling {resource} for ns {nsIn}")
+  if GLOBAL_PROFILE is not None:
+    GLOBAL_PROFILE.addLazyLoad(nsIn, resource)
+  (resJson, errStr) = fetchJsonForList(resource, nsIn, projectionIn=OWNER_PROJECTION)
+  if resJson is None:
+    if errStr != RUN_BUDGET_ERROR:
+      print(f"Error: Failed to pull {resource} for namespace {nsIn}: {errStr}",file=sys.stderr)
+    noteFetchError(nsIn, resource, errStr)
+    return
+  globals()[globalName][nsIn] = resJson
+  index = GLOBAL_RESOURCE_INDEX[nsIn]
+  for item in resJson.get("items",[]):
+    index[(item.get("kind",kindIn).lower(), item.get("metadata").get("name"))] = item
+
+
+#Write all pulled json data (GLOBAL_* json dictionaries, discovery results and
+#cache miss lookups) to a gzip compressed json snapshot file.
+def saveSnapshot(fileIn, nameSpaceList):
+  snapshot = {
+    "version": SNAPSHOT_VERSION,
+    "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    "namespaces": nameSpaceList,
+    "globals": {globalName: globals()[globalName] for globalName in SNAPSHOT_GLOBALS},
+  }
+  try:
+    with gzip.open(fileIn, "wt", encoding="utf-8") as snapFile:
+      json.dump(snapshot, snapFile, separators=(",",":"))
+  except OSError as err:
+    print(f"Error: Failed to write snapshot file '{fileIn}': {err}",file=sys.stderr)
+    return False
+  print(f"Saved snapshot of namespace(s) {', '.join(nameSpaceList)} to {fileIn}.")
+  return True
 
-  #Get cognitivedata resource list
-  if DEBUG_MODE: print(f"getGlobalJson: runIt 'oc api-resources --namespaced=true -o name | grep cognitivedata'")
-  (resList,rErr,rRC) = runIt("oc api-resources --namespaced=true -o name | grep cognitivedata", True)
-  if rRC == 0:
-    print(".",end='')
-    sys.stdout.flush()
 
-    resListComma = resList.replace("\n",",").rstrip(",")
-    GLOBAL_COGNITIVEDATA[nameSpaceIn] = getJsonForResource(resListComma, nameSpaceIn)
-  print(". complete.")
-#End getGlobalJson(nameSpaceIn)
+#Load a snapshot file written by saveSnapshot() into the GLOBAL_* json dictionaries.
+#Returns the list of namespaces in the snapshot, or None on failure.
+def loadSnapshot(fileIn):
+  print(f"Loading json data from snapshot {fileIn}.")
+  try:
+    with gzip.open(fileIn, "rt", encoding="utf-8") as snapFile:
+      snapshot = json.load(snapFile)
+  except (OSError, ValueError) as err:
+    print(f"Error: Failed to read snapshot file '{fileIn}': {err}",file=sys.stderr)
+    return None
+  if snapshot.get("version") != SNAPSHOT_VERSION:
+    print(f"Error: Snapshot file '{fileIn}' has unsupported version '{snapshot.get('version')}'",file=sys.stderr)
+    return None
 
+  for globalName in SNAPSHOT_GLOBALS:
+    globalDict = globals()[globalName]
+    globalDict.clear()
+    globalDict.update(snapshot.get("globals").get(globalName,{}))
+  global SNAPSHOT_CREATED
+  SNAPSHOT_CREATED = snapshot.get("created")
+  if DEBUG_MODE: print(f"loadSnapshot: created {snapshot.get('created')}, namespaces {snapshot.get('namespaces')}")
+  return snapshot.get("namespaces")
 
-#Pull common json data from OCP cluster, running several oc commands. May take a while.
-def getGlobalEventsJson(nameSpaceIn):
-  print(f"Pulling Events json data from cluster for namespace {nameSpaceIn}.")
-  GLOBAL_EVENTS[nameSpaceIn] = getJsonForResource("events",nameSpaceIn)
+
+#Drop the pod, pvc and service objects, index and owner cache of a namespace once its output is written.
+#With releaseJson, the namespace's pulled json is dropped as well.
+def releaseNamespace(nameSpaceIn, releaseJson=False):
+  for globalDict in (GLOBAL_POD_OBJECTS, GLOBAL_PVC_OBJECTS, GLOBAL_SERVICE_OBJECTS, GLOBAL_RESOURCE_INDEX, GLOBAL_OWNER_CACHE):
+    globalDict.pop(nameSpaceIn, None)
+  if releaseJson:
+    #Fetch errors are kept, they are reported at the end of the run:
+    for globalName in SNAPSHOT_GLOBALS:
+      if globalName != "GLOBAL_FETCH_ERRORS":
+        globals()[globalName].pop(nameSpaceIn, None)
+
+
+#Record a pipeline stage for --profile, startTime is its time.perf_counter() start.
+def profileStage(stageName, nameSpaceIn, startTime):
+  if GLOBAL_PROFILE is not None:
+    GLOBAL_PROFILE.addStage(stageName, nameSpaceIn, startTime)
 
 
 #Create objects for pods, pvcs, and services, to be used throughout the program.
@@ -987,14 +2876,1037 @@ def compileClusterObjects(nameSpaceIn):
   if DEBUG_MODE: print(f"Create servobjs")
   createServiceObjects(nameSpaceIn)
   print(". complete.\n")
+  if DEBUG_MODE: print(f"compileClusterObjects: owner cache for ns {nameSpaceIn}: {getOwnerCache(nameSpaceIn).getStats()}")
+  if GLOBAL_PROFILE is not None:
+    GLOBAL_PROFILE.addOwnerCache(nameSpaceIn, getOwnerCache(nameSpaceIn).getStats())
+
+
+#Same as getGlobalJson() followed by compileClusterObjects() for each namespace, with the pod and pvc lists
+#arriving in pages from a pagedPull while the other kinds are pulled. Each page is added to the pulled json
+#and the index, and its pod and pvc objects are built right away. Owners can only be found once the other
+#kinds are in, and a pvc's once every pod page is in (a pvc may be owned by a pod), objects built before
+#then get their owners at that point. With --jobs, each page's objects are built by the process pool,
+#started once the other kinds are in, and pages that can not be built yet wait for it.
+#The service objects are built once everything is in. Returns the list of namespaces pulled.
+def compilePagedNamespaces(pagedPullIn):
+  #[resource] = (global dictionary, index kind, object class, object dictionary)
+  pagedKinds = {
+    "pods": (GLOBAL_PODS, "pod", podObject, GLOBAL_POD_OBJECTS),
+    "pvc": (GLOBAL_PVCS, "persistentvolumeclaim", pvcObject, GLOBAL_PVC_OBJECTS),
+  }
+  nameSpaceSeen = {} #Namespaces of the pages, in the order they were first seen
+  if not pagedPullIn.allNamespaces:
+    nameSpaceSeen = dict.fromkeys(pagedPullIn.nameSpaceList)
+    for (globalDict, kind, objClass, objDict) in pagedKinds.values():
+      for nameSpace in nameSpaceSeen:
+        globalDict[nameSpace] = {"items": []}
+  ownerNameSpaces = None #Namespaces of the other kinds, once they are in
+  pagesDone = set()
+  earlyObjects = [] #(resource, object) built before its owners could be found
+  waitingPages = [] #(namespace, resource, item names), with --jobs, not yet handed to the pool
+  poolTasks = []    #(namespace, future), with --jobs
+  executor = None
+  for (resource, pageJson) in pagedPullIn.getPages():
+    if resource is None:
+      #The other kinds are in: store them, and index them with the pages so far.
+      (pulledJson, fetchErrors) = pageJson
+      ownerNameSpaces = set(storeGlobalJson(pagedPullIn.nameSpaceList, pagedPullIn.allNamespaces, pagedPullIn.otherPlan, pulledJson, fetchErrors))
+      setUnplannedKinds([nameSpace for nameSpace in nameSpaceSeen if nameSpace not in ownerNameSpaces], pagedPullIn.fetchPlan)
+      for nameSpace in ownerNameSpaces | nameSpaceSeen.keys():
+        buildResourceIndex(nameSpace)
+      if pagedPullIn.allNamespaces:
+        print(f"Compiling pod, pvc, and service objects for all namespaces as pages arrive.",end='')
+      elif len(nameSpaceSeen) == 1:
+        print(f"Compiling pod, pvc, and service objects for namespace {pagedPullIn.nameSpaceList[0]} as pages arrive.",end='')
+      else:
+        print(f"Compiling pod, pvc, and service objects for namespaces {', '.join(nameSpaceSeen)} as pages arrive.",end='')
+      sys.stdout.flush()
+      if COMPILE_JOBS > 1:
+        executor = startCompilePool(ownerNameSpaces | nameSpaceSeen.keys(), COMPILE_JOBS, skipGlobals=("GLOBAL_PODS", "GLOBAL_PVCS"))
+    elif pageJson is None:
+      pagesDone.add(resource)
+    else:
+      #The first page's resourceVersion is the one the whole list is consistent with:
+      GLOBAL_LIST_VERSIONS.setdefault((pagedPullIn.fetchScope, resource), (pageJson.get("metadata") or {}).get("resourceVersion") or None)
+      (globalDict, kind, objClass, objDict) = pagedKinds[resource]
+      pageItems = collections.defaultdict(list) #[namespace] = items
+      for item in pageJson.get("items") or []:
+        pageItems[item.get("metadata").get("namespace") or pagedPullIn.fetchScope].append(item)
+      if DEBUG_MODE: print(f"compilePagedNamespaces: page of {len(pageJson.get('items') or [])} {resource} for ns {', '.join(pageItems)}")
+      for (nameSpace, items) in pageItems.items():
+        if nameSpace not in nameSpaceSeen:
+          if not pagedPullIn.allNamespaces:
+            continue
+          nameSpaceSeen[nameSpace] = None
+          for (pagedDict, pagedKind, pagedClass, pagedObjDict) in pagedKinds.values():
+            pagedDict[nameSpace] = {"items": []}
+          if ownerNameSpaces is not None and nameSpace not in ownerNameSpaces:
+            buildResourceIndex(nameSpace)
+            setUnplannedKinds([nameSpace], pagedPullIn.fetchPlan)
+        globalDict[nameSpace]["items"].extend(items)
+        index = GLOBAL_RESOURCE_INDEX[nameSpace]
+        for item in items:
+          index[(kind, item.get("metadata").get("name"))] = item
+        itemNames = [item.get("metadata").get("name") for item in items]
+        if COMPILE_JOBS > 1:
+          #Placeholders keep the objects in list order, until the pool's results are merged:
+          objDict[nameSpace].update(dict.fromkeys(itemNames))
+          waitingPages.append((nameSpace, resource, itemNames))
+          continue
+        withOwners = ownerNameSpaces is not None and (resource == "pods" or "pods" in pagesDone or "pods" not in pagedPullIn.resources)
+        for itemName in itemNames:
+          objDict[nameSpace][itemName] = objClass(itemName, nameSpace, withOwners=withOwners)
+          if not withOwners:
+            earlyObjects.append((resource, objDict[nameSpace][itemName]))
+
+    #Find the owners of the objects built early, or hand the waiting pages to the pool, once they can be:
+    if ownerNameSpaces is None:
+      continue
+    podsIn = "pods" in pagesDone or "pods" not in pagedPullIn.resources
+    for (objResource, resObj) in earlyObjects:
+      if objResource == "pods" or podsIn:
+        resObj.resolveOwners()
+    earlyObjects = [(objResource, resObj) for (objResource, resObj) in earlyObjects if objResource != "pods" and not podsIn]
+    for (nameSpace, pageResource, itemNames) in waitingPages:
+      if pageResource == "pods":
+        itemsIn = {"pod": [GLOBAL_RESOURCE_INDEX[nameSpace][("pod", itemName)] for itemName in itemNames]}
+        poolTasks.append((nameSpace, executor.submit(compileObjectsChunk, nameSpace, itemNames, [], itemsIn)))
+      elif podsIn:
+        #With the pods owning any of the pvcs, so their owners are found without a call:
+        pvcItems = [GLOBAL_RESOURCE_INDEX[nameSpace][("persistentvolumeclaim", itemName)] for itemName in itemNames]
+        ownerPods = [GLOBAL_RESOURCE_INDEX[nameSpace].get(("pod", ownerJson[0].get("name"))) for ownerJson in
+                     (item.get("metadata").get("ownerReferences") for item in pvcItems) if ownerJson and ownerJson[0].get("kind") == "Pod"]
+        itemsIn = {"persistentvolumeclaim": pvcItems, "pod": [podJson for podJson in ownerPods if podJson]}
+        poolTasks.append((nameSpace, executor.submit(compileObjectsChunk, nameSpace, [], itemNames, itemsIn)))
+    waitingPages = [(nameSpace, pageResource, itemNames) for (nameSpace, pageResource, itemNames) in waitingPages
+                    if pageResource != "pods" and not podsIn]
+    print(".",end='')
+    sys.stdout.flush()
+
+  if executor is not None:
+    for (nameSpace, future) in poolTasks:
+      mergeCompileResult(nameSpace, future.result())
+    executor.shutdown()
+
+  #With all namespaces, the namespaces are the ones holding pods or pvcs:
+  nameSpaceList = list(nameSpaceSeen) if not pagedPullIn.allNamespaces else sorted(nameSpaceSeen)
+  for nameSpace in ownerNameSpaces - nameSpaceSeen.keys():
+    releaseNamespace(nameSpace, releaseJson=True)
+  for resource, errStr in pagedPullIn.fetchErrors.items():
+    print(f"\nError: Failed to pull {resource} for namespace(s) {', '.join(nameSpaceList) or 'all'}: {errStr}",file=sys.stderr)
+    for nameSpace in nameSpaceList or ["all"]:
+      noteFetchError(nameSpace, resource, errStr)
+
+  if DEBUG_MODE: print(f"Create servobjs")
+  for nameSpace in nameSpaceList:
+    createServiceObjects(nameSpace)
+    if DEBUG_MODE: print(f"compilePagedNamespaces: owner cache for ns {nameSpace}: {getOwnerCache(nameSpace).getStats()}")
+    if GLOBAL_PROFILE is not None and executor is None:
+      GLOBAL_PROFILE.addOwnerCache(nameSpace, getOwnerCache(nameSpace).getStats())
+  print(". complete.\n")
+  return nameSpaceList
+
+
+#Set up a compile worker process (--jobs). settingsIn has the COMPILE_WORKER_SETTINGS values and jsonIn the
+#SNAPSHOT_GLOBALS json of the namespaces to compile. When forked, the worker already has both, and only
+#needs its own api connections. With --profile, profileStartIn is the main process' profile start time.
+def initCompileWorker(settingsIn, jsonIn, profileStartIn=None):
+  global ACTIVE_TRANSPORT, GLOBAL_PROFILE
+  globals().update(settingsIn)
+  GLOBAL_PROFILE = None if profileStartIn is None else profileRecorder(None, profileStartIn)
+  for globalName, globalJson in jsonIn.items():
+    if globals()[globalName] is not globalJson:
+      globals()[globalName].update(globalJson)
+  if SNAPSHOT_REPLAY:
+    return
+  if ACTIVE_TRANSPORT is None:
+    setupTransport(TRANSPORT_TYPE)
+  else:
+    ACTIVE_TRANSPORT.resetConnections()
+
+
+#Compile task run in a worker process: build the pod and pvc objects for the given names of one namespace.
+#itemsIn has json the worker was not set up with, [index kind] = items (pages of a pagedPull).
+#Returns tuple of (pod objects, pvc objects, json fetched on cache misses, fetch errors, --profile records or None),
+#all picklable.
+def compileObjectsChunk(nameSpaceIn, podNames, pvcNames, itemsIn=None):
+  startTime = time.perf_counter()
+  if nameSpaceIn not in GLOBAL_RESOURCE_INDEX:
+    buildResourceIndex(nameSpaceIn)
+  for (kind, items) in (itemsIn or {}).items():
+    for item in items:
+      GLOBAL_RESOURCE_INDEX[nameSpaceIn][(kind, item.get("metadata").get("name"))] = item
+  knownFallback = set(GLOBAL_FALLBACK_JSON[nameSpaceIn])
+  cacheStats = getOwnerCache(nameSpaceIn).getStats()
+  podObjects = [podObject(pod, nameSpaceIn) for pod in podNames]
+  pvcObjects = [pvcObject(pvc, nameSpaceIn) for pvc in pvcNames]
+  fetchedJson = {resource: resJson for resource, resJson in GLOBAL_FALLBACK_JSON[nameSpaceIn].items() if resource not in knownFallback}
+  if DEBUG_MODE: print(f"compileObjectsChunk: pid {os.getpid()}: {len(podNames)} pods, {len(pvcNames)} pvcs for ns {nameSpaceIn}, owner cache: {getOwnerCache(nameSpaceIn).getStats()}")
+  profileRecords = None
+  if GLOBAL_PROFILE is not None:
+    #Only this task's share of the owner cache counters, the cache is kept across the worker's tasks:
+    GLOBAL_PROFILE.addOwnerCache(nameSpaceIn, {key: value - cacheStats[key] for key, value in getOwnerCache(nameSpaceIn).getStats().items()})
+    GLOBAL_PROFILE.addStage("compile task", nameSpaceIn, startTime)
+    profileRecords = GLOBAL_PROFILE.takeRecords()
+  return (podObjects, pvcObjects, fetchedJson, dict(GLOBAL_FETCH_ERRORS[nameSpaceIn]), profileRecords)
+
+
+#Start a pool of workerCount compile worker processes, set up with the json of the given namespaces
+#(see initCompileWorker()), except the globals in skipGlobals.
+def startCompilePool(nameSpaceList, workerCount, skipGlobals=()):
+  settings = {settingName: globals()[settingName] for settingName in COMPILE_WORKER_SETTINGS}
+  workerJson = {globalName: {ns: globals()[globalName][ns] for ns in nameSpaceList if ns in globals()[globalName]}
+                for globalName in SNAPSHOT_GLOBALS if globalName != "GLOBAL_DISCOVERY" and globalName not in skipGlobals}
+  workerJson["GLOBAL_DISCOVERY"] = GLOBAL_DISCOVERY
+  return concurrent.futures.ProcessPoolExecutor(max_workers=workerCount, initializer=initCompileWorker,
+                                                initargs=(settings, workerJson, GLOBAL_PROFILE.startTime if GLOBAL_PROFILE else None))
+
+
+#Merge the result of a compileObjectsChunk() task into the global dictionaries.
+def mergeCompileResult(nameSpaceIn, taskResult):
+  (podObjects, pvcObjects, fetchedJson, fetchErrors, profileRecords) = taskResult
+  if profileRecords:
+    GLOBAL_PROFILE.mergeRecords(profileRecords)
+  for podobj in podObjects:
+    GLOBAL_POD_OBJECTS[nameSpaceIn][podobj.name] = podobj
+  for pvcobj in pvcObjects:
+    GLOBAL_PVC_OBJECTS[nameSpaceIn][pvcobj.name] = pvcobj
+  GLOBAL_FALLBACK_JSON[nameSpaceIn].update(fetchedJson)
+  for resource, errStr in fetchErrors.items():
+    GLOBAL_FETCH_ERRORS[nameSpaceIn].setdefault(resource, errStr)
+
+
+#Same as compileClusterObjects() for every namespace in the list, using a pool of COMPILE_JOBS processes.
+#The pod and pvc objects (and json fetched on cache misses) are merged back into the global dictionaries
+#in the original order, then the service objects are built from them in this process.
+def compileNamespacesInPool(nameSpaceList):
+  #Tasks of (namespace, pod names, pvc names):
+  taskList = []
+  chunkSize = None
+  if len(nameSpaceList) < COMPILE_JOBS:
+    totalNames = sum(len(GLOBAL_PODS[ns].get("items")) + len(GLOBAL_PVCS[ns].get("items")) for ns in nameSpaceList)
+    chunkSize = max(COMPILE_CHUNK_SIZE, -(-totalNames // COMPILE_JOBS))
+  for nameSpace in nameSpaceList:
+    podNames = getPodList(nameSpace)
+    pvcNames = [item.get("metadata").get("name") for item in GLOBAL_PVCS[nameSpace].get("items")]
+    if chunkSize is None or len(podNames) + len(pvcNames) <= chunkSize:
+      taskList.append((nameSpace, podNames, pvcNames))
+      continue
+    for i in range(0, len(podNames), chunkSize):
+      taskList.append((nameSpace, podNames[i:i+chunkSize], []))
+    for i in range(0, len(pvcNames), chunkSize):
+      taskList.append((nameSpace, [], pvcNames[i:i+chunkSize]))
+
+  #Not worth starting processes for a single task:
+  if len(taskList) <= 1:
+    for nameSpace in nameSpaceList:
+      compileClusterObjects(nameSpace)
+    return
+
+  print(f"Compiling pod, pvc, and service objects for namespace(s) {', '.join(nameSpaceList)} ({len(taskList)} tasks, {COMPILE_JOBS} jobs).",end='')
+  sys.stdout.flush()
+  taskResults = [None] * len(taskList)
+  with startCompilePool(nameSpaceList, min(COMPILE_JOBS, len(taskList))) as executor:
+    futureMap = {executor.submit(compileObjectsChunk, *task): i for i, task in enumerate(taskList)}
+    for future in concurrent.futures.as_completed(futureMap):
+      taskResults[futureMap[future]] = future.result()
+      print(".",end='')
+      sys.stdout.flush()
+
+  for (nameSpace, podNames, pvcNames), taskResult in zip(taskList, taskResults):
+    mergeCompileResult(nameSpace, taskResult)
+  for nameSpace in nameSpaceList:
+    createServiceObjects(nameSpace)
+  print(". complete.\n")
+#End compileNamespacesInPool(nameSpaceList)
+
+#Join the pulled pod metrics (GLOBAL_POD_METRICS) to the pod objects by pod name, and add them up per service.
+#Pods without metrics (not running, or too new) keep a usage of None.
+def attachPodUsage(nameSpaceIn):
+  metricsJson = GLOBAL_POD_METRICS.get(nameSpaceIn) or {}
+  podObjects = GLOBAL_POD_OBJECTS[nameSpaceIn]
+  for item in metricsJson.get("items",[]):
+    podobj = podObjects.get(item.get("metadata").get("name"))
+    if podobj is None:
+      continue
+    podobj.cpuUsage = 0
+    podobj.memoryUsage = 0
+    for cont in item.get("containers") or []:
+      usage = cont.get("usage") or {}
+      (cpuUsage,) = ocpValsToIntegers([usage.get("cpu") or "0"], "m")
+      (memoryUsage,) = ocpValsToIntegers([usage.get("memory") or "0"], "Ki")
+      podobj.cpuUsage += cpuUsage
+      podobj.memoryUsage += memoryUsage
+    if podobj.primaryOwner:
+      GLOBAL_SERVICE_OBJECTS[nameSpaceIn][podobj.primaryOwner].addPodUsage(podobj)
+  if DEBUG_MODE: print(f"attachPodUsage: {len(metricsJson.get('items',[]))} pod metrics for ns {nameSpaceIn}")
+
+
+#Search one container's log for LOG_PATTERN, line by line as it is read.
+#Returns tuple of (list of matching lines, error string). Lines matched before an error are kept.
+def searchContainerLog(podIn, containerIn, nameSpaceIn):
+  matches = []
+  for (line, errStr) in ACTIVE_TRANSPORT.getLogLines(podIn, containerIn, nameSpaceIn, LOG_PREVIOUS, SINCE_SECONDS):
+    if errStr:
+      return (matches, errStr)
+    if LOG_PATTERN.search(line):
+      matches.append(line.decode(errors="replace").rstrip("\r\n"))
+  return (matches, None)
+
+
+#Search the logs of the given pods' containers (init containers included) for LOG_PATTERN, FETCH_WORKERS
+#containers at a time. The container names come from the pod objects, no calls are needed to find them.
+#Matches are printed in pod order, each container as soon as it and the ones before it are searched.
+#A container with no log to read is skipped. Other failures are reported, and leave the search incomplete.
+def searchPodLogs(nameSpaceIn, podNames):
+  podObjects = GLOBAL_POD_OBJECTS[nameSpaceIn]
+  searchList = [(podName, cont.name) for podName in podNames for cont in podObjects[podName].containers]
+  print(f"Searching the {'previous ' if LOG_PREVIOUS else ''}logs of {len(searchList)} containers in {len(podNames)} pods for '{LOG_PATTERN.pattern.decode()}':")
+  sys.stdout.flush()
+  matchLines = 0
+  matchContainers = 0
+  with concurrent.futures.ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+    results = executor.map(lambda podContainer: searchContainerLog(podContainer[0], podContainer[1], nameSpaceIn), searchList)
+    for ((podName, containerName), (matches, errStr)) in zip(searchList, results):
+      if errStr and NO_LOG_ERROR_RE.search(errStr):
+        if DEBUG_MODE: print(f"searchPodLogs: no log for {podName} ({containerName}): {errStr}")
+      elif errStr:
+        if errStr != RUN_BUDGET_ERROR:
+          print(f"Error: Failed to read the log of {podName} ({containerName}) for namespace {nameSpaceIn}: {errStr}",file=sys.stderr)
+        noteFetchError(nameSpaceIn, f"pod/{podName} log ({containerName})", errStr)
+      if matches:
+        matchLines += len(matches)
+        matchContainers += 1
+        print(f"--- {podName} ({containerName}) ---")
+        for line in matches:
+          print(line)
+        sys.stdout.flush()
+  print(f"{matchLines} matching lines in {matchContainers} of {len(searchList)} containers.")
+
+
+#Parse a duration (Ex: 90, 90s, 30m, 2h, 1d) into seconds. Returns None if it is not a valid duration.
+def parseDuration(valIn):
+  match = re.match(r"^([0-9]+(?:\.[0-9]*)?)([smhd]?)$", valIn)
+  if not match:
+    return None
+  return float(match.group(1)) * {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}[match.group(2)]
+
+
+#Returns the time an event was last seen, as a timezone aware datetime, or None if it has no time.
+#Newer events only set eventTime (and series.lastObservedTime when repeated).
+def getEventTime(eventJson):
+  for timeStr in ((eventJson.get("series") or {}).get("lastObservedTime"), eventJson.get("lastTimestamp"),
+                  eventJson.get("eventTime"), (eventJson.get("metadata") or {}).get("creationTimestamp")):
+    if timeStr:
+      try:
+        return datetime.datetime.fromisoformat(timeStr.replace("Z", "+00:00"))
+      except ValueError:
+        continue
+  return None
+
+
+#Index the pulled events (GLOBAL_EVENTS) of a namespace by involved object, in GLOBAL_EVENT_INDEX.
+#Events older than --since are dropped, and each object keeps its EVENTS_PER_OBJECT most recent events.
+#The window ends at the time of the run, or when replaying a snapshot, at the time it was taken.
+def buildEventIndex(nameSpaceIn):
+  endTime = datetime.datetime.now(datetime.timezone.utc)
+  if SNAPSHOT_CREATED:
+    try:
+      endTime = datetime.datetime.strptime(SNAPSHOT_CREATED, "%Y-%m-%dT%H:%M:%S%z")
+    except ValueError:
+      pass
+  startTime = None if SINCE_SECONDS is None else endTime - datetime.timedelta(seconds=SINCE_SECONDS)
+  eventList = []
+  for item in (GLOBAL_EVENTS.get(nameSpaceIn) or {}).get("items",[]):
+    eventTime = getEventTime(item)
+    if startTime is not None and (eventTime is None or eventTime < startTime):
+      continue
+    eventList.append((eventTime, item))
+
+  oldestTime = datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
+  eventList.sort(key=lambda timeItem: timeItem[0] or oldestTime)
+  index = {}
+  for (eventTime, item) in eventList:
+    involved = item.get("involvedObject") or {}
+    objectName = f"{(involved.get('kind') or '').lower()}/{involved.get('name')}"
+    if objectName not in index:
+      index[objectName] = collections.deque(maxlen=EVENTS_PER_OBJECT)
+    count = (item.get("series") or {}).get("count") or item.get("count") or 1
+    index[objectName].append(eventEntry(eventTime, item.get("type"), item.get("reason"), item.get("message") or "", count))
+  GLOBAL_EVENT_INDEX[nameSpaceIn] = index
+  if DEBUG_MODE: print(f"buildEventIndex: {len(eventList)} events for {len(index)} objects in ns {nameSpaceIn}")
+
+
+#Join the indexed events to the pod and pvc objects, and roll them up per service: a service gets the events
+#of itself, the owners between it and its pods and pvcs (Ex: replicaset, statefulset), and its pods and pvcs.
+def attachEvents(nameSpaceIn):
+  buildEventIndex(nameSpaceIn)
+  index = GLOBAL_EVENT_INDEX[nameSpaceIn]
+  for objDict in (GLOBAL_POD_OBJECTS[nameSpaceIn], GLOBAL_PVC_OBJECTS[nameSpaceIn]):
+    for resObj in objDict.values():
+      resObj.events = list(index.get(resObj.longName, ()))
+
+  for servobj in GLOBAL_SERVICE_OBJECTS[nameSpaceIn].values():
+    members = [GLOBAL_POD_OBJECTS[nameSpaceIn][podName] for podName in servobj.podList] + \
+              [GLOBAL_PVC_OBJECTS[nameSpaceIn][pvcName] for pvcName in servobj.pvcList]
+    objectNames = [servobj.longName]
+    for resObj in members:
+      objectNames.extend(reversed(resObj.getOwnerHierarchy()[:-1]))
+    objectNames.extend(resObj.longName for resObj in members)
+    servobj.events = {objectName: list(index[objectName]) for objectName in dict.fromkeys(objectNames) if objectName in index}
+
+
+#Print the events of each object, dictionary: [kind/name] = list of eventEntry. Events are indented
+#below their object name.
+def printObjectEvents(objectEvents, indent, fileOut=None):
+  if not objectEvents:
+    print(f"{ASPACE*indent}None",file=fileOut)
+    return
+  for (objectName, events) in objectEvents.items():
+    print(f"{ASPACE*indent}{objectName}:",file=fileOut)
+    for event in events:
+      eventTime = event.time.astimezone().strftime("%Y-%m-%d %H:%M:%S") if event.time else "(no time)"
+      countStr = f" (x{event.count})" if event.count > 1 else ""
+      print(f"{ASPACE*(indent+4)}{eventTime}  {event.type}  {event.reason}{countStr}: {event.message.strip()}",file=fileOut)
+
+
+#Returns used as a percentage of requested, or "-" if either is not known.
+def getUtilization(used, requested):
+  if used is None or not requested:
+    return "-"
+  return f"{used / requested * 100:.1f}%"
+
+
+#Returns "used/requested/limit (utilization of requests)" for the given unit ("m" or "Ki").
+def formatUsage(used, requested, limit, unit):
+  usedStr = "-" if used is None else f"{used}{unit}"
+  return f"{usedStr}/{requested}{unit}/{limit}{unit} ({getUtilization(used, requested)} of requests)"
+
+
+#Print a usage table row for each of the pods: used (metrics API), requested and limit cpu and memory.
+def printPodUsage(nameSpaceIn, podNames, podColumns, fileOut=None, indent=8):
+  if len(podNames) == 0:
+    print(f"{ASPACE:{indent}}None",file=fileOut)
+    return
+  print(f"{ASPACE:{indent}}{'Name'.ljust(podColumns)}   {'CPU Used':>10} {'Requested':>10} {'Limit':>10} {'Util':>7}"
+        f"   {'Mem Used':>12} {'Requested':>12} {'Limit':>12} {'Util':>7}",file=fileOut)
+  podObjects = GLOBAL_POD_OBJECTS[nameSpaceIn]
+  for pod in podNames:
+    podobj = podObjects[pod]
+    cpuUsed = "-" if podobj.cpuUsage is None else f"{podobj.cpuUsage}m"
+    memUsed = "-" if podobj.memoryUsage is None else f"{podobj.memoryUsage}Ki"
+    print(f"{ASPACE:{indent}}{pod.ljust(podColumns)}   {cpuUsed:>10} {f'{podobj.cpuRequest}m':>10} {f'{podobj.cpuLimit}m':>10}"
+          f" {getUtilization(podobj.cpuUsage, podobj.cpuRequest):>7}"
+          f"   {memUsed:>12} {f'{podobj.memoryRequest}Ki':>12} {f'{podobj.memoryLimit}Ki':>12}"
+          f" {getUtilization(podobj.memoryUsage, podobj.memoryRequest):>7}",file=fileOut)
+
+
+#Returns the service names of a namespace in report order: as found, or sorted by a SORT_COLUMNS column.
+def getSortedServiceNames(nameSpaceIn, sortBy=None):
+  serviceObjects = GLOBAL_SERVICE_OBJECTS[nameSpaceIn]
+  if not sortBy:
+    return list(serviceObjects.keys())
+  (sortKey, descending) = SORT_COLUMNS[sortBy]
+  return sorted(serviceObjects.keys(), key=lambda serviceName: sortKey(serviceObjects[serviceName]), reverse=descending)
+
+
+#Print the output for the given print mode, for the desired services in one namespace.
+#printMode is one of: summary, podtree, fullpodtree, cpu, memory, pvc, standalone, usage
+#The report is rendered into one buffer, with the column width worked out once, and written at the end.
+def printNamespaceResults(nameSpaceIn, printMode, specificService=None, sortBy=None):
+  #Determine which service(s) to act upon:
+  if specificService:
+    serviceList=[specificService]
+  else:
+    serviceList=getSortedServiceNames(nameSpaceIn, sortBy)
+  if DEBUG_MODE: print(f"serviceList: {serviceList}")
+  serviceObjects = GLOBAL_SERVICE_OBJECTS[nameSpaceIn]
+  reportOut = io.StringIO()
+
+  #Print the desired items:
+  if printMode == "summary":
+  #- Print footprint summary for all desired services -#
+    for serviceName in serviceList:
+      serviceObjects[serviceName].printPodTree(summary=True, fileOut=reportOut)
+    #Print orphan resources:
+    if not specificService: printOrphanResources(nameSpaceIn, summary=True, fileOut=reportOut)
+
+  elif printMode == "podtree":
+  #Print just pods for each desired service:
+    for serviceName in serviceList:
+      serviceObjects[serviceName].printPodTreeSummary(fileOut=reportOut)
+
+    #Print orphan pods:
+    if not specificService: 
+      print(f"Standalone Pods (No owner/controller):",file=reportOut)
+      orphanPods = getOrphanPods(nameSpaceIn)
+      if len(orphanPods) == 0:
+        print(f"{ASPACE:4}None",file=reportOut)
+      else:
+        for pod in orphanPods:
+          print(f"{ASPACE:4}Name: {pod}",file=reportOut)
+
+  elif printMode == "fullpodtree":
+  #Print verbose pod tree for all desired services:
+    for serviceName in serviceList:
+      serviceObjects[serviceName].printPodTree(fileOut=reportOut)
+    #Print orphan resources:
+    if not specificService: printOrphanResources(nameSpaceIn, fileOut=reportOut)
+
+  elif printMode in ("cpu", "memory", "pvc"):
+  #Print total requested cpus, total requested memory, or total pvc capacity for desired services:
+    serviceColumns = len(getLongestServiceName(nameSpaceIn))
+    for serviceName in serviceList:
+      servobj = serviceObjects[serviceName]
+      if printMode == "cpu":
+        servobj.printServiceCpu(serviceColumns, fileOut=reportOut)
+      elif printMode == "memory":
+        servobj.printServiceMemory(serviceColumns, fileOut=reportOut)
+      else:
+        servobj.printServicePvc(serviceColumns, fileOut=reportOut)
+    
+    #Print orphan resources:
+    if printMode == "pvc" and not specificService: 
+      #This count is for the longest service name - (diff of "Service (Primary Owner):" and "Standalone Pvcs (No owner/controller)")
+      formatColumnCount = serviceColumns - 14
+      orphanPvcCap=getOrphanPvcsCapacity(nameSpaceIn)
+      print(f"Standalone Pvcs (No owner/controller): {' '.ljust(formatColumnCount)}   PVC Capacity: {orphanPvcCap}Gi",file=reportOut)
+
+  elif printMode == "standalone":
+    printOrphanResources(nameSpaceIn, fileOut=reportOut)
+
+  elif printMode == "usage":
+  #Print used, requested and limit cpu and memory for desired services and their pods:
+    podColumns = max((len(pod) for pod in GLOBAL_POD_OBJECTS[nameSpaceIn].keys()), default=0)
+    for serviceName in serviceList:
+      serviceObjects[serviceName].printServiceUsage(podColumns, fileOut=reportOut)
+    if not specificService:
+      print(f"Standalone Pods (No owner/controller):",file=reportOut)
+      printPodUsage(nameSpaceIn, getOrphanPods(nameSpaceIn), podColumns, reportOut, 4)
+
+  elif printMode == "events":
+  #Print the recent events of each desired service's objects, and of the standalone pods and pvcs:
+    for serviceName in serviceList:
+      serviceObjects[serviceName].printServiceEvents(fileOut=reportOut)
+    if not specificService:
+      orphanEvents = {}
+      for (objDict, orphanNames) in ((GLOBAL_POD_OBJECTS[nameSpaceIn], getOrphanPods(nameSpaceIn)),
+                                     (GLOBAL_PVC_OBJECTS[nameSpaceIn], getOrphanPvcs(nameSpaceIn))):
+        for orphanName in orphanNames:
+          if objDict[orphanName].getEvents():
+            orphanEvents[objDict[orphanName].longName] = objDict[orphanName].getEvents()
+      print(f"Standalone Pods and Pvcs (No owner/controller):",file=reportOut)
+      printObjectEvents(orphanEvents, 4, reportOut)
+
+  elif printMode == "logs":
+  #Search the logs of the service's pods, or of every pod. Matches are printed as they are found, not with the report:
+    if specificService:
+      searchPodLogs(nameSpaceIn, serviceObjects[specificService].podList)
+    else:
+      searchPodLogs(nameSpaceIn, list(GLOBAL_POD_OBJECTS[nameSpaceIn]))
+
+  sys.stdout.write(reportOut.getvalue())
+#End printNamespaceResults(nameSpaceIn, printMode, specificService=None, sortBy=None)
+
+
+#Print the totals across all given namespaces, for the summary, cpu, memory and pvc print modes.
+def printGrandTotal(nameSpaceList, printMode, specificService=None):
+  totalCpu = 0
+  totalMemory = 0
+  totalPvcCapacity = 0
+  totalServices = 0
+  totalPods = 0
+  for nameSpace in nameSpaceList:
+    for serviceName, servobj in GLOBAL_SERVICE_OBJECTS[nameSpace].items():
+      if specificService and serviceName != specificService:
+        continue
+      totalServices += 1
+      totalPods += len(servobj.podList)
+      totalCpu += servobj.requestedCpu
+      totalMemory += servobj.requestedMemory
+      totalPvcCapacity += servobj.totalPvcCapacity
+    if not specificService:
+      totalPvcCapacity += getOrphanPvcsCapacity(nameSpace)
+
+  reducedMem=reduceValue(f"{totalMemory}Ki")
+  reducedCpu=reduceValue(f"{totalCpu}m")
+  print(PRINTLINE,end='')
+  print(f"Grand Total ({len(nameSpaceList)} namespaces, {totalServices} services, {totalPods} pods):")
+  if printMode in ("summary", "memory"):
+    print(f"{ASPACE:4}Total Requested Memory: {totalMemory}Ki ({reducedMem})")
+  if printMode in ("summary", "cpu"):
+    print(f"{ASPACE:4}Total Requested CPU: {totalCpu}m ({reducedCpu})")
+  if printMode in ("summary", "pvc"):
+    print(f"{ASPACE:4}Total PVC Capacity: {totalPvcCapacity}Gi")
+#End printGrandTotal(nameSpaceList, printMode, specificService=None)
+
+
+#Watch one resource kind for watch mode, putting (resource, event type, object) on eventQueue.
+#Runs in its own thread until the program ends, restarting the watch whenever the stream ends.
+#Without a resourceVersion to start from (lists pulled by oc, the custom resources, or after a 410) the kind
+#is listed again first, and queued as a RESYNC event (the object is the list), so no change is missed.
+def watchResource(resourceIn, scopeIn, eventQueue):
+  resourceVersion = GLOBAL_LIST_VERSIONS.get((scopeIn, resourceIn))
+  retryDelay = 1
+  while True:
+    if not resourceVersion:
+      (listJson, errStr) = ACTIVE_TRANSPORT.getListJson(resourceIn, scopeIn)
+      if listJson is None:
+        eventQueue.put((resourceIn, "ERROR", {"message": errStr}))
+        retryDelay = min(retryDelay * 2, 60)
+        time.sleep(retryDelay)
+        continue
+      listJson["items"] = [projectJson(item, ITEM_PROJECTION) for item in listJson.get("items") or []]
+      eventQueue.put((resourceIn, "RESYNC", listJson))
+      resourceVersion = (listJson.get("metadata") or {}).get("resourceVersion")
+    for (eventType, objIn) in ACTIVE_TRANSPORT.watchJson(resourceIn, scopeIn, resourceVersion):
+      if eventType == "ERROR":
+        #410 Gone: resourceVersion is too old. List again, and watch from there.
+        if objIn.get("code") == 410:
+          resourceVersion = None
+        else:
+          eventQueue.put((resourceIn, eventType, objIn))
+          retryDelay = min(retryDelay * 2, 60)
+        break
+      retryDelay = 1
+      resourceVersion = (objIn.get("metadata") or {}).get("resourceVersion") or resourceVersion
+      if eventType != "BOOKMARK":
+        eventQueue.put((resourceIn, eventType, projectJson(objIn, ITEM_PROJECTION)))
+    time.sleep(retryDelay)
+
+
+#Returns the serviceObject for the given primary owner, creating it if needed.
+def getServiceObject(nameSpaceIn, serviceName):
+  if serviceName not in GLOBAL_SERVICE_OBJECTS[nameSpaceIn]:
+    GLOBAL_SERVICE_OBJECTS[nameSpaceIn][serviceName] = serviceObject(serviceName, nameSpaceIn)
+  return GLOBAL_SERVICE_OBJECTS[nameSpaceIn][serviceName]
+
+
+#Record the totals of a service before a watch event changes it (None for orphans, or a new service).
+#touched dictionary: [(namespace, service name or None for orphans)] = totals before the events.
+def noteService(nameSpaceIn, serviceName, touched):
+  if (nameSpaceIn, serviceName) in touched:
+    return
+  servobj = GLOBAL_SERVICE_OBJECTS[nameSpaceIn].get(serviceName) if serviceName else None
+  touched[(nameSpaceIn, serviceName)] = servobj.getTotals() if servobj else None
+
+
+#Remove a pod or pvc object from its service. A service left with no pods or pvcs is removed.
+def removeFromService(nameSpaceIn, resObj, touched):
+  noteService(nameSpaceIn, resObj.primaryOwner, touched)
+  if not resObj.primaryOwner:
+    return
+  servobj = GLOBAL_SERVICE_OBJECTS[nameSpaceIn][resObj.primaryOwner]
+  if type(resObj) is podObject:
+    servobj.removePod(resObj)
+  else:
+    servobj.removePvc(resObj)
+  if not servobj.podList and not servobj.pvcList:
+    del GLOBAL_SERVICE_OBJECTS[nameSpaceIn][resObj.primaryOwner]
+
+
+#Replace (or remove, if it no longer exists) the pod object of a changed pod, and move it between services.
+def updatePodObject(nameSpaceIn, podName, exists, touched):
+  oldPod = GLOBAL_POD_OBJECTS[nameSpaceIn].pop(podName, None)
+  if oldPod:
+    removeFromService(nameSpaceIn, oldPod, touched)
+  getOwnerCache(nameSpaceIn).forget(f"pod/{podName}")
+  if not exists:
+    return
+  podobj = podObject(podName, nameSpaceIn)
+  GLOBAL_POD_OBJECTS[nameSpaceIn][podName] = podobj
+  noteService(nameSpaceIn, podobj.primaryOwner, touched)
+  if podobj.primaryOwner:
+    getServiceObject(nameSpaceIn, podobj.primaryOwner).addPod(podobj)
+
+
+#Replace (or remove, if it no longer exists) the pvc object of a changed pvc, and move it between services.
+def updatePvcObject(nameSpaceIn, pvcName, exists, touched):
+  oldPvc = GLOBAL_PVC_OBJECTS[nameSpaceIn].pop(pvcName, None)
+  if oldPvc:
+    removeFromService(nameSpaceIn, oldPvc, touched)
+  getOwnerCache(nameSpaceIn).forget(f"persistentvolumeclaim/{pvcName}")
+  if not exists:
+    return
+  pvcobj = pvcObject(pvcName, nameSpaceIn)
+  GLOBAL_PVC_OBJECTS[nameSpaceIn][pvcName] = pvcobj
+  noteService(nameSpaceIn, pvcobj.primaryOwner, touched)
+  if pvcobj.primaryOwner:
+    getServiceObject(nameSpaceIn, pvcobj.primaryOwner).addPvc(pvcobj)
+
+
+#Apply one watch event: update GLOBAL_RESOURCE_INDEX, and the pod, pvc and service objects it affects.
+#Only the changed object is rebuilt. The exception is an owner that moves to a different owner, which
+#is rare, and needs all pods and pvcs below it to be moved (a scan of the namespace).
+def applyWatchEvent(resourceIn, eventType, objIn, scopeIn, touched):
+  metadata = objIn.get("metadata") or {}
+  nameSpace = metadata.get("namespace") or scopeIn
+  if nameSpace not in GLOBAL_RESOURCE_INDEX:
+    return
+  kind = WATCH_RESOURCES.get(resourceIn) or objIn.get("kind","").lower()
+  name = metadata.get("name")
+  exists = eventType != "DELETED"
+  if DEBUG_MODE: print(f"applyWatchEvent: {eventType} {kind}/{name} in ns {nameSpace}")
+  if exists:
+    GLOBAL_RESOURCE_INDEX[nameSpace][(kind, name)] = objIn
+  else:
+    GLOBAL_RESOURCE_INDEX[nameSpace].pop((kind, name), None)
+
+  if kind == "pod":
+    updatePodObject(nameSpace, name, exists, touched)
+  elif kind == "persistentvolumeclaim":
+    updatePvcObject(nameSpace, name, exists, touched)
+  else:
+    cache = getOwnerCache(nameSpace)
+    longName = f"{kind}/{name}"
+    oldOwner = cache.forget(longName)
+    if exists and oldOwner is not None and cache.getOwner(longName) != oldOwner:
+      if DEBUG_MODE: print(f"applyWatchEvent: {longName} moved from owner '{oldOwner}' to '{cache.getOwner(longName)}'")
+      cache.forgetAncestors()
+      for podName in [podName for podName, podobj in GLOBAL_POD_OBJECTS[nameSpace].items() if longName in podobj.ownerHierarchy]:
+        updatePodObject(nameSpace, podName, True, touched)
+      for pvcName in [pvcName for pvcName, pvcobj in GLOBAL_PVC_OBJECTS[nameSpace].items() if longName in pvcobj.ownerHierarchy]:
+        updatePvcObject(nameSpace, pvcName, True, touched)
+
+
+#Apply a new list of a watched kind (RESYNC event, see watchResource()): each listed object that is not
+#indexed, or has a different resourceVersion, is applied as MODIFIED, and each indexed object of the kind
+#that is no longer listed as DELETED.
+def applyWatchResync(resourceIn, listJson, scopeIn, touched):
+  kinds = {WATCH_RESOURCES.get(resourceIn) or listJson.get("kind","")[:-len("List")].lower()}
+  listed = set()
+  for item in listJson.get("items") or []:
+    metadata = item.get("metadata") or {}
+    nameSpace = metadata.get("namespace") or scopeIn
+    key = (WATCH_RESOURCES.get(resourceIn) or item.get("kind","").lower(), metadata.get("name"))
+    kinds.add(key[0])
+    listed.add((nameSpace, key))
+    indexed = GLOBAL_RESOURCE_INDEX.get(nameSpace, {}).get(key)
+    if indexed is None or (indexed.get("metadata") or {}).get("resourceVersion") != metadata.get("resourceVersion"):
+      applyWatchEvent(resourceIn, "MODIFIED", item, scopeIn, touched)
+  kinds.discard("")
+  for nameSpace in GLOBAL_RESOURCE_INDEX:
+    if scopeIn is not None and nameSpace != scopeIn:
+      continue
+    goneList = [key for key in GLOBAL_RESOURCE_INDEX[nameSpace] if key[0] in kinds and (nameSpace, key) not in listed]
+    for key in goneList:
+      applyWatchEvent(resourceIn, "DELETED", GLOBAL_RESOURCE_INDEX[nameSpace][key], scopeIn, touched)
+
+
+#Print the services changed by a batch of watch events, in the given print mode.
+#Services are printed when their totals changed (podtree modes: when any of their pods or pvcs changed).
+def printWatchUpdates(touched, nameSpaceList, printMode, specificService, eventCount):
+  changedServices = collections.defaultdict(list) #[namespace] = list of service names
+  changedOrphans = set()
+  for (nameSpace, serviceName), oldTotals in touched.items():
+    if serviceName is None:
+      if not specificService and printMode not in ("cpu", "memory"):
+        changedOrphans.add(nameSpace)
+      continue
+    if printMode == "standalone" or (specificService and serviceName != specificService):
+      continue
+    servobj = GLOBAL_SERVICE_OBJECTS[nameSpace].get(serviceName)
+    if servobj is None:
+      changed = oldTotals is not None
+    else:
+      changed = printMode in ("podtree", "fullpodtree") or servobj.getTotals() != oldTotals
+    if changed:
+      changedServices[nameSpace].append(serviceName)
+  if not changedServices and not changedOrphans:
+    return
+
+  print(f"{PRINTLINE}Update at {time.strftime('%H:%M:%S')} ({eventCount} events):")
+  for nameSpace in nameSpaceList:
+    if nameSpace not in changedServices and nameSpace not in changedOrphans:
+      continue
+    if len(nameSpaceList) > 1:
+      print(f"Namespace: {nameSpace}")
+    for serviceName in changedServices[nameSpace]:
+      if serviceName in GLOBAL_SERVICE_OBJECTS[nameSpace]:
+        printNamespaceResults(nameSpace, printMode, serviceName)
+      else:
+        print(f"Service (Primary Owner): {serviceName} removed")
+    if nameSpace in changedOrphans:
+      printOrphanResources(nameSpace, summary=printMode in ("summary", "podtree", "pvc"))
+  if len(nameSpaceList) > 1 and printMode in ("summary", "cpu", "memory", "pvc"):
+    printGrandTotal(nameSpaceList, printMode, specificService)
+  sys.stdout.flush()
+
+
+#Watch mode: follow changes to pods, pvcs and their owner kinds (with the custom resources found by the
+#pull, see CR_PATTERNS), and keep the pod, pvc and service objects up to date from the events, printing the
+#services that changed. Watches have the scope of the pull (see getFetchScope()). Runs until Ctrl-C.
+def watchNamespaces(nameSpaceList, printMode, specificService=None, allNamespaces=False):
+  scope = getFetchScope(nameSpaceList, allNamespaces)
+  eventQueue = queue.Queue()
+  crResources = [resource for resource in GLOBAL_DISCOVERY.get("|".join(CR_PATTERNS), "").split(",") if resource]
+  for resource in list(WATCH_RESOURCES) + crResources:
+    threading.Thread(target=watchResource, args=(resource, scope, eventQueue), daemon=True).start()
+  print(f"{PRINTLINE}Watching namespace(s) {', '.join(nameSpaceList)} for changes (Ctrl-C to stop).")
+  sys.stdout.flush()
+
+  try:
+    while True:
+      #Wait for an event, then take everything that arrives shortly after, so a burst is printed once:
+      events = [eventQueue.get()]
+      time.sleep(WATCH_SETTLE)
+      while True:
+        try:
+          events.append(eventQueue.get_nowait())
+        except queue.Empty:
+          break
+
+      touched = {}
+      for (resource, eventType, objIn) in events:
+        if eventType == "ERROR":
+          print(f"Error: Watch on {resource} failed, retrying: {objIn.get('message')}",file=sys.stderr)
+          continue
+        if eventType == "RESYNC":
+          applyWatchResync(resource, objIn, scope, touched)
+          continue
+        applyWatchEvent(resource, eventType, objIn, scope, touched)
+      printWatchUpdates(touched, nameSpaceList, printMode, specificService, len(events))
+  except KeyboardInterrupt:
+    print("\nWatch stopped.")
+#End watchNamespaces(nameSpaceList, printMode, specificService=None, allNamespaces=False)
+
+
+#Returns an output record with all OUTPUT_FIELDS set to None, except the given ones.
+def newRecord(**fieldsIn):
+  record = dict.fromkeys(OUTPUT_FIELDS)
+  record.update(fieldsIn)
+  return record
+
+
+#Output record for a service. Limits count the same (active) pods as the requests.
+def getServiceRecord(nameSpaceIn, servobj):
+  storageBytes = sum(GLOBAL_PVC_OBJECTS[nameSpaceIn][pvcName].capacityBytes for pvcName in servobj.pvcList)
+  record = newRecord(record="service", namespace=nameSpaceIn, service=servobj.longName, name=servobj.longName, orphan=False,
+                     cpu_request_millicores=servobj.requestedCpu, cpu_limit_millicores=servobj.limitCpu,
+                     memory_request_bytes=servobj.requestedMemory * 1024, memory_limit_bytes=servobj.limitMemory * 1024,
+                     storage_bytes=storageBytes, pod_count=len(servobj.podList), pvc_count=len(servobj.pvcList))
+  if servobj.usagePods:
+    record.update(cpu_usage_millicores=servobj.usedCpu, memory_usage_bytes=servobj.usedMemory * 1024)
+  return record
+
+
+#Output record for a pod. serviceName is None for a standalone (orphan) pod.
+def getPodRecord(nameSpaceIn, podobj, serviceName):
+  return newRecord(record="pod", namespace=nameSpaceIn, service=serviceName, name=podobj.name, orphan=serviceName is None,
+                   status=podobj.getStatus(), node=podobj.getNodeName(),
+                   cpu_request_millicores=podobj.cpuRequest, cpu_limit_millicores=podobj.cpuLimit,
+                   memory_request_bytes=podobj.memoryRequest * 1024, memory_limit_bytes=podobj.memoryLimit * 1024,
+                   restarts=podobj.restarts, owner_path=podobj.getOwnerHierarchy(), pvc_mounts=podobj.getPvcs(),
+                   cpu_usage_millicores=podobj.cpuUsage,
+                   memory_usage_bytes=None if podobj.memoryUsage is None else podobj.memoryUsage * 1024)
+
+
+#Output record for a pvc. serviceName is None for a standalone (orphan) pvc.
+def getPvcRecord(nameSpaceIn, pvcobj, serviceName):
+  return newRecord(record="pvc", namespace=nameSpaceIn, service=serviceName, name=pvcobj.name, orphan=serviceName is None,
+                   storage_bytes=pvcobj.capacityBytes, storage_class=pvcobj.getStorageClass(),
+                   volume=pvcobj.getVolumeName(), owner_path=pvcobj.getOwnerHierarchy())
+
+
+#Write the output records for one namespace: each service followed by its pods and pvcs, then the
+#standalone pods and pvcs. The print mode selects the records: summary/cpu/memory/pvc write services
+#only, standalone writes the standalone pods and pvcs only, podtree/fullpodtree/usage (or none) write all.
+def writeNamespaceRecords(writer, nameSpaceIn, printMode=None, specificService=None, sortBy=None):
+  writeServices = printMode != "standalone"
+  writeMembers = printMode in (None, "podtree", "fullpodtree", "usage")
+  writeOrphans = printMode in (None, "podtree", "fullpodtree", "standalone", "usage") and not specificService
+
+  if writeServices:
+    serviceList = [specificService] if specificService else getSortedServiceNames(nameSpaceIn, sortBy)
+    for serviceName in serviceList:
+      servobj = GLOBAL_SERVICE_OBJECTS[nameSpaceIn][serviceName]
+      writer.write(getServiceRecord(nameSpaceIn, servobj))
+      if writeMembers:
+        for podName in servobj.podList:
+          writer.write(getPodRecord(nameSpaceIn, GLOBAL_POD_OBJECTS[nameSpaceIn][podName], serviceName))
+        for pvcName in servobj.pvcList:
+          writer.write(getPvcRecord(nameSpaceIn, GLOBAL_PVC_OBJECTS[nameSpaceIn][pvcName], serviceName))
+
+  if writeOrphans:
+    for podName in getOrphanPods(nameSpaceIn):
+      writer.write(getPodRecord(nameSpaceIn, GLOBAL_POD_OBJECTS[nameSpaceIn][podName], None))
+    for pvcName in getOrphanPvcs(nameSpaceIn):
+      writer.write(getPvcRecord(nameSpaceIn, GLOBAL_PVC_OBJECTS[nameSpaceIn][pvcName], None))
+#End writeNamespaceRecords(writer, nameSpaceIn, printMode=None, specificService=None, sortBy=None)
+
+
+#Returns the pulls that failed or timed out (GLOBAL_FETCH_ERRORS), list of (namespace, resource, error string).
+#The results of these namespaces are incomplete. Namespace is "all" for a failed pull across all namespaces.
+def getIncompleteResults():
+  return [(nameSpace, resource, errStr) for nameSpace in sorted(GLOBAL_FETCH_ERRORS)
+          for (resource, errStr) in sorted(GLOBAL_FETCH_ERRORS[nameSpace].items())]
+
+
+#Print which namespaces and kinds the results above are missing data for.
+def printIncompleteResults(incompleteList):
+  print(f"{PRINTLINE}Warning: Results are incomplete, data could not be pulled for:")
+  for (nameSpace, resource, errStr) in incompleteList:
+    print(f"{ASPACE*4}Namespace {nameSpace}: {resource} ({errStr})")
+
+
+#Write an "incomplete" record (name is the resource, status the error) for each failed pull.
+def writeIncompleteRecords(writer, incompleteList):
+  for (nameSpace, resource, errStr) in incompleteList:
+    writer.write(newRecord(record="incomplete", namespace=nameSpace, name=resource, status=errStr))
+
+
+#Print the topCount services with the largest byColumn total (cpu, memory, pvc or pods), across the given
+#namespaces, with each service's share of its namespace's total. Uses a bounded heap instead of a full sort.
+#Namespace totals are the sum over its services (plus standalone pvcs for pvc), like printGrandTotal().
+def printTopServices(nameSpaceList, topCount, byColumn):
+  (sortKey, descending) = SORT_COLUMNS[byColumn]
+  candidates = ((sortKey(servobj), nameSpace, serviceName) for nameSpace in nameSpaceList
+                for serviceName, servobj in GLOBAL_SERVICE_OBJECTS[nameSpace].items())
+  topList = heapq.nlargest(topCount, candidates)
+
+  nameSpaceTotals = {}
+  for (value, nameSpace, serviceName) in topList:
+    if nameSpace not in nameSpaceTotals:
+      total = sum(sortKey(servobj) for servobj in GLOBAL_SERVICE_OBJECTS[nameSpace].values())
+      if byColumn == "pvc":
+        total += getOrphanPvcsCapacity(nameSpace)
+      nameSpaceTotals[nameSpace] = total
+
+  #Rows of (rank, namespace, service, value, share), column widths from the rows printed:
+  rows = []
+  for rank, (value, nameSpace, serviceName) in enumerate(topList, 1):
+    if byColumn == "cpu":
+      valueStr = f"{value}m ({reduceValue(f'{value}m')})"
+    elif byColumn == "memory":
+      valueStr = f"{value}Ki ({reduceValue(f'{value}Ki')})"
+    elif byColumn == "pvc":
+      valueStr = f"{value}Gi"
+    else:
+      valueStr = f"{value}"
+    total = nameSpaceTotals[nameSpace]
+    shareStr = f"{value / total * 100:.1f}%" if total else "-"
+    rows.append((f"{rank}", nameSpace, serviceName, valueStr, shareStr))
+  headers = ("Rank", "Namespace", "Service (Primary Owner)", TOP_COLUMN_TITLES[byColumn], "Share of Namespace")
+  showNameSpace = len(nameSpaceList) > 1
+  widths = [max([len(headers[col])] + [len(row[col]) for row in rows]) for col in range(len(headers))]
+
+  reportOut = io.StringIO()
+  nameSpaceDesc = f"namespaces {', '.join(nameSpaceList)}" if showNameSpace else f"namespace {nameSpaceList[0]}"
+  print(f"Top {len(rows)} services by {TOP_COLUMN_TITLES[byColumn].lower()} ({nameSpaceDesc}):",file=reportOut)
+  for row in [headers] + rows:
+    columns = [row[col].ljust(widths[col]) for col in range(len(row)) if showNameSpace or col != 1]
+    print("   ".join(columns).rstrip(),file=reportOut)
+  if not rows:
+    print(f"{ASPACE:4}None",file=reportOut)
+  sys.stdout.write(reportOut.getvalue())
+#End printTopServices(nameSpaceList, topCount, byColumn)
+
+
+#Returns the allocatable cpu (in mili) and memory (in KiB) of each pulled node, dictionary: [node] = (cpu, memory)
+def getNodeAllocatable():
+  allocatableOut = {}
+  for item in GLOBAL_NODES.get("items",[]):
+    allocatable = (item.get("status") or {}).get("allocatable") or {}
+    (cpuAlloc,) = ocpValsToIntegers([allocatable.get("cpu") or "0"], "m")
+    (memoryAlloc,) = ocpValsToIntegers([allocatable.get("memory") or "0"], "Ki")
+    allocatableOut[item.get("metadata").get("name")] = (cpuAlloc, memoryAlloc)
+  return allocatableOut
+
+
+#One pass over the pod objects of the given namespaces, adding up the requests of the active pods by node
+#and service. Returns nested dictionary: [node][(namespace, service or None for standalone pods)] = [cpu, memory, pods]
+def getNodeAggregates(nameSpaceList):
+  nodeServices = collections.defaultdict(dict)
+  for nameSpace in nameSpaceList:
+    for podobj in GLOBAL_POD_OBJECTS[nameSpace].values():
+      if podobj.getStatus() != "Running" and podobj.getStatus() != "Pending":
+        continue
+      serviceTotals = nodeServices[podobj.getNodeName() or "(unscheduled)"]
+      totals = serviceTotals.get((nameSpace, podobj.primaryOwner))
+      if totals is None:
+        totals = serviceTotals[(nameSpace, podobj.primaryOwner)] = [0, 0, 0]
+      totals[0] += podobj.cpuRequest
+      totals[1] += podobj.memoryRequest
+      totals[2] += 1
+  return nodeServices
+
+
+#Returns value as a percentage of allocatable, or "-" if allocatable is not known.
+def getAllocatedPercent(value, allocatable):
+  if not allocatable:
+    return "-"
+  return f"{value / allocatable * 100:.1f}%"
+
+
+#Print the requests of the given namespaces' active pods per node, and the services behind them, with the
+#percentage of the node's allocatable cpu and memory. The busiest nodes (highest cpu or memory percentage) come first.
+def printNodeResults(nameSpaceList):
+  nodeServices = getNodeAggregates(nameSpaceList)
+  nodeAllocatable = getNodeAllocatable()
+  showNameSpace = len(nameSpaceList) > 1
+
+  #Node totals, and the busiest first:
+  nodeRows = []
+  for nodeName in set(nodeServices) | set(nodeAllocatable):
+    serviceTotals = nodeServices.get(nodeName, {})
+    cpuTotal = sum(totals[0] for totals in serviceTotals.values())
+    memoryTotal = sum(totals[1] for totals in serviceTotals.values())
+    podTotal = sum(totals[2] for totals in serviceTotals.values())
+    (cpuAlloc, memoryAlloc) = nodeAllocatable.get(nodeName, (0, 0))
+    busiest = max(cpuTotal / cpuAlloc if cpuAlloc else 0, memoryTotal / memoryAlloc if memoryAlloc else 0)
+    nodeRows.append((busiest, cpuTotal, nodeName, memoryTotal, podTotal, cpuAlloc, memoryAlloc))
+  nodeRows.sort(reverse=True)
+
+  serviceColumns = max([len(ASPACE) + 12] + [len(serviceName or "(standalone)") + (len(nameSpace) + 3 if showNameSpace else 0)
+                                             for serviceTotals in nodeServices.values() for (nameSpace, serviceName) in serviceTotals])
+  reportOut = io.StringIO()
+  nameSpaceDesc = f"namespaces {', '.join(nameSpaceList)}" if showNameSpace else f"namespace {nameSpaceList[0]}"
+  print(f"Requests per node of active pods in {nameSpaceDesc}, as a percentage of node allocatable:",file=reportOut)
+  for (busiest, cpuTotal, nodeName, memoryTotal, podTotal, cpuAlloc, memoryAlloc) in nodeRows:
+    allocDesc = f"cpu:{cpuAlloc}m/mem:{memoryAlloc}Ki" if nodeName in nodeAllocatable else "unknown"
+    print(f"Node: {nodeName}\n"
+          f"{ASPACE:4}Allocatable: {allocDesc}\n"
+          f"{ASPACE:4}Requested CPU: {cpuTotal}m ({getAllocatedPercent(cpuTotal, cpuAlloc)})"
+          f"   Requested Memory: {memoryTotal}Ki ({getAllocatedPercent(memoryTotal, memoryAlloc)})   Pods: {podTotal}",file=reportOut)
+    serviceTotals = nodeServices.get(nodeName, {})
+    for (nameSpace, serviceName), (cpu, memory, pods) in sorted(serviceTotals.items(), key=lambda entry: entry[1], reverse=True):
+      serviceDesc = serviceName or "(standalone)"
+      if showNameSpace:
+        serviceDesc = f"{nameSpace} / {serviceDesc}"
+      print(f"{ASPACE:8}{serviceDesc.ljust(serviceColumns)}   cpu:{cpu}m ({getAllocatedPercent(cpu, cpuAlloc)})"
+            f"   mem:{memory}Ki ({getAllocatedPercent(memory, memoryAlloc)})   pods:{pods}",file=reportOut)
+  sys.stdout.write(reportOut.getvalue())
+#End printNodeResults(nameSpaceList)
+
 
 def printUsage():
-  printVars="{Ttsacmp}"
+  printVars="{TtsacmpuE}"
   print(f'''\
-Usage: {sys.argv[0]} -n <ns> -{printVars} [-S <service>]
+Usage: {sys.argv[0]} -n <ns> [-n <ns> ...] | --all-namespaces -{printVars} [-S <service>]
   Parameters:
-    -n ns / --namespace    - Namespace to query
+    -n ns / --namespace    - Namespace to query. May be given more than once
+    -A / --all-namespaces  - Query all namespaces
     -S service / --service - [Optional] Specific service to query, in format 'kind/serviceName'
+    --fetch-workers N      - [Optional] Number of concurrent calls for the initial data pull (default {FETCH_WORKERS})
+    --jobs N               - [Optional] Number of processes compiling pod, pvc and service objects (default {COMPILE_JOBS})
+    --page-size N          - [Optional] Pull lists N items per call (default {PAGE_SIZE}, 0 for one call per list). With one
+                             namespace, pods and pvcs are compiled page by page while the rest is still pulled
+    --call-timeout S       - [Optional] Seconds a single cluster call may take, it is then tried again (default {CALL_TIMEOUT})
+    --budget S             - [Optional] Stop pulling after S seconds in all, and report what was pulled, marking the
+                             namespaces and kinds that are incomplete (exit status 3)
+    --profile file         - [Optional] Write a json report of stage and call timings (oc commands, api requests,
+                             bytes and parse time) and cache miss fallbacks to file ('-' for stderr) at exit
+    --transport api|oc     - [Optional] Talk to the API server directly (api), or run oc commands (oc). Default {TRANSPORT_TYPE}
+    --save-snapshot file   - [Optional] Save all pulled cluster data to a compressed snapshot file
+    --from-snapshot file   - [Optional] Use a snapshot file instead of the cluster (no oc calls). -n is optional
+    --cr-pattern regex     - [Optional] Also pull custom resources whose api resource name matches regex. May be given
+                             more than once (default: {' '.join(CR_PATTERNS)})
+    --refresh-discovery    - [Optional] Ignore the cached api discovery result, and replace it
+    --sort column          - [Optional] Order services by name, or by cpu, memory, pvc or pods (largest first)
+    --output format        - [Optional] text (default), or write one record per service, pod and pvc as ndjson, csv
+                             or json (cpu in millicores, memory and storage in bytes). The print option
+                             selects the records: -s/-c/-m/-p services, -a standalone, -t/-T or none all
+    --watch                - [Optional] After printing, follow cluster changes and print the services that change (Ctrl-C to stop)
   Print options:
     Note: All outputs are based on the owning high-level service.
     -T                     - Print full pod tree
@@ -1004,6 +3916,19 @@ Usage: {sys.argv[0]} -n <ns> -{printVars} [-S <service>]
     -m                     - Print total memory requests for pods under each service
     -p                     - Print total PVC capacity for pods under each service
     -a                     - Print standalone (no controller) resources
+    -E                     - Print the recent events of each service's pods, pvcs and owners (the last {EVENTS_PER_OBJECT} of each
+                             object), with the number of warnings, and of the standalone pods and pvcs
+    --grep regex           - Search the logs of all pods (with -S, the service's pods) for lines matching regex,
+                             --fetch-workers containers at a time. Every container is searched, init containers too
+    --previous             - [Optional] With --grep, search the logs of the previous (restarted) containers
+    --since D              - [Optional] With -E, only events seen in the last D. With --grep, only log lines written
+                             in the last D (Ex: 90s, 30m, 2h, 1d)
+    --by-node              - Print requests per node and the services behind them, as a percentage of node allocatable
+    -u / --usage           - Print cpu and memory used (metrics API), requested and limits, with the utilization
+                             of requests, for each service and pod
+    --top N [--by col]     - Print the N services using the most cpu (default), mem, pvc or pods, across all
+                             given namespaces, with their share of the namespace total
+    Note: With more than one namespace, -s/-c/-m/-p also print a grand total across namespaces.
   Other:
     -d / --debug           - Debug prints
     -h / --help            - Help''')
@@ -1016,7 +3941,8 @@ def main():
 
   #--- Handle getops ---#
   #Init vars:
-  nameSpaceIn=None
+  nameSpaceList=[]
+  allNamespaces=False
   getEvents=False
   printPodTree=False
   printFullPodTree=False
@@ -1025,12 +3951,22 @@ def main():
   printServiceCpu=False
   printServicePvc=False
   printStandaloneResources=False
+  printServiceUsage=False
+  printByNode=False
   specificService=None
-
+  saveSnapshotFile=None
+  fromSnapshotFile=None
+  profileFile=None
+  podPvcPull=None
+  watchMode=False
+  crPatterns=[]
+  sortBy=None
+  topCount=None
+  topBy="cpu"
   
   #-Prepare options-:
   try:
-    options, args = getopt.getopt(sys.argv[1:], "hacdEmn:psS:tT", ["help","debug","namespace=","service-summary","service="])
+    options, args = getopt.getopt(sys.argv[1:], "AhacdEmn:psS:tTu", ["help","debug","namespace=","all-namespaces","service-summary","service=","fetch-workers=","save-snapshot=","from-snapshot=","transport=","watch","cr-pattern=","refresh-discovery","jobs=","profile=","output=","sort=","top=","by=","usage","by-node","call-timeout=","budget=","page-size=","since=","grep=","previous"])
   except:
     printUsage()
     sys.exit(2)
@@ -1041,145 +3977,379 @@ def main():
       printUsage()
       sys.exit(2)
     elif opt == "-a": printStandaloneResources=True
+    elif opt in ("-A","--all-namespaces"): allNamespaces=True
     elif opt == "-c": printServiceCpu=True
+    elif opt == "--cr-pattern":
+      try:
+        re.compile(arg)
+      except re.error as err:
+        print(f"Error: --cr-pattern '{arg}' is not a valid regular expression: {err}",file=sys.stderr)
+        printUsage()
+        sys.exit(2)
+      crPatterns.append(arg)
     elif opt in ("-d","--debug"):
       global DEBUG_MODE
       DEBUG_MODE = True
     elif opt == "-E": getEvents=True
+    elif opt == "--fetch-workers":
+      global FETCH_WORKERS
+      try:
+        FETCH_WORKERS = int(arg)
+      except ValueError:
+        FETCH_WORKERS = 0
+      if FETCH_WORKERS < 1:
+        print(f"Error: --fetch-workers requires a positive integer, got '{arg}'.",file=sys.stderr)
+        printUsage()
+        sys.exit(2)
+    elif opt == "--jobs":
+      global COMPILE_JOBS
+      try:
+        COMPILE_JOBS = int(arg)
+      except ValueError:
+        COMPILE_JOBS = 0
+      if COMPILE_JOBS < 1:
+        print(f"Error: --jobs requires a positive integer, got '{arg}'.",file=sys.stderr)
+        printUsage()
+        sys.exit(2)
+    elif opt == "--profile": profileFile=arg
+    elif opt == "--grep":
+      global LOG_PATTERN
+      try:
+        LOG_PATTERN = re.compile(arg.encode())
+      except re.error as err:
+        print(f"Error: --grep '{arg}' is not a valid regular expression: {err}",file=sys.stderr)
+        printUsage()
+        sys.exit(2)
+    elif opt == "--previous":
+      global LOG_PREVIOUS
+      LOG_PREVIOUS = True
+    elif opt == "--since":
+      global SINCE_SECONDS
+      SINCE_SECONDS = parseDuration(arg)
+      if SINCE_SECONDS is None:
+        print(f"Error: --since requires a duration (Ex: 90s, 30m, 2h, 1d), got '{arg}'.",file=sys.stderr)
+        printUsage()
+        sys.exit(2)
+    elif opt == "--page-size":
+      global PAGE_SIZE
+      try:
+        PAGE_SIZE = int(arg)
+      except ValueError:
+        PAGE_SIZE = -1
+      if PAGE_SIZE < 0:
+        print(f"Error: --page-size requires a number of items (0 for no paging), got '{arg}'.",file=sys.stderr)
+        printUsage()
+        sys.exit(2)
+    elif opt in ("--call-timeout", "--budget"):
+      try:
+        seconds = float(arg)
+      except ValueError:
+        seconds = 0
+      if not seconds > 0:
+        print(f"Error: {opt} requires a positive number of seconds, got '{arg}'.",file=sys.stderr)
+        printUsage()
+        sys.exit(2)
+      if opt == "--call-timeout":
+        global CALL_TIMEOUT
+        CALL_TIMEOUT = seconds
+      else:
+        global RUN_BUDGET
+        RUN_BUDGET = seconds
+    elif opt == "--save-snapshot": saveSnapshotFile=arg
+    elif opt == "--transport":
+      global TRANSPORT_TYPE
+      if arg not in ("api", "oc"):
+        print(f"Error: --transport must be 'api' or 'oc', got '{arg}'.",file=sys.stderr)
+        printUsage()
+        sys.exit(2)
+      TRANSPORT_TYPE = arg
+    elif opt == "--from-snapshot": fromSnapshotFile=arg
+    elif opt == "--refresh-discovery":
+      global DISCOVERY_REFRESH
+      DISCOVERY_REFRESH = True
     elif opt == "-m": printServiceMemory=True
-    elif opt in ("-n","--namespace"): nameSpaceIn=arg
+    elif opt == "--output":
+      global OUTPUT_FORMAT
+      if arg not in OUTPUT_FORMATS:
+        print(f"Error: --output must be one of {', '.join(OUTPUT_FORMATS)}, got '{arg}'.",file=sys.stderr)
+        printUsage()
+        sys.exit(2)
+      OUTPUT_FORMAT = arg
+    elif opt in ("-n","--namespace"):
+      if arg not in nameSpaceList: nameSpaceList.append(arg)
     elif opt == "-p": printServicePvc=True
     elif opt in ("-s","--service-summary"): printServiceSummary=True
     elif opt in ("-S","--service"): specificService=arg
+    elif opt == "--top":
+      try:
+        topCount = int(arg)
+      except ValueError:
+        topCount = 0
+      if topCount < 1:
+        print(f"Error: --top requires a positive integer, got '{arg}'.",file=sys.stderr)
+        printUsage()
+        sys.exit(2)
+    elif opt == "--by":
+      topBy = "memory" if arg == "mem" else arg
+      if topBy not in TOP_COLUMN_TITLES:
+        print(f"Error: --by must be one of cpu, mem, pvc, pods, got '{arg}'.",file=sys.stderr)
+        printUsage()
+        sys.exit(2)
+    elif opt == "--sort":
+      if arg not in SORT_COLUMNS:
+        print(f"Error: --sort must be one of {', '.join(SORT_COLUMNS)}, got '{arg}'.",file=sys.stderr)
+        printUsage()
+        sys.exit(2)
+      sortBy=arg
     elif opt == "-t": printPodTree=True
     elif opt == "-T": printFullPodTree=True
+    elif opt in ("-u","--usage"): printServiceUsage=True
+    elif opt == "--by-node": printByNode=True
+    elif opt == "--watch": watchMode=True
+  if crPatterns:
+    global CR_PATTERNS
+    CR_PATTERNS = crPatterns
   if DEBUG_MODE: print(f"getopts: {options}")
   
   #-Validate arguments-:
-  if nameSpaceIn is None:
+  if len(nameSpaceList) == 0 and not allNamespaces and fromSnapshotFile is None:
     print("Error: Requires namespace as input.",file=sys.stderr)
     printUsage()
     sys.exit(2)
+  if len(nameSpaceList) > 0 and allNamespaces:
+    print("Error: -n and --all-namespaces can not be used together.",file=sys.stderr)
+    printUsage()
+    sys.exit(2)
+  if (topCount is not None or printByNode) and (OUTPUT_FORMAT != "text" or specificService or watchMode):
+    print("Error: --top and --by-node can not be used with --output, -S or --watch.",file=sys.stderr)
+    printUsage()
+    sys.exit(2)
+  if watchMode and printServiceUsage:
+    print("Error: --watch can not be used with -u.",file=sys.stderr)
+    printUsage()
+    sys.exit(2)
+  if watchMode and OUTPUT_FORMAT != "text":
+    print("Error: --watch only supports text output.",file=sys.stderr)
+    printUsage()
+    sys.exit(2)
+  if watchMode and fromSnapshotFile:
+    print("Error: --watch and --from-snapshot can not be used together.",file=sys.stderr)
+    printUsage()
+    sys.exit(2)
+  if watchMode and RUN_BUDGET is not None:
+    print("Error: --watch and --budget can not be used together.",file=sys.stderr)
+    printUsage()
+    sys.exit(2)
   
-  #TODO Events not ready yet:
-  if getEvents:
-    print("TODO Event display not available yet.")
+  if getEvents and (OUTPUT_FORMAT != "text" or watchMode):
+    print("Error: -E can not be used with --output or --watch.",file=sys.stderr)
+    printUsage()
+    sys.exit(2)
+  if LOG_PATTERN is not None and (OUTPUT_FORMAT != "text" or watchMode or fromSnapshotFile):
+    print("Error: --grep can not be used with --output, --watch or --from-snapshot.",file=sys.stderr)
+    printUsage()
+    sys.exit(2)
+  if LOG_PREVIOUS and LOG_PATTERN is None:
+    print("Error: --previous requires --grep.",file=sys.stderr)
+    printUsage()
     sys.exit(2)
 
   #Count number of printing options (should only be one):
-  printCount = [printServiceSummary, printPodTree, printFullPodTree, printServiceCpu, printServiceMemory, printServicePvc, printStandaloneResources].count(True)
+  printCount = [printServiceSummary, printPodTree, printFullPodTree, printServiceCpu, printServiceMemory, printServicePvc, printStandaloneResources, topCount is not None, printServiceUsage, printByNode, getEvents, LOG_PATTERN is not None].count(True)
   #Make sure only one printing options was provided:
   if printCount > 1:
     print("Error: Only one print option is allowed.",file=sys.stderr)
     printUsage()
     sys.exit(2)
-  elif printCount == 0:
+  elif printCount == 0 and OUTPUT_FORMAT == "text":
     print("Error: A print command is required.",file=sys.stderr)
     printUsage()
     sys.exit(2)
-  
-  #--- Make sure the ocp server session is good ---#
-  if not isOcpLoginValid():
-    print(f"Error: Not logged in to ocp server or server connection problems",file=sys.stderr)
-    sys.exit(1)
-
-
-  #--- Collect all global data ahead of time ---#
-  global GLOBAL_STATEFULSET
-  global GLOBAL_REPLICASET
-  global GLOBAL_JOBS
-  global GLOBAL_DEPLOYMENT
-  global GLOBAL_PODS
-  global GLOBAL_IBM
-  global GLOBAL_PVCS
-  global GLOBAL_CONFIGMAP
-  global GLOBAL_COGNITIVEDATA
-  global GLOBAL_EVENTS
-
-  global GLOBAL_POD_OBJECTS
-  global GLOBAL_SERVICE_OBJECTS
-  global GLOBAL_PVC_OBJECTS
-
-  #This will perform several oc gets to the OCP cluster and takes the most amount of time in the script.
-  getGlobalJson(nameSpaceIn)
-
-  #Get events, if requested:
-  if getEvents:
-    getGlobalEventsJson(nameSpaceIn)
-
-  #Create objects
-  compileClusterObjects(nameSpaceIn)
-
 
-  #--- Decide what to output ---#
-  #Determine which service(s) to act upon:
-  if specificService:
-    if specificService not in GLOBAL_SERVICE_OBJECTS[nameSpaceIn].keys():
-      print(f"Error: Service '{specificService}' not found for namespace {nameSpaceIn}. All services found: {GLOBAL_SERVICE_OBJECTS[nameSpaceIn].keys()}", file=sys.stderr)
+  if printServiceSummary: printMode = "summary"
+  elif printPodTree: printMode = "podtree"
+  elif printFullPodTree: printMode = "fullpodtree"
+  elif printServiceCpu: printMode = "cpu"
+  elif printServiceMemory: printMode = "memory"
+  elif printServicePvc: printMode = "pvc"
+  elif printStandaloneResources: printMode = "standalone"
+  elif topCount is not None: printMode = "top"
+  elif printServiceUsage: printMode = "usage"
+  elif printByNode: printMode = "bynode"
+  elif getEvents: printMode = "events"
+  elif LOG_PATTERN is not None: printMode = "logs"
+  else: printMode = None #All records (--output only)
+
+  #With --output, stdout only gets the records. Progress, info and error messages go to stderr.
+  recordWriterOut = None
+  if OUTPUT_FORMAT != "text":
+    recordWriterOut = recordWriter(OUTPUT_FORMAT, sys.stdout)
+    sys.stdout = sys.stderr
+  
+  #The run budget counts from here:
+  if RUN_BUDGET is not None:
+    global RUN_DEADLINE
+    RUN_DEADLINE = time.monotonic() + RUN_BUDGET
+
+  #With --profile, the report is written however the run ends:
+  if profileFile:
+    global GLOBAL_PROFILE
+    GLOBAL_PROFILE = profileRecorder(profileFile)
+    atexit.register(GLOBAL_PROFILE.writeReport)
+
+  stageStart = time.perf_counter()
+  if fromSnapshotFile:
+    #--- Load all global data from the snapshot, no cluster access needed ---#
+    global SNAPSHOT_REPLAY
+    SNAPSHOT_REPLAY = True
+    snapshotNameSpaces = loadSnapshot(fromSnapshotFile)
+    profileStage("load snapshot", None, stageStart)
+    if snapshotNameSpaces is None:
       sys.exit(1)
-    serviceList=[specificService]
+    missingNameSpaces = [ns for ns in nameSpaceList if ns not in snapshotNameSpaces]
+    if missingNameSpaces:
+      print(f"Error: Namespace(s) {', '.join(missingNameSpaces)} not in snapshot {fromSnapshotFile}. Namespaces found: {snapshotNameSpaces}",file=sys.stderr)
+      sys.exit(1)
+    if len(nameSpaceList) == 0:
+      nameSpaceList = snapshotNameSpaces
+    #Snapshots saved before events were part of them have none, rather than an empty list:
+    if printMode == "events":
+      noEventNameSpaces = [ns for ns in nameSpaceList if ns not in GLOBAL_EVENTS]
+      if noEventNameSpaces:
+        print(f"Error: Snapshot {fromSnapshotFile} has no events for namespace(s) {', '.join(noEventNameSpaces)}. Save a new snapshot to use -E.",file=sys.stderr)
+        sys.exit(1)
   else:
-    serviceList=GLOBAL_SERVICE_OBJECTS[nameSpaceIn].keys()
-  if DEBUG_MODE: print(f"serviceList: {serviceList}")
-
-  #Print the desired items:
-  if printServiceSummary:
-  #- Print footprint summary for all desired services -#
-    for serviceName in serviceList:
-      servobj = GLOBAL_SERVICE_OBJECTS[nameSpaceIn][serviceName]
-      servobj.printPodTree(summary=True)
-    #Print orphan resources:
-    if not specificService: printOrphanResources(nameSpaceIn, summary=True)
-
-  elif printPodTree:
-  #Print just pods for each desired service:
-    for serviceName in serviceList:
-      servobj = GLOBAL_SERVICE_OBJECTS[nameSpaceIn][serviceName]
-      servobj.printPodTreeSummary()
-
-    #Print orphan pods:
-    if not specificService: 
-      print(f"Standalone Pods (No owner/controller):")
-      if len(getOrphanPods(nameSpaceIn)) == 0:
-        print(f"{ASPACE:4}None")
+    #--- Make sure the ocp server session is good ---#
+    setupTransport(TRANSPORT_TYPE)
+    if not isOcpLoginValid():
+      print(f"Error: Not logged in to ocp server or server connection problems",file=sys.stderr)
+      sys.exit(1)
+    profileStage("login", None, stageStart)
+
+    #--- Collect all global data ahead of time ---#
+    stageStart = time.perf_counter()
+    #This will perform several oc gets to the OCP cluster and takes the most amount of time in the script.
+    #A single service in a single namespace only pulls that service's subtree (not for a snapshot, which
+    #should hold the whole namespace, or for --watch and -a, which look at the whole namespace).
+    if specificService and len(nameSpaceList) == 1 and not saveSnapshotFile and not watchMode and printMode != "standalone":
+      if getServiceJson(specificService, nameSpaceList[0], withMetrics=printMode == "usage", withEvents=printMode == "events") is None:
+        sys.exit(1)
+    else:
+      #Only the kinds and fields the print mode needs, unless the whole namespace is kept or followed:
+      fetchPlan = getFetchPlan(printMode, topBy, fullPull=bool(saveSnapshotFile) or watchMode or OUTPUT_FORMAT != "text",
+                               snapshot=bool(saveSnapshotFile))
+      #Pods and pvcs are pulled in pages alongside the other kinds, and compiled as they arrive:
+      if PAGE_SIZE:
+        podPvcPull = pagedPull(nameSpaceList, allNamespaces, fetchPlan)
+        nameSpaceList = compilePagedNamespaces(podPvcPull)
       else:
-        print(f"{ASPACE:4}Name: {pod}")
+        nameSpaceList = getGlobalJson(nameSpaceList, allNamespaces, fetchPlan)
+    profileStage("pull and compile" if podPvcPull else "pull", None, stageStart)
+
+  #With --jobs, all namespaces are compiled up front by the process pool:
+  if COMPILE_JOBS > 1 and podPvcPull is None:
+    stageStart = time.perf_counter()
+    for nameSpace in nameSpaceList:
+      buildResourceIndex(nameSpace)
+    profileStage("index", None, stageStart)
+    stageStart = time.perf_counter()
+    compileNamespacesInPool(nameSpaceList)
+    profileStage("compile", None, stageStart)
+
+  serviceFound = False
+  for nameSpace in nameSpaceList:
+    #Create objects (already done for a paged pull)
+    if COMPILE_JOBS == 1 and podPvcPull is None:
+      stageStart = time.perf_counter()
+      buildResourceIndex(nameSpace)
+      profileStage("index", nameSpace, stageStart)
+      stageStart = time.perf_counter()
+      compileClusterObjects(nameSpace)
+      profileStage("compile", nameSpace, stageStart)
+    if printMode == "usage":
+      stageStart = time.perf_counter()
+      attachPodUsage(nameSpace)
+      profileStage("usage", nameSpace, stageStart)
+    elif printMode == "events":
+      stageStart = time.perf_counter()
+      attachEvents(nameSpace)
+      profileStage("events", nameSpace, stageStart)
+
+    #With --output, write the namespace's records now, and drop its objects (its json too, unless saving a snapshot):
+    if recordWriterOut:
+      if specificService and specificService not in GLOBAL_SERVICE_OBJECTS[nameSpace].keys():
+        releaseNamespace(nameSpace, not saveSnapshotFile)
+        continue
+      serviceFound = True
+      stageStart = time.perf_counter()
+      writeNamespaceRecords(recordWriterOut, nameSpace, printMode, specificService, sortBy)
+      profileStage("output", nameSpace, stageStart)
+      releaseNamespace(nameSpace, not saveSnapshotFile)
+
+  #Save the pulled data (including cache misses found while compiling), if requested:
+  if saveSnapshotFile:
+    stageStart = time.perf_counter()
+    if not saveSnapshot(saveSnapshotFile, nameSpaceList):
+      sys.exit(1)
+    profileStage("save snapshot", None, stageStart)
 
-  elif printFullPodTree:
-  #Print verbose pod tree for all desired services:
-    for serviceName in serviceList:
-      servobj = GLOBAL_SERVICE_OBJECTS[nameSpaceIn][serviceName]
-      servobj.printPodTree()
-    #Print orphan resources:
-    if not specificService: printOrphanResources(nameSpaceIn)
 
-  elif printServiceCpu:
-  #Print total requested cpus for desired services:
-    for serviceName in serviceList:
-      servobj = GLOBAL_SERVICE_OBJECTS[nameSpaceIn][serviceName]
-      servobj.printServiceCpu()
+  #--- Decide what to output ---#
+  #Failed or timed out pulls are reported after the results, the exit status is then 3:
+  incompleteList = getIncompleteResults()
+  if recordWriterOut:
+    writeIncompleteRecords(recordWriterOut, incompleteList)
+    recordWriterOut.close()
+    if specificService and not serviceFound:
+      print(f"Error: Service '{specificService}' not found for namespace(s) {', '.join(nameSpaceList)}.", file=sys.stderr)
+      sys.exit(1)
+    if incompleteList:
+      sys.exit(3)
+    return
 
-  elif printServiceMemory:
-  #Print total requested cpus for desired services:
-    for serviceName in serviceList:
-      servobj = GLOBAL_SERVICE_OBJECTS[nameSpaceIn][serviceName]
-      servobj.printServiceMemory()
+  if specificService:
+    if not any(specificService in GLOBAL_SERVICE_OBJECTS[ns].keys() for ns in nameSpaceList):
+      allServices = [serviceName for ns in nameSpaceList for serviceName in GLOBAL_SERVICE_OBJECTS[ns].keys()]
+      print(f"Error: Service '{specificService}' not found for namespace(s) {', '.join(nameSpaceList)}. All services found: {allServices}", file=sys.stderr)
+      if incompleteList:
+        printIncompleteResults(incompleteList)
+      sys.exit(1)
 
-  elif printServicePvc:
-  #Print total requested cpus for desired services:
-    for serviceName in serviceList:
-      servobj = GLOBAL_SERVICE_OBJECTS[nameSpaceIn][serviceName]
-      servobj.printServicePvc()
-    
-    #Print orphan resources:
-    if not specificService: 
-      #This count is for the longest service name - (diff of "Service (Primary Owner):" and "Standalone Pvcs (No owner/controller)")
-      formatColumnCount = len(getLongestServiceName(nameSpaceIn)) - 14
-      orphanPvcCap=getOrphanPvcsCapacity(nameSpaceIn)
-      print(f"Standalone Pvcs (No owner/controller): {' '.ljust(formatColumnCount)}   PVC Capacity: {orphanPvcCap}Gi")
+  stageStart = time.perf_counter()
+  if printMode in ("top", "bynode"):
+    if printMode == "top":
+      printTopServices(nameSpaceList, topCount, topBy)
+    else:
+      printNodeResults(nameSpaceList)
+    profileStage("print", None, stageStart)
+    if incompleteList:
+      printIncompleteResults(incompleteList)
+      sys.exit(3)
+    return
 
-  elif printStandaloneResources:
-    printOrphanResources(nameSpaceIn)
+  for nameSpace in nameSpaceList:
+    if specificService and specificService not in GLOBAL_SERVICE_OBJECTS[nameSpace].keys():
+      continue
+    if len(nameSpaceList) > 1:
+      print(f"{PRINTLINE}Namespace: {nameSpace}")
+    stageStart = time.perf_counter()
+    printNamespaceResults(nameSpace, printMode, specificService, sortBy)
+    profileStage("print", nameSpace, stageStart)
+
+  if len(nameSpaceList) > 1 and printMode in ("summary", "cpu", "memory", "pvc"):
+    stageStart = time.perf_counter()
+    printGrandTotal(nameSpaceList, printMode, specificService)
+    profileStage("print", None, stageStart)
+
+  #A log search (--grep) may have failed on some containers while printing:
+  incompleteList = getIncompleteResults()
+  if incompleteList:
+    printIncompleteResults(incompleteList)
+    if not watchMode:
+      sys.exit(3)
+
+  if watchMode:
+    watchNamespaces(nameSpaceList, printMode, specificService, allNamespaces)
 
 #End main()
 
@@ -0,0 +1,745 @@
+#!/usr/bin/python3
+#Abstract:
+#  Benchmarks for cpst_podtree.py. Runs without cluster access.
+#  Pipeline: generates a synthetic namespace at several scales (deployments -> replicasets -> pods,
+#  statefulsets with pvc templates, jobs, CR owned chains 3 to 5 levels deep, ibm CRs), loads it
+#  into the cpst_podtree GLOBAL_* json dictionaries, and reports wall time and peak memory of
+#  each stage: index build, pod/pvc/service object creation and each print mode.
+#  Quantity: times ocpValToInteger() against the previous (float/substring based) implementation.
+#  Api check: serves a generated namespace from a local http stand-in of the API server (recorded /api,
+#  /apis, list, object and pod log responses), pulls it through the api transport, and compares the
+#  result with what the oc transport pulls from an oc stand-in serving the same recorded data.
+
+#-------------------------------------------------------------------------#
+# Imports
+#-------------------------------------------------------------------------#
+import sys
+import io
+import os
+import re
+import json
+import time
+import getopt
+import random
+import tempfile
+import threading
+import tracemalloc
+import contextlib
+import http.server
+import urllib.parse
+
+import cpst_podtree
+
+
+#-------------------------------------------------------------------------#
+# Global variables/defines
+#-------------------------------------------------------------------------#
+#Quantity strings as found in pod and pvc specs. Only the ones the previous implementation
+#could handle, so both implementations do the same work.
+QUANTITY_SAMPLES = ["100m", "250m", "500m", "1", "2", "4", "64Mi", "128Mi", "256Mi", "512Mi", "1Gi", "2Gi",
+                    "4Gi", "8Gi", "10Gi", "20Gi", "100Gi", "1024Ki", "1000M", "5G", "0"]
+
+#Synthetic namespace scales, [scale name] = number of services (top level CRs).
+#Each service has about 12 pods, so medium is about 3k pods.
+BENCH_SCALES = {"small": 20, "medium": 250, "large": 1000}
+
+BENCH_NAMESPACE = "bench"
+
+#Print modes timed, as used by cpst_podtree.printNamespaceResults()
+BENCH_PRINT_MODES = ["summary", "podtree", "fullpodtree", "cpu", "memory", "pvc", "standalone"]
+
+#Built in kinds served by the API stand-in (-A), (plural, group, version, kind, namespaceGenerator list).
+#The custom resources are served from the generator's "ibm" list, by their apiVersion and kind.
+API_CHECK_KINDS = [
+  ("pods", "", "v1", "Pod", "pods"),
+  ("persistentvolumeclaims", "", "v1", "PersistentVolumeClaim", "pvc"),
+  ("configmaps", "", "v1", "ConfigMap", "configmap"),
+  ("statefulsets", "apps", "v1", "StatefulSet", "statefulset"),
+  ("replicasets", "apps", "v1", "ReplicaSet", "replicaset"),
+  ("deployments", "apps", "v1", "Deployment", "deployment"),
+  ("jobs", "batch", "v1", "Job", "jobs"),
+  ("events", "", "v1", "Event", "events"),
+]
+API_CHECK_VERSION = "v1.27.0" #gitVersion served by /version
+API_CHECK_PAGE_SIZE = 50 #List page size for the api check, so lists take several pages
+API_CHECK_LOG_PODS = 30 #Number of pods whose container logs are read by the api check
+API_CHECK_GLOBALS = ["GLOBAL_STATEFULSET", "GLOBAL_REPLICASET", "GLOBAL_JOBS", "GLOBAL_DEPLOYMENT",
+                     "GLOBAL_PODS", "GLOBAL_PVCS", "GLOBAL_CONFIGMAP", "GLOBAL_IBM"]
+
+#oc stand-in for the api check, written next to the recorded.json it serves. Handles the oc commands
+#cpst_podtree.py runs: get (lists, objects, comma separated kinds), logs, api-resources and the login checks.
+#'get --raw' paths other than /version are passed on to the API stand-in.
+FAKE_OC_SCRIPT = '''
+import sys, os, json, urllib.request, urllib.error
+recorded = json.load(open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "recorded.json")))
+args = sys.argv[1:]
+nameSpace = args[args.index("-n")+1] if "-n" in args else None
+
+def fail(message):
+  sys.stderr.write(message + "\\n")
+  sys.exit(1)
+
+if args[:2] == ["config", "view"]:
+  print(json.dumps({"clusters": [{"cluster": {"server": recorded["server"]}}], "users": [{"user": {"token": "bench"}}]}))
+elif args[0] == "cluster-info":
+  print("Kubernetes control plane is running at " + recorded["server"])
+elif args[0] == "whoami":
+  print(recorded["server"])
+elif args[:3] == ["get", "--raw", "/version"]:
+  print(json.dumps({"gitVersion": recorded["version"]}))
+elif args[:2] == ["get", "--raw"]:
+  try:
+    with urllib.request.urlopen(recorded["server"] + args[2]) as resp:
+      sys.stdout.buffer.write(resp.read())
+  except urllib.error.HTTPError as err:
+    fail(f"Error from server ({err.reason}): {json.loads(err.read()).get('message')}")
+elif args[0] == "api-resources":
+  print("\\n".join(recorded["apiResources"]))
+elif args[0] == "logs":
+  (pod, container) = (args[1], args[args.index("-c")+1])
+  logText = recorded["logs"].get(f"{nameSpace}/{pod}/{container}")
+  if logText is None:
+    fail(f'Error from server (BadRequest): container "{container}" in pod "{pod}" is waiting to start: ContainerCreating')
+  sys.stdout.write(logText)
+elif args[0] == "get":
+  resources = args[1].split(",")
+  items = []
+  for resource in resources:
+    (kindName, sep, objName) = resource.partition("/")
+    fullName = recorded["aliases"].get(kindName.lower())
+    if fullName is None:
+      fail(f"error: the server doesn't have a resource type {json.dumps(kindName)}")
+    matches = [item for item in recorded["lists"][fullName] if nameSpace is None or item["metadata"]["namespace"] == nameSpace]
+    if "-l" in args:
+      labels = dict(term.split("=", 1) for term in args[args.index("-l")+1].split(","))
+      matches = [item for item in matches if labels.items() <= (item["metadata"].get("labels") or {}).items()]
+    if objName:
+      matches = [item for item in matches if item["metadata"]["name"] == objName]
+      if not matches:
+        fail(f'Error from server (NotFound): {fullName} "{objName}" not found')
+      if len(resources) == 1:
+        print(json.dumps(matches[0], indent=4))
+        sys.exit(0)
+    items += matches
+  print(json.dumps({"apiVersion": "v1", "kind": "List", "items": items, "metadata": {"resourceVersion": ""}}, indent=4))
+else:
+  fail("oc stand-in: unsupported command: " + " ".join(args))
+'''
+
+
+#-------------------------------------------------------------------------#
+# Synthetic namespace generator
+#-------------------------------------------------------------------------#
+#---------- class namespaceGenerator ----------#
+#Builds list jsons (as pulled by cpst_podtree.getGlobalJson) for one synthetic namespace.
+class namespaceGenerator:
+
+  def __init__(self,namespace,serviceCount,seed=42):
+    self.namespace=namespace
+    self.rng=random.Random(seed)
+    self.uidCount=0
+    self.lists={"statefulset": [], "replicaset": [], "jobs": [], "deployment": [], "pods": [],
+                "pvc": [], "configmap": [], "ibm": [], "events": []}
+    for serviceNum in range(serviceCount):
+      self.addService(serviceNum)
+
+  #Items owned by a controller with a label selector carry its labels, as the controllers set them.
+  def newMeta(self, nameIn, ownerIn=None):
+    self.uidCount += 1
+    ownerSelector = ((ownerIn or {}).get("spec") or {}).get("selector") or {}
+    meta = {"name": nameIn, "namespace": self.namespace, "uid": f"uid-{self.uidCount:08d}",
+            "labels": dict(ownerSelector.get("matchLabels") or {"app": nameIn})}
+    if ownerIn:
+      meta["ownerReferences"] = [{"apiVersion": ownerIn.get("apiVersion"), "kind": ownerIn.get("kind"),
+                                  "name": ownerIn.get("metadata").get("name"),
+                                  "uid": ownerIn.get("metadata").get("uid"), "controller": True}]
+    return meta
+
+  def addItem(self, listName, kindIn, apiVersion, nameIn, ownerIn=None, spec=None):
+    item = {"apiVersion": apiVersion, "kind": kindIn, "metadata": self.newMeta(nameIn, ownerIn), "spec": spec or {}}
+    self.lists[listName].append(item)
+    return item
+
+  def newContainer(self, nameIn):
+    return {"name": nameIn, "resources": {
+      "requests": {"cpu": self.rng.choice(["100m", "250m", "500m", "1", "1.5"]),
+                   "memory": self.rng.choice(["128Mi", "256Mi", "512Mi", "1Gi", "1.5Gi"])},
+      "limits": {"cpu": self.rng.choice(["500m", "1", "2", "4"]),
+                 "memory": self.rng.choice(["512Mi", "1Gi", "2Gi", "4Gi"])}}}
+
+  def addPod(self, nameIn, ownerIn, pvcNames=(), phase="Running"):
+    containers = [self.newContainer(f"c{i}") for i in range(self.rng.randint(1, 3))]
+    initContainers = [self.newContainer("init")]
+    running = phase in ("Running", "Pending")
+    state = {"running": {"startedAt": "2026-10-01T00:00:00Z"}} if running else {"terminated": {"exitCode": 0}}
+    spec = {"nodeName": f"worker-{self.rng.randint(0, 11)}", "containers": containers, "initContainers": initContainers,
+            "volumes": [{"name": f"vol{i}", "persistentVolumeClaim": {"claimName": pvcName}} for i, pvcName in enumerate(pvcNames)]}
+    pod = self.addItem("pods", "Pod", "v1", nameIn, ownerIn, spec)
+    pod["status"] = {"phase": phase,
+                     "containerStatuses": [{"name": cont.get("name"), "state": state, "restartCount": self.rng.randint(0, 3)} for cont in containers],
+                     "initContainerStatuses": [{"name": "init", "state": {"terminated": {"exitCode": 0}}, "restartCount": 0}]}
+    return pod
+
+  #An event of an object, last seen minutesAgo minutes before 2026-10-01T12:00:00Z.
+  def addEvent(self, objectIn, eventType, reason, message, minutesAgo):
+    lastSeen = f"2026-10-01T{11 - minutesAgo // 60:02d}:{59 - minutesAgo % 60:02d}:00Z"
+    event = self.addItem("events", "Event", "v1", f"{objectIn.get('metadata').get('name')}.{self.uidCount:08x}")
+    event.pop("spec")
+    event.update({"involvedObject": {"kind": objectIn.get("kind"), "name": objectIn.get("metadata").get("name"), "namespace": self.namespace},
+                  "type": eventType, "reason": reason, "message": message, "count": 1,
+                  "firstTimestamp": lastSeen, "lastTimestamp": lastSeen})
+    return event
+
+  def addPvc(self, nameIn, ownerIn=None):
+    spec = {"accessModes": ["ReadWriteOnce"], "resources": {"requests": {"storage": self.rng.choice(["1Gi", "5Gi", "10Gi", "20Gi", "100Gi"])}},
+            "storageClassName": "ocs-storagecluster-ceph-rbd", "volumeName": f"pvc-{self.uidCount:08d}"}
+    return self.addItem("pvc", "PersistentVolumeClaim", "v1", nameIn, ownerIn, spec)
+
+  #One service: a top level ibm CR, with an intermediate CR for some, owning deployments, a statefulset
+  #with pvcs (and events of them and its pods), and a job owned through a configmap. Owner chains are 3 to 5 deep.
+  def addService(self, serviceNum):
+    serviceName = f"svc{serviceNum:04d}"
+    topCr = self.addItem("ibm", "ZenService", "zen.cpd.ibm.com/v1", f"{serviceName}-cr")
+    owner = topCr
+    if serviceNum % 2 == 0:
+      owner = self.addItem("ibm", "ZenExtension", "zen.cpd.ibm.com/v1", f"{serviceName}-ext", topCr)
+
+    #Deployments -> replicasets -> pods, with old (scaled down) replicasets:
+    for deployNum in range(self.rng.randint(1, 3)):
+      deploy = self.addItem("deployment", "Deployment", "apps/v1", f"{serviceName}-deploy{deployNum}", owner)
+      self.addItem("replicaset", "ReplicaSet", "apps/v1", f"{serviceName}-deploy{deployNum}-old", deploy)
+      repSet = self.addItem("replicaset", "ReplicaSet", "apps/v1", f"{serviceName}-deploy{deployNum}-abc12", deploy,
+                            {"selector": {"matchLabels": {"app": f"{serviceName}-deploy{deployNum}"}}})
+      for podNum in range(self.rng.randint(1, 4)):
+        self.addPod(f"{serviceName}-deploy{deployNum}-abc12-{podNum:05d}", repSet)
+
+    #Statefulset with pvc templates. The pvcs have no owner, like statefulset pvcs by default,
+    #except every third service, where the statefulset owns them.
+    sts = self.addItem("statefulset", "StatefulSet", "apps/v1", f"{serviceName}-sts", owner,
+                       {"selector": {"matchLabels": {"app": f"{serviceName}-sts"}}, "volumeClaimTemplates": [{"metadata": {"name": "data"}}]})
+    for podNum in range(self.rng.randint(1, 3)):
+      pvcName = f"data-{serviceName}-sts-{podNum}"
+      pvc = self.addPvc(pvcName, sts if serviceNum % 3 == 0 else None)
+      pod = self.addPod(f"{serviceName}-sts-{podNum}", sts, [pvcName])
+      self.addEvent(pvc, "Normal", "ProvisioningSucceeded", f"Successfully provisioned volume for claim {pvcName}", 90 + podNum)
+      self.addEvent(pod, "Normal", "Scheduled", f"Successfully assigned {self.namespace}/{pod.get('metadata').get('name')}", 30 + podNum)
+      if podNum == 0:
+        self.addEvent(pod, "Warning", "BackOff", "Back-off restarting failed container", 5)
+
+    #Job owned through a configmap, with a completed pod:
+    configMap = self.addItem("configmap", "ConfigMap", "v1", f"{serviceName}-cm", owner)
+    job = self.addItem("jobs", "Job", "batch/v1", f"{serviceName}-job", configMap,
+                       {"selector": {"matchLabels": {"job-name": f"{serviceName}-job"}}})
+    self.addPod(f"{serviceName}-job-x1y2z", job, phase="Succeeded")
+
+    #A pvc owned directly by the CR:
+    self.addPvc(f"{serviceName}-shared", topCr)
+
+    #Standalone resources:
+    if serviceNum % 10 == 0:
+      self.addPod(f"{serviceName}-debug", None)
+      self.addPvc(f"{serviceName}-scratch", None)
+
+  #Fill the cpst_podtree GLOBAL_* json dictionaries with the generated lists.
+  def load(self):
+    for (globalDict, listName) in ((cpst_podtree.GLOBAL_STATEFULSET, "statefulset"), (cpst_podtree.GLOBAL_REPLICASET, "replicaset"),
+                                   (cpst_podtree.GLOBAL_JOBS, "jobs"), (cpst_podtree.GLOBAL_DEPLOYMENT, "deployment"),
+                                   (cpst_podtree.GLOBAL_PODS, "pods"), (cpst_podtree.GLOBAL_PVCS, "pvc"),
+                                   (cpst_podtree.GLOBAL_CONFIGMAP, "configmap"), (cpst_podtree.GLOBAL_IBM, "ibm"),
+                                   (cpst_podtree.GLOBAL_EVENTS, "events")):
+      globalDict[self.namespace] = {"apiVersion": "v1", "kind": "List", "items": self.lists[listName]}
+    cpst_podtree.GLOBAL_COGNITIVEDATA[self.namespace] = {"apiVersion": "v1", "kind": "List", "items": []}
+
+  def getCounts(self):
+    return {listName: len(items) for listName, items in self.lists.items()}
+#---------- End class namespaceGenerator ----------#
+
+
+#-------------------------------------------------------------------------#
+# API server stand-in
+#-------------------------------------------------------------------------#
+#---------- class recordedApi ----------#
+#The API responses for a generated namespace: discovery, lists, objects and container logs.
+#Items are kept as oc prints them (with kind and apiVersion), lists served by the API drop both.
+class recordedApi:
+
+  def __init__(self,generator):
+    self.namespace=generator.namespace
+    self.resources={} #Full resource name (plural, or plural.group for custom resources) -> (group, version, plural, kind)
+    self.lists={} #Full resource name -> items
+    for (plural, group, version, kind, listName) in API_CHECK_KINDS:
+      self.resources[plural] = (group, version, plural, kind)
+      self.lists[plural] = generator.lists[listName]
+    for item in generator.lists["ibm"]:
+      (group, sep, version) = item.get("apiVersion").partition("/")
+      plural = item.get("kind").lower() + "s"
+      fullName = f"{plural}.{group}"
+      self.resources.setdefault(fullName, (group, version, plural, item.get("kind")))
+      self.lists.setdefault(fullName, []).append(item)
+
+    #Names oc accepts for each resource:
+    self.aliases={name: plural for name, plural in cpst_podtree.BUILTIN_API_ALIASES.items() if plural in self.resources}
+    for fullName, (group, version, plural, kind) in self.resources.items():
+      if group:
+        for name in (fullName, plural, kind.lower()):
+          self.aliases.setdefault(name, fullName)
+
+    #Container logs of the first pods. The containers of every fifth pod have not started, they have no log:
+    self.logs={} #namespace/pod/container -> log text
+    for (podNum, pod) in enumerate(generator.lists["pods"][:API_CHECK_LOG_PODS]):
+      if podNum % 5 == 4:
+        continue
+      podName = pod.get("metadata").get("name")
+      for cont in pod.get("spec").get("initContainers") + pod.get("spec").get("containers"):
+        self.logs[f"{self.namespace}/{podName}/{cont.get('name')}"] = "".join(
+          f"{podName} {cont.get('name')} line {lineNum} {'ERROR' if lineNum % 7 == 0 else 'INFO'}\n" for lineNum in range(40))
+
+  #Resources in discovery order, dictionary: [group] = list of (plural, kind). The core group ("") comes first.
+  def getGroups(self):
+    groups = {"": []}
+    for fullName, (group, version, plural, kind) in self.resources.items():
+      groups.setdefault(group, []).append((plural, kind))
+    return groups
+
+  #Number of items a pull of the namespace returns: all but the events, which are only pulled with -E.
+  def getPulledCount(self):
+    return sum(len(items) for fullName, items in self.lists.items() if fullName != "events")
+
+  #Namespaced api resource names, as 'oc api-resources --namespaced=true -o name' prints them.
+  def getApiResourceNames(self):
+    return [plural if group == "" else f"{plural}.{group}" for group, resources in self.getGroups().items() for (plural, kind) in resources]
+
+  #Write recorded.json for the oc stand-in, with the API stand-in's url as the server.
+  def writeRecording(self, fileName, server):
+    recording = {"server": server, "version": API_CHECK_VERSION, "apiResources": self.getApiResourceNames(),
+                 "aliases": self.aliases, "lists": self.lists, "logs": self.logs}
+    with open(fileName, "w") as recordFile:
+      json.dump(recording, recordFile)
+#---------- End class recordedApi ----------#
+
+#---------- class apiStandInHandler ----------#
+#Serves a recordedApi (self.server.recorded) like the API server: /version, discovery (aggregated when
+#self.server.aggregated is set and the client asks for it, and each group's /apis/<group>), lists with limit/continue paging, equality label
+#selectors and metadata only lists (PartialObjectMetadataList), objects by name, and the pods/log subresource. Connections are kept alive, and counted, so the check shows the pool at work.
+class apiStandInHandler(http.server.BaseHTTPRequestHandler):
+  protocol_version = "HTTP/1.1"
+  disable_nagle_algorithm = True #Headers and body are written separately, do not hold the body back
+
+  def log_message(self, *args):
+    pass
+
+  def setup(self):
+    super().setup()
+    with self.server.statsLock:
+      self.server.stats["connections"] += 1
+
+  def sendJson(self, status, jsonOut):
+    body = json.dumps(jsonOut).encode()
+    self.sendBody(status, "application/json", body)
+
+  def sendBody(self, status, contentType, body):
+    self.send_response(status)
+    self.send_header("Content-Type", contentType)
+    self.send_header("Content-Length", str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def sendStatus(self, status, reason, message):
+    self.sendJson(status, {"kind": "Status", "apiVersion": "v1", "status": "Failure", "message": message, "reason": reason, "code": status})
+
+  def do_GET(self):
+    with self.server.statsLock:
+      self.server.stats["requests"] += 1
+    recorded = self.server.recorded
+    (path, sep, queryString) = self.path.partition("?")
+    query = urllib.parse.parse_qs(queryString)
+    if path == "/version":
+      return self.sendJson(200, {"gitVersion": API_CHECK_VERSION})
+    groupMatch = re.match(r"^/apis/([^/]+)$", path)
+    if groupMatch and groupMatch.group(1) in recorded.getGroups():
+      group = groupMatch.group(1)
+      return self.sendJson(200, {"kind": "APIGroup", "apiVersion": "v1", "name": group, "versions": [{"groupVersion": f"{group}/v1", "version": "v1"}],
+                                 "preferredVersion": {"groupVersion": f"{group}/v1", "version": "v1"}})
+    if path in ("/api", "/apis"):
+      groups = {group: resources for group, resources in recorded.getGroups().items() if (group == "") == (path == "/api")}
+      if self.server.aggregated and "apidiscovery.k8s.io" in self.headers.get("Accept", ""):
+        return self.sendJson(200, {"kind": "APIGroupDiscoveryList", "apiVersion": "apidiscovery.k8s.io/v2", "items": [
+          {"metadata": {"name": group}, "versions": [{"version": "v1", "resources": [
+            {"resource": plural, "responseKind": {"group": group, "version": "v1", "kind": kind}, "scope": "Namespaced",
+             "singularResource": kind.lower()} for (plural, kind) in resources]}]} for group, resources in groups.items()]})
+      if path == "/api":
+        return self.sendJson(200, {"kind": "APIVersions", "versions": ["v1"]})
+      return self.sendJson(200, {"kind": "APIGroupList", "apiVersion": "v1", "groups": [
+        {"name": group, "versions": [{"groupVersion": f"{group}/v1", "version": "v1"}],
+         "preferredVersion": {"groupVersion": f"{group}/v1", "version": "v1"}} for group in groups]})
+
+    match = re.match(r"^/(?:api|apis/([^/]+))/v1(?:/namespaces/([^/]+))?(?:/([^/]+)(?:/([^/]+)(?:/(log))?)?)?$", path)
+    if not match:
+      return self.sendStatus(404, "NotFound", f"the server could not find the requested resource ({path})")
+    (group, nameSpace, plural, objName, logPath) = match.groups()
+    group = group or ""
+    if plural is None:
+      resources = recorded.getGroups().get(group, [])
+      return self.sendJson(200, {"kind": "APIResourceList", "groupVersion": f"{group}/v1" if group else "v1", "resources": [
+        {"name": plural, "singularName": kind.lower(), "namespaced": True, "kind": kind} for (plural, kind) in resources] +
+        ([{"name": "pods/log", "singularName": "", "namespaced": True, "kind": "Pod"}] if group == "" else [])})
+    fullName = plural if recorded.resources.get(plural, ("",))[0] == group else f"{plural}.{group}"
+    if fullName not in recorded.lists:
+      return self.sendStatus(404, "NotFound", f"the server could not find the requested resource ({path})")
+    items = [item for item in recorded.lists[fullName] if nameSpace is None or item.get("metadata").get("namespace") == nameSpace]
+
+    if logPath:
+      logText = recorded.logs.get(f"{nameSpace}/{objName}/{query.get('container', [''])[0]}")
+      if logText is None:
+        return self.sendStatus(400, "BadRequest", f'container "{query.get("container", [""])[0]}" in pod "{objName}" is waiting to start: ContainerCreating')
+      return self.sendBody(200, "text/plain", logText.encode())
+    if objName:
+      for item in items:
+        if item.get("metadata").get("name") == objName:
+          return self.sendJson(200, item)
+      return self.sendStatus(404, "NotFound", f'{plural} "{objName}" not found')
+
+    if "labelSelector" in query:
+      labels = dict(term.split("=", 1) for term in query.get("labelSelector")[0].split(","))
+      items = [item for item in items if labels.items() <= (item.get("metadata").get("labels") or {}).items()]
+
+    #A page of the list, the continue token is the offset of the next page:
+    listMeta = {"resourceVersion": "1000"}
+    if "limit" in query:
+      offset = int(query.get("continue", ["0"])[0])
+      limit = int(query.get("limit")[0])
+      if offset + limit < len(items):
+        listMeta["continue"] = str(offset + limit)
+      items = items[offset:offset + limit]
+    with self.server.statsLock:
+      self.server.stats["list pages"] += 1
+    (group, version, plural, kind) = recorded.resources[fullName]
+    if "as=PartialObjectMetadataList" in self.headers.get("Accept", ""):
+      with self.server.statsLock:
+        self.server.stats["metadata pages"] += 1
+      return self.sendJson(200, {"kind": "PartialObjectMetadataList", "apiVersion": "meta.k8s.io/v1", "metadata": listMeta,
+                                 "items": [{"kind": "PartialObjectMetadata", "apiVersion": "meta.k8s.io/v1", "metadata": item.get("metadata")} for item in items]})
+    self.sendJson(200, {"kind": f"{kind}List", "apiVersion": f"{group}/{version}" if group else version, "metadata": listMeta,
+                        "items": [{key: value for key, value in item.items() if key not in ("kind", "apiVersion")} for item in items]})
+#---------- End class apiStandInHandler ----------#
+
+
+#-------------------------------------------------------------------------#
+# Library functions
+#-------------------------------------------------------------------------#
+#Reset all cpst_podtree objects and caches, so each run starts from the pulled json only.
+def resetPodtree(nameSpaceIn):
+  for globalDict in (cpst_podtree.GLOBAL_POD_OBJECTS, cpst_podtree.GLOBAL_PVC_OBJECTS, cpst_podtree.GLOBAL_SERVICE_OBJECTS,
+                     cpst_podtree.GLOBAL_RESOURCE_INDEX, cpst_podtree.GLOBAL_OWNER_CACHE):
+    globalDict.pop(nameSpaceIn, None)
+  cpst_podtree.parseQuantity.cache_clear()
+  cpst_podtree.QUANTITY_INT_CACHE.clear()
+
+
+#Run each pipeline stage once. Returns list of (stage, seconds, peak bytes or None).
+def runPipeline(nameSpaceIn, traceMemory):
+  stages = [("buildResourceIndex", cpst_podtree.buildResourceIndex),
+            ("createPodObjects", cpst_podtree.createPodObjects),
+            ("createPvcObjects", cpst_podtree.createPvcObjects),
+            ("createServiceObjects", cpst_podtree.createServiceObjects)]
+  for printMode in BENCH_PRINT_MODES:
+    stages.append((f"print {printMode}", lambda ns, mode=printMode: cpst_podtree.printNamespaceResults(ns, mode)))
+
+  results = []
+  for (stageName, stageFunc) in stages:
+    output = io.StringIO()
+    if traceMemory:
+      tracemalloc.reset_peak()
+      baseMemory = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+      stageFunc(nameSpaceIn)
+    seconds = time.perf_counter() - start
+    peakMemory = tracemalloc.get_traced_memory()[1] - baseMemory if traceMemory else None
+    results.append((stageName, seconds, peakMemory))
+  return results
+
+
+#Time the pipeline for one scale. Wall times are the best of repeatIn runs without memory tracing,
+#peak memory comes from one extra run with tracemalloc.
+def benchPipeline(scaleName, repeatIn, snapshotFile=None):
+  generator = namespaceGenerator(BENCH_NAMESPACE, BENCH_SCALES[scaleName])
+  generator.load()
+  counts = generator.getCounts()
+  print(f"Scale '{scaleName}': " + ", ".join(f"{count} {listName}" for listName, count in counts.items()))
+  if snapshotFile:
+    cpst_podtree.saveSnapshot(snapshotFile, [BENCH_NAMESPACE])
+
+  bestTimes = {}
+  for repeat in range(repeatIn):
+    resetPodtree(BENCH_NAMESPACE)
+    for (stageName, seconds, peakMemory) in runPipeline(BENCH_NAMESPACE, False):
+      bestTimes[stageName] = min(seconds, bestTimes.get(stageName, seconds))
+
+  resetPodtree(BENCH_NAMESPACE)
+  tracemalloc.start()
+  memoryResults = runPipeline(BENCH_NAMESPACE, True)
+  tracemalloc.stop()
+
+  print(f"  {'Stage':24} {'Wall (ms)':>10} {'Peak (MiB)':>11}")
+  for (stageName, seconds, peakMemory) in memoryResults:
+    print(f"  {stageName:24} {bestTimes[stageName]*1000:10.1f} {peakMemory/1024/1024:11.2f}")
+  print(f"  {'total':24} {sum(bestTimes.values())*1000:10.1f}")
+  resetPodtree(BENCH_NAMESPACE)
+  return bestTimes
+
+
+#The previous ocpValToInteger() (substring suffix checks, float math, no cache), for comparison.
+def legacyOcpValToInteger(valIn, returnType):
+  if "m" in valIn:
+    normVal = int(valIn.rstrip("m")) / 1000
+  elif "Ki" in valIn:
+    normVal = int(valIn.rstrip("Ki")) * 1024
+  elif "K" in valIn:
+    normVal = int(valIn.rstrip("K")) * 1000
+  elif "Mi" in valIn:
+    normVal = int(valIn.rstrip("Mi")) * 1024 * 1024
+  elif "M" in valIn:
+    normVal = int(valIn.rstrip("M")) * 1000 * 1000
+  elif "Gi" in valIn:
+    normVal = int(valIn.rstrip("Gi")) * 1024 * 1024 * 1024
+  elif "G" in valIn:
+    normVal = int(valIn.rstrip("G")) * 1000 * 1000 * 1000
+  else:
+    try:
+      normVal = int(valIn)
+    except:
+      return -1
+
+  if "m" == returnType:
+    retVal = normVal * 1000
+  elif "Ki" == returnType:
+    retVal = normVal / 1024
+  elif "Gi" == returnType:
+    retVal = normVal / 1024 / 1024 / 1024
+  else:
+    retVal = normVal
+  return round(retVal)
+
+
+#Time the quantity conversion of countIn values (4 per container: cpu/memory requests/limits).
+def benchQuantity(countIn):
+  rng = random.Random(42)
+  values = [rng.choice(QUANTITY_SAMPLES) for i in range(countIn)]
+  units = ["m" if ("m" in val or val.isdigit()) else "Ki" for val in values]
+
+  results = {}
+  for (label, convertFunc) in (("legacy", legacyOcpValToInteger), ("ocpValToInteger", cpst_podtree.ocpValToInteger)):
+    start = time.perf_counter()
+    for (val, unit) in zip(values, units):
+      convertFunc(val, unit)
+    results[label] = time.perf_counter() - start
+
+  start = time.perf_counter()
+  for unit in ("m", "Ki"):
+    cpst_podtree.ocpValsToIntegers([val for (val, valUnit) in zip(values, units) if valUnit == unit], unit)
+  results["ocpValsToIntegers (bulk)"] = time.perf_counter() - start
+
+  print(f"Quantity conversion of {countIn} values:")
+  for label, seconds in results.items():
+    print(f"  {label:28} {seconds*1000:9.1f} ms   ({results['legacy']/seconds:5.1f}x legacy)")
+  return results
+
+
+#Start the API stand-in for a recordedApi on a free local port, serving from a daemon thread.
+def startApiStandIn(recorded):
+  server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), apiStandInHandler)
+  server.daemon_threads = True
+  server.recorded = recorded
+  server.aggregated = True
+  server.statsLock = threading.Lock()
+  server.stats = {"requests": 0, "connections": 0, "list pages": 0, "metadata pages": 0}
+  threading.Thread(target=server.serve_forever, daemon=True).start()
+  return server
+
+
+#Serve a recordedApi from the API stand-in for the duration of a with block, with the oc stand-in first on
+#PATH and cpst_podtree's discovery cache in a temporary directory (XDG_CACHE_HOME too, for a cpst_podtree.py
+#run as a command). The temporary directory also holds recorded.json. Yields the API stand-in server.
+@contextlib.contextmanager
+def recordedCluster(recorded):
+  server = startApiStandIn(recorded)
+  savedEnv = {name: os.environ.get(name) for name in ("PATH", "XDG_CACHE_HOME")}
+  savedCacheFile = cpst_podtree.DISCOVERY_CACHE_FILE
+  with tempfile.TemporaryDirectory() as tempDir:
+    recorded.writeRecording(os.path.join(tempDir, "recorded.json"), f"http://127.0.0.1:{server.server_address[1]}")
+    ocFile = os.path.join(tempDir, "oc")
+    with open(ocFile, "w") as scriptFile:
+      scriptFile.write(f"#!{sys.executable}" + FAKE_OC_SCRIPT)
+    os.chmod(ocFile, 0o755)
+    os.environ["PATH"] = tempDir + os.pathsep + (savedEnv["PATH"] or "")
+    os.environ["XDG_CACHE_HOME"] = tempDir
+    cpst_podtree.DISCOVERY_CACHE_FILE = os.path.join(tempDir, "cpst_podtree", "discovery.json")
+    try:
+      yield server
+    finally:
+      for name, value in savedEnv.items():
+        if value is None:
+          os.environ.pop(name, None)
+        else:
+          os.environ[name] = value
+      cpst_podtree.DISCOVERY_CACHE_FILE = savedCacheFile
+      server.shutdown()
+      server.server_close()
+
+
+#Pull the recorded namespace through a transport ("api" or "oc") the way cpst_podtree.py does: set up the
+#transport from the kubeconfig, check the login, pull every kind with getGlobalJson(), then read the
+#container logs of the first API_CHECK_LOG_PODS pods.
+#Returns tuple of (transport name, login valid, api resources, [global name] = items, fetch errors, [pod/container] = (log, failed)).
+def pullThroughTransport(transportType, recorded):
+  for globalName in cpst_podtree.SNAPSHOT_GLOBALS:
+    getattr(cpst_podtree, globalName).clear()
+  cpst_podtree.GLOBAL_LIST_VERSIONS.clear()
+  cpst_podtree.GLOBAL_UNPLANNED_KINDS.clear()
+  with contextlib.redirect_stdout(io.StringIO()):
+    transport = cpst_podtree.setupTransport(transportType)
+    loginValid = cpst_podtree.isOcpLoginValid()
+    cpst_podtree.getGlobalJson([recorded.namespace])
+  pulledJson = {globalName: getattr(cpst_podtree, globalName).get(recorded.namespace, {}).get("items") for globalName in API_CHECK_GLOBALS}
+  fetchErrors = dict(cpst_podtree.GLOBAL_FETCH_ERRORS)
+
+  logs = {}
+  for pod in recorded.lists["pods"][:API_CHECK_LOG_PODS]:
+    podName = pod.get("metadata").get("name")
+    for cont in pod.get("spec").get("initContainers") + pod.get("spec").get("containers"):
+      lines = []
+      failed = False
+      for (line, errStr) in transport.getLogLines(podName, cont.get("name"), recorded.namespace):
+        if errStr:
+          failed = True
+        else:
+          lines.append(line)
+      logs[f"{podName}/{cont.get('name')}"] = (b"".join(lines), failed)
+  return (transport.name, loginValid, transport.getApiResources()[0], pulledJson, fetchErrors, logs)
+
+
+#Check the api transport against the API stand-in. The generated namespace is pulled three times: through
+#the oc transport (from the oc stand-in), and through the api transport with and without aggregated discovery.
+#Both api pulls must give the same discovery result, items and container logs as the oc pull.
+#Lists are pulled in pages of API_CHECK_PAGE_SIZE. Returns True if the check passed.
+def checkApiTransport(scaleName):
+  generator = namespaceGenerator(BENCH_NAMESPACE, BENCH_SCALES[scaleName])
+  recorded = recordedApi(generator)
+  print(f"Api check, scale '{scaleName}': " + ", ".join(f"{len(items)} {fullName}" for fullName, items in recorded.lists.items()))
+
+  savedPageSize = cpst_podtree.PAGE_SIZE
+  results = []
+  with recordedCluster(recorded) as server:
+    cpst_podtree.PAGE_SIZE = API_CHECK_PAGE_SIZE
+    try:
+      for (label, transportType, aggregated) in (("oc", "oc", False), ("api", "api", True), ("api (no aggregated discovery)", "api", False)):
+        server.aggregated = aggregated
+        for statName in server.stats:
+          server.stats[statName] = 0
+        if os.path.exists(cpst_podtree.DISCOVERY_CACHE_FILE):
+          os.remove(cpst_podtree.DISCOVERY_CACHE_FILE)
+        start = time.perf_counter()
+        result = pullThroughTransport(transportType, recorded)
+        results.append((label, transportType, time.perf_counter() - start, dict(server.stats), result))
+    finally:
+      cpst_podtree.PAGE_SIZE = savedPageSize
+
+  (ocName, ocLogin, ocApiResources, ocJson, ocErrors, ocLogs) = results[0][4]
+  itemCount = sum(len(items or []) for items in ocJson.values())
+  passed = True
+  print(f"  {'Transport':30} {'Wall (ms)':>10} {'Requests':>9} {'Connections':>12} {'List pages':>11}   Result")
+  for (label, transportType, seconds, stats, (transportName, loginValid, apiResources, pulledJson, fetchErrors, logs)) in results:
+    problems = []
+    if transportName != transportType:
+      problems.append(f"used the {transportName} transport")
+    if not loginValid:
+      problems.append("login check failed")
+    if fetchErrors:
+      problems.append("failed to pull " + ", ".join(sorted(resource for errors in fetchErrors.values() for resource in errors)))
+    if transportType == "oc":
+      if itemCount != recorded.getPulledCount():
+        problems.append(f"pulled {itemCount} of {recorded.getPulledCount()} items")
+    else:
+      if apiResources != ocApiResources:
+        problems.append("discovery differs")
+      problems += [f"{globalName} differs" for globalName in API_CHECK_GLOBALS if pulledJson[globalName] != ocJson[globalName]]
+      if logs != ocLogs:
+        problems.append("container logs differ")
+    passed = passed and not problems
+    print(f"  {label:30} {seconds*1000:10.1f} {stats['requests']:9} {stats['connections']:12} {stats['list pages']:11}   {'; '.join(problems) or 'ok'}")
+  logCount = sum(1 for (logText, failed) in ocLogs.values() if not failed)
+  print(f"  {itemCount} items and {logCount} container logs ({len(ocLogs) - logCount} not started) compared with the oc transport: {'passed' if passed else 'FAILED'}")
+  return passed
+
+
+def printUsage():
+  print(f'''\
+Usage: {sys.argv[0]} [-P] [-Q] [-A] [--scale <scales>] [-r repeat] [-c count]
+  Benchmarks (default: -P and -Q):
+    -P / --pipeline        - Pipeline stages on synthetic namespaces
+    -Q / --quantity        - Quantity parsing microbenchmark
+  Checks:
+    -A / --api-check       - Pull a synthetic namespace through the api transport from a local API server
+                             stand-in, and compare it with the oc transport's pull (exit status 1 if different)
+  Options:
+    --scale scales         - Comma separated scales for -P and -A, from: {', '.join(BENCH_SCALES)}
+                             (default: all for -P, small for -A)
+    -r repeat / --repeat   - Runs per scale for -P, the best wall time is reported (default 3)
+    --save-snapshot file   - Also save the largest generated namespace as a cpst_podtree.py snapshot
+    -c count / --count     - Number of quantity values to convert for -Q (default 200000)
+    -h / --help            - Help''')
+
+
+#-------------------------------------------------------------------------#
+# Main
+#-------------------------------------------------------------------------#
+def main():
+  runPipelineBench = False
+  runQuantityBench = False
+  runApiCheck = False
+  scaleList = None
+  repeatIn = 3
+  countIn = 200000
+  snapshotFile = None
+  try:
+    options, args = getopt.getopt(sys.argv[1:], "hPQAr:c:", ["help","pipeline","quantity","api-check","scale=","repeat=","count=","save-snapshot="])
+  except getopt.GetoptError:
+    printUsage()
+    sys.exit(2)
+  for opt, arg in options:
+    if opt in ("-h","--help"):
+      printUsage()
+      sys.exit(2)
+    elif opt in ("-P","--pipeline"): runPipelineBench = True
+    elif opt in ("-Q","--quantity"): runQuantityBench = True
+    elif opt in ("-A","--api-check"): runApiCheck = True
+    elif opt == "--scale": scaleList = arg.split(",")
+    elif opt in ("-r","--repeat"): repeatIn = int(arg)
+    elif opt in ("-c","--count"): countIn = int(arg)
+    elif opt == "--save-snapshot": snapshotFile = arg
+
+  for scaleName in scaleList or []:
+    if scaleName not in BENCH_SCALES:
+      print(f"Error: Unknown scale '{scaleName}'. Scales: {', '.join(BENCH_SCALES)}",file=sys.stderr)
+      sys.exit(2)
+  if not runPipelineBench and not runQuantityBench and not runApiCheck:
+    runPipelineBench = runQuantityBench = True
+
+  checkPassed = True
+  if runApiCheck:
+    for scaleName in scaleList or ["small"]:
+      checkPassed = checkApiTransport(scaleName) and checkPassed
+  if runPipelineBench:
+    #The generated data is complete, a cache miss must never reach the cluster:
+    cpst_podtree.SNAPSHOT_REPLAY = True
+    pipelineScales = scaleList or list(BENCH_SCALES)
+    for scaleName in pipelineScales:
+      benchPipeline(scaleName, repeatIn, snapshotFile if scaleName == pipelineScales[-1] else None)
+  if runQuantityBench:
+    benchQuantity(countIn)
+  if not checkPassed:
+    sys.exit(1)
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,216 @@
+#Abstract:
+#  Tests of the api discovery cache of cpst_podtree.py (loadDiscoveryCache(), saveDiscoveryCache(),
+#  getKubeconfigKey() and the oc transport's use of them), and of the snapshot round trip of the
+#  pulled json with its discovery results.
+#  Run with: python3 -m unittest discover -s tests (or pytest)
+
+import io
+import os
+import sys
+import json
+import time
+import tempfile
+import contextlib
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import cpst_podtree
+import cpst_podtree_bench
+
+CLUSTER_KEY = "https://api.test:6443 v1.27.0"
+API_RESOURCES = ["pods", "zenservices.zen.cpd.ibm.com", "zenextensions.zen.cpd.ibm.com", "notebooks.cognitivedata.ibm.com"]
+
+
+class discoveryCacheTests(unittest.TestCase):
+
+  def setUp(self):
+    self.tempDir = tempfile.TemporaryDirectory()
+    self.savedSettings = (cpst_podtree.DISCOVERY_CACHE_FILE, cpst_podtree.DISCOVERY_CACHE_TTL, cpst_podtree.DISCOVERY_REFRESH)
+    self.savedEnv = {name: os.environ.get(name) for name in ("PATH", "KUBECONFIG")}
+    cpst_podtree.DISCOVERY_CACHE_FILE = os.path.join(self.tempDir.name, "cache", "discovery.json")
+    cpst_podtree.DISCOVERY_REFRESH = False
+
+  def tearDown(self):
+    (cpst_podtree.DISCOVERY_CACHE_FILE, cpst_podtree.DISCOVERY_CACHE_TTL, cpst_podtree.DISCOVERY_REFRESH) = self.savedSettings
+    for name, value in self.savedEnv.items():
+      if value is None:
+        os.environ.pop(name, None)
+      else:
+        os.environ[name] = value
+    self.tempDir.cleanup()
+
+  #Put an oc first on PATH that records its arguments in oc.log, and fails. Returns the log file name.
+  def writeFailingOc(self):
+    ocFile = os.path.join(self.tempDir.name, "oc")
+    logFile = os.path.join(self.tempDir.name, "oc.log")
+    with open(ocFile, "w") as scriptFile:
+      scriptFile.write(f"#!/bin/sh\necho \"$@\" >> '{logFile}'\necho 'oc stub: no cluster' >&2\nexit 1\n")
+    os.chmod(ocFile, 0o755)
+    os.environ["PATH"] = self.tempDir.name + os.pathsep + os.environ.get("PATH", "")
+    return logFile
+
+  #Returns the oc commands run so far (see writeFailingOc()).
+  def getOcCalls(self, logFile):
+    if not os.path.exists(logFile):
+      return []
+    with open(logFile) as ocLog:
+      return ocLog.read().splitlines()
+
+  #Point KUBECONFIG at a file with the given content, returns its name.
+  def writeKubeconfig(self, content):
+    fileName = os.path.join(self.tempDir.name, "kubeconfig")
+    with open(fileName, "w") as configFile:
+      configFile.write(content)
+    os.environ["KUBECONFIG"] = fileName
+    return fileName
+
+  def test_entry_round_trip(self):
+    self.assertIsNone(cpst_podtree.loadDiscoveryCache(CLUSTER_KEY))
+    cpst_podtree.saveDiscoveryCache(CLUSTER_KEY, {"apiResources": API_RESOURCES})
+    cached = cpst_podtree.loadDiscoveryCache(CLUSTER_KEY)
+    self.assertEqual(cached.get("apiResources"), API_RESOURCES)
+    self.assertAlmostEqual(cached.get("created"), time.time(), delta=60)
+    self.assertIsNone(cpst_podtree.loadDiscoveryCache("https://api.other:6443 v1.27.0"))
+
+  def test_entries_are_kept_per_cluster(self):
+    cpst_podtree.saveDiscoveryCache(CLUSTER_KEY, {"apiResources": API_RESOURCES})
+    cpst_podtree.saveDiscoveryCache("https://api.test:6443 v1.28.0", {"apiResources": ["pods"]})
+    self.assertEqual(cpst_podtree.loadDiscoveryCache(CLUSTER_KEY).get("apiResources"), API_RESOURCES)
+    self.assertEqual(cpst_podtree.loadDiscoveryCache("https://api.test:6443 v1.28.0").get("apiResources"), ["pods"])
+
+  def test_expired_entries(self):
+    cpst_podtree.saveDiscoveryCache(CLUSTER_KEY, {"apiResources": API_RESOURCES})
+    with open(cpst_podtree.DISCOVERY_CACHE_FILE) as cacheFile:
+      cache = json.load(cacheFile)
+    cache[CLUSTER_KEY]["created"] -= cpst_podtree.DISCOVERY_CACHE_TTL + 1
+    with open(cpst_podtree.DISCOVERY_CACHE_FILE, "w") as cacheFile:
+      json.dump(cache, cacheFile)
+    self.assertIsNone(cpst_podtree.loadDiscoveryCache(CLUSTER_KEY))
+    #Saving another entry drops the expired one:
+    cpst_podtree.saveDiscoveryCache("https://api.other:6443 v1.27.0", {"apiResources": ["pods"]})
+    with open(cpst_podtree.DISCOVERY_CACHE_FILE) as cacheFile:
+      self.assertEqual(list(json.load(cacheFile)), ["https://api.other:6443 v1.27.0"])
+
+  def test_refresh_ignores_the_cache(self):
+    cpst_podtree.saveDiscoveryCache(CLUSTER_KEY, {"apiResources": API_RESOURCES})
+    cpst_podtree.DISCOVERY_REFRESH = True
+    self.assertIsNone(cpst_podtree.loadDiscoveryCache(CLUSTER_KEY))
+
+  def test_unusable_cache_file(self):
+    os.makedirs(os.path.dirname(cpst_podtree.DISCOVERY_CACHE_FILE))
+    with open(cpst_podtree.DISCOVERY_CACHE_FILE, "w") as cacheFile:
+      cacheFile.write("{not json")
+    self.assertIsNone(cpst_podtree.loadDiscoveryCache(CLUSTER_KEY))
+    cpst_podtree.saveDiscoveryCache(CLUSTER_KEY, {"apiResources": API_RESOURCES})
+    self.assertEqual(cpst_podtree.loadDiscoveryCache(CLUSTER_KEY).get("apiResources"), API_RESOURCES)
+    #No key (the cluster could not be identified), nothing is cached:
+    self.assertIsNone(cpst_podtree.loadDiscoveryCache(None))
+    cpst_podtree.saveDiscoveryCache(None, {"apiResources": ["pods"]})
+    with open(cpst_podtree.DISCOVERY_CACHE_FILE) as cacheFile:
+      self.assertEqual(list(json.load(cacheFile)), [CLUSTER_KEY])
+
+  def test_kubeconfig_key_follows_the_file(self):
+    os.environ["KUBECONFIG"] = os.path.join(self.tempDir.name, "missing")
+    self.assertIsNone(cpst_podtree.getKubeconfigKey())
+    self.writeKubeconfig("current-context: one\n")
+    firstKey = cpst_podtree.getKubeconfigKey()
+    self.assertTrue(firstKey.startswith("kubeconfig "))
+    self.assertEqual(cpst_podtree.getKubeconfigKey(), firstKey)
+    self.writeKubeconfig("current-context: two\n")
+    self.assertNotEqual(cpst_podtree.getKubeconfigKey(), firstKey)
+
+  #A cache hit needs no oc at all: the cluster key is cached per kubeconfig, the resources per cluster key.
+  def test_oc_transport_cache_hit_runs_no_oc(self):
+    self.writeKubeconfig("current-context: one\n")
+    cpst_podtree.saveDiscoveryCache(cpst_podtree.getKubeconfigKey(), {"clusterKey": CLUSTER_KEY})
+    cpst_podtree.saveDiscoveryCache(CLUSTER_KEY, {"apiResources": API_RESOURCES})
+    logFile = self.writeFailingOc()
+    self.assertEqual(cpst_podtree.ocTransport().getApiResources(), (API_RESOURCES, None))
+    self.assertEqual(self.getOcCalls(logFile), [])
+    #A changed kubeconfig may be a different cluster, it is asked again:
+    self.writeKubeconfig("current-context: two\n")
+    with contextlib.redirect_stdout(io.StringIO()):
+      (apiResources, errStr) = cpst_podtree.ocTransport().getApiResources()
+    self.assertIsNone(apiResources)
+    self.assertIn("oc stub: no cluster", errStr)
+    self.assertEqual(self.getOcCalls(logFile)[0], "whoami --show-server")
+
+  #The custom resource lists are matched in-process against the (cached) discovery result:
+  def test_cr_patterns_match_cached_resources(self):
+    self.writeKubeconfig("current-context: one\n")
+    cpst_podtree.saveDiscoveryCache(cpst_podtree.getKubeconfigKey(), {"clusterKey": CLUSTER_KEY})
+    cpst_podtree.saveDiscoveryCache(CLUSTER_KEY, {"apiResources": API_RESOURCES})
+    logFile = self.writeFailingOc()
+    savedSettings = (cpst_podtree.ACTIVE_TRANSPORT, dict(cpst_podtree.GLOBAL_DISCOVERY))
+    try:
+      cpst_podtree.ACTIVE_TRANSPORT = cpst_podtree.ocTransport()
+      self.assertEqual(cpst_podtree.fetchJsonForApiResources("openshift", "test"), ({"items": []}, None))
+      self.assertEqual(self.getOcCalls(logFile), [])
+      #A match is pulled (the oc stub fails it), and recorded for the snapshot and --watch:
+      with contextlib.redirect_stdout(io.StringIO()):
+        (listJson, errStr) = cpst_podtree.fetchJsonForApiResources("zen|cognitivedata", "test")
+      self.assertIsNone(listJson)
+      self.assertEqual(cpst_podtree.GLOBAL_DISCOVERY.get("zen|cognitivedata"),
+                       "zenservices.zen.cpd.ibm.com,zenextensions.zen.cpd.ibm.com,notebooks.cognitivedata.ibm.com")
+    finally:
+      cpst_podtree.ACTIVE_TRANSPORT = savedSettings[0]
+      cpst_podtree.GLOBAL_DISCOVERY.clear()
+      cpst_podtree.GLOBAL_DISCOVERY.update(savedSettings[1])
+
+
+class snapshotTests(unittest.TestCase):
+
+  def setUp(self):
+    self.tempDir = tempfile.TemporaryDirectory()
+    for globalName in cpst_podtree.SNAPSHOT_GLOBALS:
+      getattr(cpst_podtree, globalName).clear()
+
+  def tearDown(self):
+    for globalName in cpst_podtree.SNAPSHOT_GLOBALS:
+      getattr(cpst_podtree, globalName).clear()
+    cpst_podtree_bench.resetPodtree(cpst_podtree_bench.BENCH_NAMESPACE)
+    cpst_podtree.SNAPSHOT_CREATED = None
+    self.tempDir.cleanup()
+
+  #Compile the loaded namespace, returns its -T output.
+  def getPodTree(self):
+    cpst_podtree_bench.resetPodtree(cpst_podtree_bench.BENCH_NAMESPACE)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+      cpst_podtree.buildResourceIndex(cpst_podtree_bench.BENCH_NAMESPACE)
+      cpst_podtree.compileClusterObjects(cpst_podtree_bench.BENCH_NAMESPACE)
+      cpst_podtree.printNamespaceResults(cpst_podtree_bench.BENCH_NAMESPACE, "fullpodtree")
+    return output.getvalue()
+
+  def test_snapshot_round_trip(self):
+    nameSpace = cpst_podtree_bench.BENCH_NAMESPACE
+    cpst_podtree_bench.namespaceGenerator(nameSpace, 4).load()
+    cpst_podtree.GLOBAL_DISCOVERY["ibm|cognitivedata"] = "zenservices.zen.cpd.ibm.com,zenextensions.zen.cpd.ibm.com"
+    cpst_podtree.GLOBAL_FETCH_ERRORS[nameSpace] = {"configmap": "timed out"}
+    savedJson = {globalName: json.loads(json.dumps(getattr(cpst_podtree, globalName))) for globalName in cpst_podtree.SNAPSHOT_GLOBALS}
+    podTree = self.getPodTree()
+
+    snapshotFile = os.path.join(self.tempDir.name, "snapshot.json.gz")
+    with contextlib.redirect_stdout(io.StringIO()):
+      self.assertTrue(cpst_podtree.saveSnapshot(snapshotFile, [nameSpace]))
+    for globalName in cpst_podtree.SNAPSHOT_GLOBALS:
+      getattr(cpst_podtree, globalName).clear()
+    with contextlib.redirect_stdout(io.StringIO()):
+      self.assertEqual(cpst_podtree.loadSnapshot(snapshotFile), [nameSpace])
+    for globalName in cpst_podtree.SNAPSHOT_GLOBALS:
+      with self.subTest(globalName=globalName):
+        self.assertEqual(getattr(cpst_podtree, globalName), savedJson[globalName])
+    self.assertIsNotNone(cpst_podtree.SNAPSHOT_CREATED)
+    self.assertEqual(self.getPodTree(), podTree)
+
+  def test_unreadable_snapshot(self):
+    snapshotFile = os.path.join(self.tempDir.name, "snapshot.json.gz")
+    with open(snapshotFile, "w") as snapFile:
+      snapFile.write("not gzip")
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()) as errOut:
+      self.assertIsNone(cpst_podtree.loadSnapshot(snapshotFile))
+    self.assertIn("Failed to read snapshot file", errOut.getvalue())
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,158 @@
+#Abstract:
+#  Tests of the events view (-E) of cpst_podtree.py: the event index (buildEventIndex()), the roll up of
+#  events to pods, pvcs and services (attachEvents()), and events replayed from a snapshot, whose --since
+#  window ends when the snapshot was taken.
+#  Run with: python3 -m unittest discover -s tests (or pytest)
+
+import io
+import os
+import sys
+import tempfile
+import datetime
+import contextlib
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import cpst_podtree
+import cpst_podtree_bench
+
+TEST_NAMESPACE = "events-test"
+
+
+#Returns an event of the given object, last seen at lastSeen (Ex: "2026-10-01T11:00:00Z").
+def newEvent(kindIn, nameIn, reason, lastSeen, eventType="Normal", count=1):
+  return {"involvedObject": {"kind": kindIn, "name": nameIn, "namespace": TEST_NAMESPACE}, "type": eventType,
+          "reason": reason, "message": f"{reason} of {nameIn}\n", "count": count, "lastTimestamp": lastSeen}
+
+
+class eventIndexTests(unittest.TestCase):
+
+  def setUp(self):
+    self.savedSettings = (cpst_podtree.SINCE_SECONDS, cpst_podtree.SNAPSHOT_CREATED)
+    cpst_podtree.SINCE_SECONDS = None
+    cpst_podtree.SNAPSHOT_CREATED = "2026-10-01T12:00:00+0000"
+
+  def tearDown(self):
+    (cpst_podtree.SINCE_SECONDS, cpst_podtree.SNAPSHOT_CREATED) = self.savedSettings
+    cpst_podtree.GLOBAL_EVENTS.pop(TEST_NAMESPACE, None)
+    cpst_podtree.GLOBAL_EVENT_INDEX.pop(TEST_NAMESPACE, None)
+
+  def buildIndex(self, events):
+    cpst_podtree.GLOBAL_EVENTS[TEST_NAMESPACE] = {"items": events}
+    cpst_podtree.buildEventIndex(TEST_NAMESPACE)
+    return cpst_podtree.GLOBAL_EVENT_INDEX[TEST_NAMESPACE]
+
+  def test_event_time(self):
+    utc = datetime.timezone.utc
+    self.assertEqual(cpst_podtree.getEventTime({"lastTimestamp": "2026-10-01T11:00:00Z", "eventTime": "2026-10-01T10:00:00.000000Z"}),
+                     datetime.datetime(2026, 10, 1, 11, 0, tzinfo=utc))
+    #Newer events only have eventTime, and series.lastObservedTime when repeated:
+    self.assertEqual(cpst_podtree.getEventTime({"eventTime": "2026-10-01T10:00:00.500000Z", "lastTimestamp": None}),
+                     datetime.datetime(2026, 10, 1, 10, 0, 0, 500000, tzinfo=utc))
+    self.assertEqual(cpst_podtree.getEventTime({"series": {"lastObservedTime": "2026-10-01T10:30:00.000000Z"},
+                                                "eventTime": "2026-10-01T10:00:00.000000Z"}),
+                     datetime.datetime(2026, 10, 1, 10, 30, tzinfo=utc))
+    self.assertEqual(cpst_podtree.getEventTime({"lastTimestamp": "bogus", "metadata": {"creationTimestamp": "2026-10-01T09:00:00Z"}}),
+                     datetime.datetime(2026, 10, 1, 9, 0, tzinfo=utc))
+    self.assertIsNone(cpst_podtree.getEventTime({}))
+
+  def test_index_by_object_oldest_first(self):
+    index = self.buildIndex([
+      newEvent("Pod", "web-1", "Started", "2026-10-01T11:30:00Z"),
+      newEvent("Pod", "web-1", "Scheduled", "2026-10-01T11:00:00Z"),
+      newEvent("PersistentVolumeClaim", "data-web-1", "ProvisioningSucceeded", "2026-10-01T10:00:00Z"),
+      newEvent("Pod", "web-1", "BackOff", "2026-10-01T11:45:00Z", "Warning", 12),
+    ])
+    self.assertEqual(sorted(index), ["persistentvolumeclaim/data-web-1", "pod/web-1"])
+    self.assertEqual([event.reason for event in index["pod/web-1"]], ["Scheduled", "Started", "BackOff"])
+    self.assertEqual((index["pod/web-1"][-1].type, index["pod/web-1"][-1].count), ("Warning", 12))
+
+  def test_buffer_keeps_most_recent_events(self):
+    events = [newEvent("Pod", "web-1", f"Reason{minute:02d}", f"2026-10-01T11:{minute:02d}:00Z") for minute in range(25)]
+    index = self.buildIndex(events)
+    self.assertEqual([event.reason for event in index["pod/web-1"]],
+                     [f"Reason{minute:02d}" for minute in range(25 - cpst_podtree.EVENTS_PER_OBJECT, 25)])
+
+  #The --since window ends when the snapshot was taken, events without a time are left out of it:
+  def test_since_window(self):
+    events = [newEvent("Pod", "web-1", "Old", "2026-10-01T10:59:00Z"), newEvent("Pod", "web-1", "Recent", "2026-10-01T11:01:00Z"),
+              {"involvedObject": {"kind": "Pod", "name": "web-1"}, "reason": "NoTime", "type": "Normal"}]
+    self.assertEqual(len(self.buildIndex(events)["pod/web-1"]), 3)
+    cpst_podtree.SINCE_SECONDS = 3600
+    self.assertEqual([event.reason for event in self.buildIndex(events)["pod/web-1"]], ["Recent"])
+
+
+class eventViewTests(unittest.TestCase):
+
+  def setUp(self):
+    self.tempDir = tempfile.TemporaryDirectory()
+    self.savedSettings = (cpst_podtree.SINCE_SECONDS, cpst_podtree.SNAPSHOT_CREATED)
+    for globalName in cpst_podtree.SNAPSHOT_GLOBALS:
+      getattr(cpst_podtree, globalName).clear()
+    self.nameSpace = cpst_podtree_bench.BENCH_NAMESPACE
+    self.generator = cpst_podtree_bench.namespaceGenerator(self.nameSpace, 3)
+    self.generator.load()
+
+  def tearDown(self):
+    (cpst_podtree.SINCE_SECONDS, cpst_podtree.SNAPSHOT_CREATED) = self.savedSettings
+    for globalName in cpst_podtree.SNAPSHOT_GLOBALS:
+      getattr(cpst_podtree, globalName).clear()
+    cpst_podtree_bench.resetPodtree(self.nameSpace)
+    cpst_podtree.GLOBAL_EVENT_INDEX.pop(self.nameSpace, None)
+    self.tempDir.cleanup()
+
+  #Compile the loaded namespace with its events, returns the -E output.
+  def getEventView(self):
+    cpst_podtree_bench.resetPodtree(self.nameSpace)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+      cpst_podtree.buildResourceIndex(self.nameSpace)
+      cpst_podtree.compileClusterObjects(self.nameSpace)
+      cpst_podtree.attachEvents(self.nameSpace)
+      cpst_podtree.printNamespaceResults(self.nameSpace, "events")
+    return output.getvalue()
+
+  #A service gets the events of its pods and pvcs, and of the owners between them and the service:
+  def test_service_roll_up(self):
+    self.generator.addEvent(self.generator.lists["statefulset"][0], "Warning", "FailedCreate", "create Pod failed", 1)
+    self.getEventView()
+    serviceName = "zenservice/svc0000-cr"
+    servobj = cpst_podtree.GLOBAL_SERVICE_OBJECTS[self.nameSpace][serviceName]
+    stsPods = [podName for podName in servobj.podList if "-sts-" in podName]
+    self.assertIn("statefulset/svc0000-sts", servobj.events)
+    for podName in stsPods:
+      self.assertIn(f"pod/{podName}", servobj.events)
+      podobj = cpst_podtree.GLOBAL_POD_OBJECTS[self.nameSpace][podName]
+      self.assertEqual([event.reason for event in podobj.events][0], "Scheduled")
+    for pvcName in servobj.pvcList:
+      if pvcName.startswith("data-"):
+        self.assertEqual([event.reason for event in cpst_podtree.GLOBAL_PVC_OBJECTS[self.nameSpace][pvcName].events],
+                         ["ProvisioningSucceeded"])
+    otherServices = [servobj.events for name, servobj in cpst_podtree.GLOBAL_SERVICE_OBJECTS[self.nameSpace].items() if name != serviceName]
+    self.assertFalse(any("statefulset/svc0000-sts" in events for events in otherServices))
+
+  #The events are saved with the snapshot, and the replay's --since window ends when it was taken:
+  def test_snapshot_round_trip(self):
+    cpst_podtree.SINCE_SECONDS = 3600
+    cpst_podtree.SNAPSHOT_CREATED = "2026-10-01T12:00:00+0000"
+    eventView = self.getEventView()
+    self.assertIn("BackOff", eventView)
+    self.assertNotIn("ProvisioningSucceeded", eventView) #90 minutes before 12:00
+
+    snapshotFile = os.path.join(self.tempDir.name, "snapshot.json.gz")
+    with contextlib.redirect_stdout(io.StringIO()):
+      self.assertTrue(cpst_podtree.saveSnapshot(snapshotFile, [self.nameSpace]))
+    for globalName in cpst_podtree.SNAPSHOT_GLOBALS:
+      getattr(cpst_podtree, globalName).clear()
+    cpst_podtree.SNAPSHOT_CREATED = None
+    with contextlib.redirect_stdout(io.StringIO()):
+      self.assertEqual(cpst_podtree.loadSnapshot(snapshotFile), [self.nameSpace])
+    self.assertEqual(cpst_podtree.GLOBAL_EVENTS[self.nameSpace].get("items"), self.generator.lists["events"])
+    #The snapshot was taken now, long after the generated events, so the window is empty:
+    self.assertNotIn("BackOff", self.getEventView())
+    cpst_podtree.SNAPSHOT_CREATED = "2026-10-01T12:00:00+0000"
+    self.assertEqual(self.getEventView(), eventView)
+
+
+if __name__ == "__main__":
+  unittest.main()
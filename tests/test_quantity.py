@@ -0,0 +1,88 @@
+#Abstract:
+#  Tests of the Kubernetes quantity parser of cpst_podtree.py (parseQuantity(), ocpValsToIntegers(),
+#  ocpValToInteger(), reduceValue()), against the previous implementation kept in cpst_podtree_bench.py.
+#  Run with: python3 -m unittest discover -s tests (or pytest)
+
+import io
+import os
+import sys
+import contextlib
+import unittest
+from fractions import Fraction
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import cpst_podtree
+import cpst_podtree_bench
+
+RETURN_TYPES = ["m", "Ki", "Gi", ""]
+
+
+class quantityTests(unittest.TestCase):
+
+  def setUp(self):
+    cpst_podtree.parseQuantity.cache_clear()
+    cpst_podtree.QUANTITY_INT_CACHE.clear()
+
+  #The values the previous implementation could handle give the same result:
+  def test_matches_legacy_parser(self):
+    for valIn in cpst_podtree_bench.QUANTITY_SAMPLES:
+      for returnType in RETURN_TYPES:
+        with self.subTest(valIn=valIn, returnType=returnType):
+          self.assertEqual(cpst_podtree.ocpValToInteger(valIn, returnType),
+                           cpst_podtree_bench.legacyOcpValToInteger(valIn, returnType))
+
+  def test_exact_values(self):
+    expected = [
+      ("250m", Fraction(1, 4)), ("1.5", Fraction(3, 2)), ("1.5Gi", 3 * 2**29), ("129e6", 129000000),
+      ("129E-3", Fraction(129, 1000)), ("2Ti", 2 * 2**40), ("1Pi", 2**50), ("1Ei", 2**60), ("3E", 3 * 10**18),
+      ("1k", 1000), ("1K", 1000), ("500n", Fraction(1, 2 * 10**6)), ("10u", Fraction(1, 10**5)),
+      (".5Mi", 2**19), ("+2G", 2 * 10**9), ("-1", -1), (" 64Mi ", 64 * 2**20),
+    ]
+    for (valIn, value) in expected:
+      with self.subTest(valIn=valIn):
+        self.assertEqual(cpst_podtree.parseQuantity(valIn), value)
+
+  def test_invalid_quantities(self):
+    for valIn in ("", "abc", "1.2.3", "5Gb", "1e", "Mi", "1 Gi", "0x10"):
+      with self.subTest(valIn=valIn):
+        self.assertIsNone(cpst_podtree.parseQuantity(valIn))
+        errOut = io.StringIO()
+        with contextlib.redirect_stderr(errOut):
+          self.assertEqual(cpst_podtree.ocpValToInteger(valIn, "Ki"), 0)
+        self.assertIn(f"'{valIn}' is not a valid quantity", errOut.getvalue())
+
+  #Results are rounded to the nearest whole unit, exactly (no float error on large values):
+  def test_conversion_rounding(self):
+    self.assertEqual(cpst_podtree.ocpValToInteger("1.5", "m"), 1500)
+    self.assertEqual(cpst_podtree.ocpValToInteger("0.0004", "m"), 0)
+    self.assertEqual(cpst_podtree.ocpValToInteger("0.0006", "m"), 1)
+    self.assertEqual(cpst_podtree.ocpValToInteger("1.5Gi", "Ki"), 1572864)
+    self.assertEqual(cpst_podtree.ocpValToInteger("129e6", "Ki"), 125977)
+    self.assertEqual(cpst_podtree.ocpValToInteger("8Ei", "Ki"), 8 * 2**50)
+    self.assertEqual(cpst_podtree.ocpValToInteger("1Ti", "Gi"), 1024)
+
+  def test_bulk_matches_single(self):
+    values = ["100m", "1.5Gi", "129e6", "2Ti", "1", "bogus", "100m", "512Mi"]
+    with contextlib.redirect_stderr(io.StringIO()):
+      for returnType in RETURN_TYPES:
+        with self.subTest(returnType=returnType):
+          bulk = cpst_podtree.ocpValsToIntegers(values, returnType)
+          self.assertEqual(bulk, [cpst_podtree.ocpValToInteger(valIn, returnType) for valIn in values])
+
+  #Each distinct string is parsed once, and each (string, unit) converted once:
+  def test_results_are_cached(self):
+    cpst_podtree.ocpValsToIntegers(["250m", "250m", "1Gi", "250m"], "m")
+    cpst_podtree.ocpValsToIntegers(["250m", "1Gi"], "Ki")
+    self.assertEqual(cpst_podtree.parseQuantity.cache_info().currsize, 2)
+    self.assertEqual(set(cpst_podtree.QUANTITY_INT_CACHE), {("250m", "m"), ("1Gi", "m"), ("250m", "Ki"), ("1Gi", "Ki")})
+
+  def test_reduce_value(self):
+    expected = [("250m", "250m"), ("1500m", "1.5"), ("512Ki", "512Ki"), ("2048Ki", "2.0Mi"),
+                ("3145728Ki", "3.0Gi"), ("1Gi", "1Gi"), ("bogusm", "bogusm")]
+    for (valIn, reduced) in expected:
+      with self.subTest(valIn=valIn):
+        self.assertEqual(cpst_podtree.reduceValue(valIn), reduced)
+
+
+if __name__ == "__main__":
+  unittest.main()
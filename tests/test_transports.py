@@ -0,0 +1,104 @@
+#Abstract:
+#  Tests of the cluster transports of cpst_podtree.py (ocTransport and apiTransport), against the local
+#  API server and oc stand-ins of cpst_podtree_bench.py, which serve the same generated namespace.
+#  Run with: python3 -m unittest discover -s tests (or pytest)
+
+import os
+import sys
+import subprocess
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import cpst_podtree
+import cpst_podtree_bench
+
+PODTREE_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cpst_podtree.py")
+TEST_SERVICES = 6 #Services in the generated namespace, enough for every kind of owner chain
+TEST_SERVICE = "zenservice/svc0000-cr"
+
+
+class transportTests(unittest.TestCase):
+
+  @classmethod
+  def setUpClass(cls):
+    generator = cpst_podtree_bench.namespaceGenerator(cpst_podtree_bench.BENCH_NAMESPACE, TEST_SERVICES)
+    cls.recorded = cpst_podtree_bench.recordedApi(generator)
+    cls.cluster = cpst_podtree_bench.recordedCluster(cls.recorded)
+    cls.server = cls.cluster.__enter__()
+
+  @classmethod
+  def tearDownClass(cls):
+    cls.cluster.__exit__(None, None, None)
+
+  def setUp(self):
+    self.savedSettings = (cpst_podtree.PAGE_SIZE, cpst_podtree.ACTIVE_TRANSPORT)
+    self.server.aggregated = True
+    if os.path.exists(cpst_podtree.DISCOVERY_CACHE_FILE):
+      os.remove(cpst_podtree.DISCOVERY_CACHE_FILE)
+
+  def tearDown(self):
+    (cpst_podtree.PAGE_SIZE, cpst_podtree.ACTIVE_TRANSPORT) = self.savedSettings
+
+  #Run cpst_podtree.py on the generated namespace, returns its output without the progress lines.
+  def runPodtree(self, *args):
+    result = subprocess.run([sys.executable, PODTREE_SCRIPT, "-n", self.recorded.namespace] + list(args),
+                            capture_output=True, text=True, timeout=120)
+    self.assertEqual(result.returncode, 0, result.stderr)
+    return [line for line in result.stdout.splitlines() if not line.startswith(("Pulling", "Compiling", "Saved snapshot"))]
+
+  def test_api_pull_matches_oc_pull(self):
+    cpst_podtree.PAGE_SIZE = 7
+    (ocName, ocLogin, ocResources, ocJson, ocErrors, ocLogs) = cpst_podtree_bench.pullThroughTransport("oc", self.recorded)
+    self.assertEqual(ocName, "oc")
+    self.assertEqual(ocErrors, {})
+    self.assertEqual(sum(len(items) for items in ocJson.values()), self.recorded.getPulledCount())
+    for aggregated in (True, False):
+      with self.subTest(aggregated=aggregated):
+        self.server.aggregated = aggregated
+        if os.path.exists(cpst_podtree.DISCOVERY_CACHE_FILE):
+          os.remove(cpst_podtree.DISCOVERY_CACHE_FILE)
+        (apiName, apiLogin, apiResources, apiJson, apiErrors, apiLogs) = cpst_podtree_bench.pullThroughTransport("api", self.recorded)
+        self.assertEqual(apiName, "api")
+        self.assertTrue(apiLogin)
+        self.assertEqual(apiErrors, {})
+        self.assertEqual(apiResources, ocResources)
+        self.assertEqual(apiJson, ocJson)
+        self.assertEqual(apiLogs, ocLogs)
+
+  def test_list_json_keeps_resource_version(self):
+    for transportType in ("oc", "api"):
+      transport = cpst_podtree.setupTransport(transportType)
+      for (resource, kind, fullName) in (("pods", "Pod", "pods"), ("zenservices.zen.cpd.ibm.com", "ZenService", "zenservices.zen.cpd.ibm.com")):
+        with self.subTest(transport=transportType, resource=resource):
+          (listJson, errStr) = transport.getListJson(resource, self.recorded.namespace)
+          self.assertIsNone(errStr)
+          self.assertEqual(listJson.get("kind"), f"{kind}List")
+          self.assertEqual(listJson.get("metadata").get("resourceVersion"), "1000")
+          self.assertEqual([item.get("metadata").get("name") for item in listJson.get("items")],
+                           [item.get("metadata").get("name") for item in self.recorded.lists[fullName]])
+          self.assertEqual({item.get("kind") for item in listJson.get("items")}, {kind})
+
+  def test_print_modes_match_across_transports(self):
+    for printOption in ("-s", "-T", "-p", "-a"):
+      with self.subTest(printOption=printOption):
+        ocOutput = self.runPodtree(printOption, "--transport", "oc")
+        self.assertEqual(self.runPodtree(printOption, "--transport", "api"), ocOutput)
+
+  def test_paged_pull_matches_single_list_pull(self):
+    for transportType in ("oc", "api"):
+      with self.subTest(transport=transportType):
+        listOutput = self.runPodtree("-T", "--transport", transportType, "--page-size", "0")
+        self.assertEqual(self.runPodtree("-T", "--transport", transportType, "--page-size", "7"), listOutput)
+        self.assertEqual(self.runPodtree("-T", "--transport", transportType, "--page-size", "7", "--jobs", "2"), listOutput)
+
+  #-S pulls only the service's subtree, a snapshot run pulls the whole namespace:
+  def test_service_pull_matches_full_pull(self):
+    for transportType in ("oc", "api"):
+      with self.subTest(transport=transportType):
+        snapshotFile = os.path.join(os.environ["XDG_CACHE_HOME"], f"full-{transportType}.json.gz")
+        fullOutput = self.runPodtree("-T", "-S", TEST_SERVICE, "--transport", transportType, "--save-snapshot", snapshotFile)
+        self.assertEqual(self.runPodtree("-T", "-S", TEST_SERVICE, "--transport", transportType), fullOutput)
+
+
+if __name__ == "__main__":
+  unittest.main()